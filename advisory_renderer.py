@@ -0,0 +1,343 @@
+# advisory_renderer.py
+"""
+Bulk alert and advisory rendering for Arogya Sentinel
+Renders internal alerts per hospital and public advisories per ward in
+English, Marathi and Hindi from a table of predictions, using templates
+compiled once, rendering each distinct message once and writing in one pass
+"""
+
+import json
+import math
+import time
+from string import Formatter
+
+from surge_prediction_model import classify_risk
+
+LANGUAGES = ("en", "mr", "hi")
+KINDS = ("alert", "advisory")
+
+# Fields a template may use; rows are localized into these before rendering
+FIELDS = {"city", "surge", "risk", "timeline", "status", "action", "causes", "guidance"}
+
+TEMPLATES = {
+    "en": {
+        "alert": (
+            "**INTERNAL ALERT ({city}):**\n"
+            "{risk}-risk patient surge predicted: about {surge}% more admissions within {timeline}.\n"
+            "Bed status: {status}.\n"
+            "Action: {action}\n"
+            "Department heads to confirm readiness within 24 hours."
+        ),
+        "advisory": (
+            "**PUBLIC HEALTH ADVISORY for {city}:**\n"
+            "Due to {causes}, a {risk}-risk surge in respiratory and other medical issues is expected within {timeline}. "
+            "{guidance}"
+        )
+    },
+    "mr": {
+        "alert": (
+            "**अंतर्गत सूचना ({city}):**\n"
+            "{risk} जोखमीची रुग्णवाढ अपेक्षित: येत्या {timeline} सुमारे {surge}% अधिक रुग्ण दाखल होतील.\n"
+            "खाटांची स्थिती: {status}.\n"
+            "कृती: {action}\n"
+            "विभागप्रमुखांनी 24 तासांत तयारीची पुष्टी करावी."
+        ),
+        "advisory": (
+            "**{city} साठी सार्वजनिक आरोग्य सूचना:**\n"
+            "{causes} यामुळे येत्या {timeline} श्वसनाचे व इतर आजार {risk} प्रमाणात वाढण्याची शक्यता आहे. "
+            "{guidance}"
+        )
+    },
+    "hi": {
+        "alert": (
+            "**आंतरिक चेतावनी ({city}):**\n"
+            "{risk} जोखिम वाली मरीज़ वृद्धि का अनुमान: अगले {timeline} लगभग {surge}% अधिक भर्तियाँ।\n"
+            "बिस्तरों की स्थिति: {status}।\n"
+            "कार्रवाई: {action}\n"
+            "विभागाध्यक्ष 24 घंटे के भीतर तैयारी की पुष्टि करें।"
+        ),
+        "advisory": (
+            "**{city} के लिए सार्वजनिक स्वास्थ्य परामर्श:**\n"
+            "{causes} के कारण अगले {timeline} साँस और अन्य बीमारियों में {risk} वृद्धि की आशंका है। "
+            "{guidance}"
+        )
+    }
+}
+
+PHRASES = {
+    "en": {
+        "risk": {"Low": "Low", "Moderate": "Moderate", "High": "High", "Very High": "Very High"},
+        "days": "days",
+        "and": " and ",
+        "causes": {
+            "festival": "upcoming festivals",
+            "pollution": "high pollution levels",
+            "occupancy": "already busy hospitals",
+            None: "current health conditions"
+        },
+        "status": {
+            "critical": "critical (over 90% of beds occupied)",
+            "high": "high (80-90% of beds occupied)",
+            "moderate": "moderate (under 80% of beds occupied)",
+            None: "not reported"
+        },
+        "action": {
+            "critical": "Open surge beds, defer elective admissions and arrange transfers to nearby hospitals.",
+            "high": "Add nursing shifts and stock respiratory and trauma supplies.",
+            "moderate": "Prepare to receive transfers from strained hospitals.",
+            None: "Review bed availability and staffing."
+        },
+        "guidance": {
+            "elevated": ("Citizens, especially the elderly and those with pre-existing conditions, are advised to "
+                         "wear masks, stay hydrated, and avoid crowded places. Hospitals are preparing for "
+                         "increased demand."),
+            "low": "Continue usual precautions; hospitals are monitoring the situation."
+        }
+    },
+    "mr": {
+        "risk": {"Low": "कमी", "Moderate": "मध्यम", "High": "उच्च", "Very High": "अति उच्च"},
+        "days": "दिवसांत",
+        "and": " आणि ",
+        "causes": {
+            "festival": "आगामी सण-उत्सव",
+            "pollution": "वाढलेले प्रदूषण",
+            "occupancy": "रुग्णालयांमधील आधीची गर्दी",
+            None: "सध्याची आरोग्य परिस्थिती"
+        },
+        "status": {
+            "critical": "गंभीर (90% पेक्षा जास्त खाटा भरलेल्या)",
+            "high": "उच्च (80-90% खाटा भरलेल्या)",
+            "moderate": "मध्यम (80% पेक्षा कमी खाटा भरलेल्या)",
+            None: "माहिती उपलब्ध नाही"
+        },
+        "action": {
+            "critical": "अतिरिक्त खाटा सुरू करा, नियोजित दाखले पुढे ढकला आणि जवळच्या रुग्णालयांत रुग्ण हलवण्याची व्यवस्था करा.",
+            "high": "अतिरिक्त नर्सिंग शिफ्ट लावा आणि श्वसन व अपघात उपचार साहित्याचा साठा करा.",
+            "moderate": "ताण असलेल्या रुग्णालयांमधून येणारे रुग्ण स्वीकारण्याची तयारी ठेवा.",
+            None: "खाटांची उपलब्धता आणि कर्मचारी संख्येचा आढावा घ्या."
+        },
+        "guidance": {
+            "elevated": ("नागरिकांनी, विशेषतः ज्येष्ठ नागरिक आणि आधीपासून आजार असलेल्यांनी, मास्क वापरावा, "
+                         "पुरेसे पाणी प्यावे आणि गर्दीची ठिकाणे टाळावीत. रुग्णालये वाढत्या मागणीसाठी तयारी करत आहेत."),
+            "low": "नेहमीची काळजी घेत राहा; रुग्णालये परिस्थितीवर लक्ष ठेवून आहेत."
+        }
+    },
+    "hi": {
+        "risk": {"Low": "कम", "Moderate": "मध्यम", "High": "उच्च", "Very High": "अति उच्च"},
+        "days": "दिनों में",
+        "and": " और ",
+        "causes": {
+            "festival": "आगामी त्योहारों",
+            "pollution": "बढ़े हुए प्रदूषण",
+            "occupancy": "अस्पतालों में पहले से भीड़",
+            None: "मौजूदा स्वास्थ्य स्थितियों"
+        },
+        "status": {
+            "critical": "गंभीर (90% से अधिक बिस्तर भरे)",
+            "high": "उच्च (80-90% बिस्तर भरे)",
+            "moderate": "मध्यम (80% से कम बिस्तर भरे)",
+            None: "जानकारी उपलब्ध नहीं"
+        },
+        "action": {
+            "critical": "अतिरिक्त बिस्तर खोलें, नियोजित भर्तियाँ टालें और पास के अस्पतालों में स्थानांतरण की व्यवस्था करें।",
+            "high": "अतिरिक्त नर्सिंग शिफ्ट लगाएँ और श्वसन व आघात उपचार सामग्री का भंडार रखें।",
+            "moderate": "दबाव वाले अस्पतालों से आने वाले मरीज़ों को लेने की तैयारी रखें।",
+            None: "बिस्तरों की उपलब्धता और स्टाफ की समीक्षा करें।"
+        },
+        "guidance": {
+            "elevated": ("नागरिक, विशेषकर बुज़ुर्ग और पहले से बीमार लोग, मास्क पहनें, पर्याप्त पानी पिएँ और "
+                         "भीड़-भाड़ वाली जगहों से बचें। अस्पताल बढ़ी हुई माँग के लिए तैयारी कर रहे हैं।"),
+            "low": "सामान्य सावधानियाँ बरतते रहें; अस्पताल स्थिति पर नज़र रखे हुए हैं।"
+        }
+    }
+}
+
+
+class CompiledTemplate:
+    """A template parsed once: the fields it uses (its deduplication key) and a bound renderer"""
+
+    def __init__(self, text):
+        self.text = text
+        self.fields = tuple(dict.fromkeys(name for _, name, _, _ in Formatter().parse(text) if name))
+        unknown = set(self.fields) - FIELDS
+        if unknown:
+            raise ValueError(f"Template uses unknown fields {sorted(unknown)}")
+        self.render = text.format_map
+
+    def key(self, values):
+        return tuple(values[field] for field in self.fields)
+
+
+COMPILED_TEMPLATES = {
+    (kind, language): CompiledTemplate(TEMPLATES[language][kind])
+    for language in LANGUAGES for kind in KINDS
+}
+
+
+def _causes(key_factors):
+    """Sorted cause codes named by the model's key risk factors"""
+    text = " ".join(key_factors or ()).lower()
+    causes = [cause for cause, words in (("festival", ("festival",)), ("occupancy", ("occupancy",)),
+                                         ("pollution", ("pollution", "aqi"))) if any(w in text for w in words)]
+    return tuple(sorted(causes))
+
+
+def _status(occupancy):
+    if occupancy is None or (isinstance(occupancy, float) and math.isnan(occupancy)):
+        return None
+    return "critical" if occupancy > 0.9 else "high" if occupancy > 0.8 else "moderate"
+
+
+def _neutral_values(row):
+    """Language-independent message inputs for one table row"""
+    surge = float(row["surge_percentage"])
+    risk_level, timeline = classify_risk(surge)
+    risk_level = row.get("risk_level") or risk_level
+    return {
+        "city": row.get("city") or "your city",
+        "surge": round(surge),
+        "risk": risk_level,
+        "timeline": row.get("timeline") or timeline,
+        "status": _status(row.get("occupancy")),
+        "causes": _causes(row.get("key_factors")),
+        "guidance": "low" if risk_level == "Low" else "elevated"
+    }
+
+
+def _localize(values, language, cache):
+    """Template values in `language`; phrase lookups are memoized per distinct input"""
+    key = (language, values["risk"], values["timeline"], values["status"], values["causes"], values["guidance"])
+    phrases = cache.get(key)
+    if phrases is None:
+        p = PHRASES[language]
+        phrases = cache[key] = {
+            "risk": p["risk"].get(values["risk"], values["risk"]),
+            "timeline": values["timeline"].replace("days", p["days"]),
+            "status": p["status"][values["status"]],
+            "action": p["action"][values["status"]],
+            "causes": p["and"].join(p["causes"][c] for c in values["causes"]) or p["causes"][None],
+            "guidance": p["guidance"][values["guidance"]]
+        }
+    return dict(phrases, city=values["city"], surge=values["surge"])
+
+
+def _records(table):
+    return table.to_dict("records") if hasattr(table, "to_dict") else list(table)
+
+
+def render_batch(table, languages=LANGUAGES, kinds=KINDS):
+    """
+    Render alerts and advisories for every row of a prediction table (a
+    DataFrame or list of dicts with 'surge_percentage' and optional 'city',
+    'ward', 'hospital', 'occupancy', 'key_factors', 'risk_level',
+    'timeline'). Each hospital row gets an internal alert; each (city, ward)
+    gets one public advisory from its highest-surge row. Identical messages
+    are rendered once and list all their recipients. Returns {'messages'
+    ([{'id', 'kind', 'language', 'text', 'recipients'}]), 'total'
+    (recipient-messages), 'unique', 'elapsed'}.
+    """
+    unknown = set(languages) - set(LANGUAGES)
+    if unknown:
+        raise ValueError(f"Unsupported languages {sorted(unknown)}; expected some of {list(LANGUAGES)}")
+    start = time.perf_counter()
+    rows = _records(table)
+
+    # Advisories address wards, so one row per ward: the most severe prediction
+    ward_rows = {}
+    for row in rows:
+        ward = (row.get("city"), row.get("ward"))
+        if ward not in ward_rows or float(row["surge_percentage"]) > float(ward_rows[ward]["surge_percentage"]):
+            ward_rows[ward] = row
+    targets = {"alert": rows, "advisory": list(ward_rows.values())}
+
+    messages, index, cache, total = [], {}, {}, 0
+    for kind in kinds:
+        for row in targets[kind]:
+            values = _neutral_values(row)
+            recipient = {"city": row.get("city"), "ward": row.get("ward")}
+            if kind == "alert":
+                recipient["hospital"] = row.get("hospital")
+            for language in languages:
+                template = COMPILED_TEMPLATES[kind, language]
+                localized = _localize(values, language, cache)
+                key = (kind, language, template.key(localized))
+                message = index.get(key)
+                if message is None:
+                    message = index[key] = {
+                        "id": f"{kind}-{language}-{len(messages) + 1}", "kind": kind, "language": language,
+                        "text": template.render(localized), "recipients": []
+                    }
+                    messages.append(message)
+                message["recipients"].append(recipient)
+                total += 1
+    return {"messages": messages, "total": total, "unique": len(messages), "elapsed": time.perf_counter() - start}
+
+
+def write_batch(batch, path):
+    """Write the unique messages, with their recipients, as JSON Lines in one write"""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(json.dumps(message, ensure_ascii=False) + "\n" for message in batch["messages"]))
+    return path
+
+
+def facility_table(store, prediction, city=None):
+    """Prediction table with one row per capacity-store facility (city-wide prediction, own occupancy)"""
+    frame = store.facility_frame(city=city)
+    return [{
+        "city": row.city, "ward": row.ward, "hospital": row.name, "occupancy": float(row.occupancy),
+        "surge_percentage": prediction["surge_percentage"], "risk_level": prediction.get("risk_level"),
+        "timeline": prediction.get("timeline"), "key_factors": prediction.get("key_factors")
+    } for row in frame.itertuples()]
+
+
+def render_for_location(location, prediction, languages=LANGUAGES):
+    """Batch for the shared capacity store's facilities in a location's city; None when it has none"""
+    from data_sources import current_capacity_store
+    from location_registry import get_location_registry
+
+    place = get_location_registry().resolve(location)
+    if place is None or not place.get("city"):
+        return None
+    table = facility_table(current_capacity_store(), prediction, city=place["city"])
+    return render_batch(table, languages=languages) if table else None
+
+
+def synthetic_table(n_hospitals=5000, cities=("Mumbai", "Pune", "Nagpur", "Nashik"), wards=60, seed=0):
+    """Random prediction table for benchmarking"""
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    factor_sets = [[], ["High pollution levels (AQI)"], ["Upcoming festival activity"],
+                   ["High pollution levels (AQI)", "Upcoming festival activity", "High hospital occupancy"]]
+    city = rng.integers(0, len(cities), n_hospitals)
+    ward = rng.integers(0, wards, n_hospitals)
+    return [{
+        "city": cities[city[i]], "ward": f"Ward {ward[i]}", "hospital": f"Hospital {i:05d}",
+        "occupancy": float(rng.uniform(0.6, 1.0)),
+        "surge_percentage": float(rng.choice([12.0, 22.0, 31.0, 45.0])),
+        "key_factors": factor_sets[rng.integers(0, len(factor_sets))]
+    } for i in range(n_hospitals)]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Render alerts and advisories for every hospital and ward")
+    parser.add_argument("location", nargs="?", default="Mumbai")
+    parser.add_argument("--languages", default=",".join(LANGUAGES), help="Comma-separated language codes")
+    parser.add_argument("--synthetic", type=int, default=0, help="Benchmark on N random hospitals instead")
+    parser.add_argument("--out", default="advisories.jsonl")
+    args = parser.parse_args()
+    languages = [code.strip() for code in args.languages.split(",") if code.strip()]
+
+    if args.synthetic:
+        batch = render_batch(synthetic_table(args.synthetic), languages=languages)
+    else:
+        from fast_pipeline import run_fast_pipeline
+
+        batch = render_for_location(args.location, run_fast_pipeline(args.location)["prediction"], languages)
+        if batch is None:
+            raise SystemExit(f"No facilities known for {args.location}")
+    write_batch(batch, args.out)
+    print(f"📣 {batch['total']} alerts/advisories ({batch['unique']} unique texts) rendered in "
+          f"{batch['elapsed'] * 1000:.0f} ms -> {args.out}")
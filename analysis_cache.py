@@ -0,0 +1,165 @@
+# analysis_cache.py
+"""
+Whole-analysis memoization for Arogya Sentinel
+Fingerprints the collected data source outputs together with the model
+version and prompt/template versions, and stores finished analyses under that
+fingerprint so a repeat run on unchanged inputs returns instantly
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    fingerprint TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    location TEXT NOT NULL,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_file_digests = {}
+_file_digests_lock = threading.Lock()
+
+
+def _canonical(value):
+    return json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+
+
+def file_digest(path):
+    """SHA-256 of a file, memoized on (size, mtime) so unchanged artifacts are hashed once"""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    with _file_digests_lock:
+        if key in _file_digests:
+            return _file_digests[key]
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    with _file_digests_lock:
+        _file_digests[key] = digest.hexdigest()
+    return _file_digests[key]
+
+
+def model_version(model):
+    """Content hash of the model's saved forest and scaler ('unsaved' if not on disk)"""
+    paths = [model.model_path, model.scaler_path]
+    if not all(os.path.exists(p) for p in paths):
+        return "unsaved"
+    return hashlib.sha256("".join(file_digest(p) for p in paths).encode()).hexdigest()[:16]
+
+
+def config_version(*parts):
+    """Short hash of prompt texts / settings, e.g. agent goals and task descriptions"""
+    return hashlib.sha256(_canonical(parts).encode()).hexdigest()[:16]
+
+
+def analysis_fingerprint(location, source_outputs, versions, day=None):
+    """
+    Fingerprint of everything an analysis depends on: the location, each
+    source's output text, the model and prompt/template versions, and the day
+    (the model uses weekday and month features).
+    """
+    payload = {
+        "location": location.strip().lower(),
+        "sources": source_outputs,
+        "versions": versions,
+        "day": (day or date.today()).isoformat()
+    }
+    return hashlib.sha256(_canonical(payload).encode()).hexdigest()
+
+
+class AnalysisStore:
+    """SQLite store of finished analyses keyed by fingerprint (WAL mode, one connection per thread)"""
+
+    def __init__(self, path=None, max_age=7 * 24 * 3600):
+        self.path = path or os.environ.get("AROGYA_ANALYSIS_CACHE_PATH", "analysis_cache.sqlite")
+        self.max_age = max_age
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, fingerprint):
+        """Stored result for a fingerprint, or None if absent or older than max_age"""
+        row = self._connect().execute(
+            "SELECT result, created_at FROM analyses WHERE fingerprint = ?", (fingerprint,)
+        ).fetchone()
+        if row is None or time.time() - row[1] > self.max_age:
+            return None
+        self._connect().execute("UPDATE analyses SET hits = hits + 1 WHERE fingerprint = ?", (fingerprint,))
+        return json.loads(row[0])
+
+    def put(self, fingerprint, kind, location, result):
+        self._connect().execute(
+            "INSERT INTO analyses (fingerprint, kind, location, result, created_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(fingerprint) DO UPDATE SET result = excluded.result, created_at = excluded.created_at",
+            (fingerprint, kind, location, json.dumps(result, default=str), time.time())
+        )
+
+    def invalidate(self, kind=None):
+        if kind is None:
+            self._connect().execute("DELETE FROM analyses")
+        else:
+            self._connect().execute("DELETE FROM analyses WHERE kind = ?", (kind,))
+
+    def purge_expired(self):
+        self._connect().execute("DELETE FROM analyses WHERE created_at < ?", (time.time() - self.max_age,))
+
+    def stats(self):
+        """Stored analyses and total repeat hits per kind"""
+        return {
+            kind: {"analyses": count, "hits": hits or 0}
+            for kind, count, hits in self._connect().execute(
+                "SELECT kind, COUNT(*), SUM(hits) FROM analyses GROUP BY kind"
+            )
+        }
+
+
+_shared_store = None
+_shared_lock = threading.Lock()
+
+
+def get_analysis_store():
+    """Process-wide AnalysisStore, opened on first use"""
+    global _shared_store
+    with _shared_lock:
+        if _shared_store is None:
+            _shared_store = AnalysisStore()
+        return _shared_store
+
+
+def memoized_analysis(kind, location, source_outputs, versions, compute, force_refresh=False):
+    """
+    Return (result, fingerprint, from_cache). compute() runs only when no
+    result is stored for the fingerprint or force_refresh is set; its result
+    must be JSON-serializable. Memoization is off when AROGYA_ANALYSIS_CACHE_DISABLED=1.
+    """
+    fingerprint = analysis_fingerprint(location, source_outputs, versions)
+    if os.environ.get("AROGYA_ANALYSIS_CACHE_DISABLED") == "1":
+        return compute(), fingerprint, False
+
+    store = get_analysis_store()
+    if not force_refresh:
+        cached = store.get(fingerprint)
+        if cached is not None:
+            return cached, fingerprint, True
+
+    result = compute()
+    store.put(fingerprint, kind, location, result)
+    return result, fingerprint, False
@@ -0,0 +1,199 @@
+# backtesting.py
+"""
+Rolling-origin backtesting for the Healthcare Surge Prediction Model
+Replays a time-indexed table of daily observations, retrains the forest at each
+forecast origin and compares predictions against realized admissions surges
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from surge_prediction_model import (
+    HealthcareSurgePredictionModel,
+    RISK_LEVELS,
+    risk_tiers
+)
+
+
+def _run_window(window):
+    """
+    Train on one window's history and score its forecast block in a single batch.
+    Module-level so it can be shipped to worker processes.
+    """
+    model = HealthcareSurgePredictionModel()
+    if window['model_params']:
+        model.model.set_params(**window['model_params'])
+    model.fit(window['X_train'], window['y_train'])
+
+    return {
+        'origin': window['origin'],
+        'dates': window['test_dates'],
+        'horizon': window['horizon'],
+        'actual': window['y_test'],
+        'predicted': model.predict_batch(window['X_test'])
+    }
+
+
+class RollingOriginBacktester:
+    """
+    Rolling-origin (walk-forward) evaluation.
+
+    Every `step_days` a forecast origin is placed; the model is trained on the
+    preceding `train_days` of observations (or all history when expanding=True)
+    and predicts the following `horizon_days`. Windows are independent and run
+    in parallel across a process pool.
+    """
+
+    def __init__(self, train_days=180, horizon_days=14, step_days=7,
+                 expanding=False, min_train_rows=60, n_jobs=None,
+                 target_column='surge_percentage', time_column=None,
+                 model_params=None):
+        self.train_days = train_days
+        self.horizon_days = horizon_days
+        self.step_days = step_days
+        self.expanding = expanding
+        self.min_train_rows = min_train_rows
+        self.n_jobs = n_jobs or os.cpu_count() or 1
+        self.target_column = target_column
+        self.time_column = time_column
+        self.model_params = model_params or {}
+        self.feature_columns = HealthcareSurgePredictionModel().feature_columns
+
+    def _prepare(self, observations):
+        """Return the table sorted by time and its timestamps as datetime64[D]"""
+        if self.time_column is not None:
+            observations = observations.set_index(self.time_column)
+        if not isinstance(observations.index, pd.DatetimeIndex):
+            raise ValueError("Observations must be indexed by date or name a time_column")
+
+        missing = [c for c in self.feature_columns + [self.target_column] if c not in observations.columns]
+        if missing:
+            raise ValueError(f"Observations are missing columns: {', '.join(missing)}")
+
+        observations = observations.sort_index()
+        days = observations.index.values.astype('datetime64[D]')
+        return observations, days
+
+    def make_windows(self, observations):
+        """Build the list of train/test windows for the observation table"""
+        observations, days = self._prepare(observations)
+        X = observations[self.feature_columns].to_numpy(dtype=float)
+        y = observations[self.target_column].to_numpy(dtype=float)
+
+        train_span = np.timedelta64(self.train_days, 'D')
+        horizon_span = np.timedelta64(self.horizon_days, 'D')
+        first_origin = days[0] + train_span if not self.expanding else days[0] + np.timedelta64(1, 'D')
+        origins = np.arange(first_origin, days[-1] + np.timedelta64(1, 'D'), np.timedelta64(self.step_days, 'D'))
+
+        # Row boundaries for every origin in one vectorized pass
+        train_starts = np.zeros(len(origins), dtype=int) if self.expanding else np.searchsorted(days, origins - train_span)
+        test_starts = np.searchsorted(days, origins)
+        test_ends = np.searchsorted(days, origins + horizon_span)
+
+        windows = []
+        for origin, train_start, test_start, test_end in zip(origins, train_starts, test_starts, test_ends):
+            if test_start - train_start < self.min_train_rows or test_end == test_start:
+                continue
+            test_days = days[test_start:test_end]
+            windows.append({
+                'origin': origin,
+                'X_train': X[train_start:test_start],
+                'y_train': y[train_start:test_start],
+                'X_test': X[test_start:test_end],
+                'y_test': y[test_start:test_end],
+                'test_dates': test_days,
+                'horizon': (test_days - origin).astype(int) + 1,
+                'model_params': self.model_params
+            })
+        return windows
+
+    def run(self, observations):
+        """
+        Run every window and return a dict with:
+          predictions       - one row per (origin, forecast date)
+          error_by_horizon  - MAE / RMSE / bias / tier accuracy per horizon day
+          risk_confusion    - actual vs predicted risk tier counts
+          windows           - number of windows evaluated
+        """
+        windows = self.make_windows(observations)
+        if not windows:
+            raise ValueError("Not enough history for a single backtest window")
+
+        if self.n_jobs == 1 or len(windows) == 1:
+            results = [_run_window(w) for w in windows]
+        else:
+            workers = min(self.n_jobs, len(windows))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_run_window, windows))
+
+        predictions = pd.DataFrame({
+            'origin': np.concatenate([np.repeat(r['origin'], len(r['dates'])) for r in results]),
+            'date': np.concatenate([r['dates'] for r in results]),
+            'horizon': np.concatenate([r['horizon'] for r in results]),
+            'actual': np.concatenate([r['actual'] for r in results]),
+            'predicted': np.concatenate([r['predicted'] for r in results])
+        })
+        predictions['origin'] = pd.to_datetime(predictions['origin'])
+        predictions['date'] = pd.to_datetime(predictions['date'])
+        predictions['error'] = predictions['predicted'] - predictions['actual']
+        predictions['actual_tier'] = risk_tiers(predictions['actual'].to_numpy())
+        predictions['predicted_tier'] = risk_tiers(predictions['predicted'].to_numpy())
+
+        return {
+            'predictions': predictions,
+            'error_by_horizon': self.error_by_horizon(predictions),
+            'risk_confusion': self.risk_confusion(predictions),
+            'windows': len(windows)
+        }
+
+    @staticmethod
+    def error_by_horizon(predictions):
+        """Aggregate forecast errors per horizon day"""
+        scored = predictions.assign(
+            abs_error=predictions['error'].abs(),
+            sq_error=predictions['error'] ** 2,
+            tier_hit=predictions['actual_tier'] == predictions['predicted_tier']
+        )
+        table = scored.groupby('horizon').agg(
+            n=('error', 'size'),
+            mae=('abs_error', 'mean'),
+            rmse=('sq_error', 'mean'),
+            bias=('error', 'mean'),
+            tier_accuracy=('tier_hit', 'mean')
+        )
+        table['rmse'] = np.sqrt(table['rmse'])
+        return table
+
+    @staticmethod
+    def risk_confusion(predictions):
+        """Actual (rows) vs predicted (columns) risk tier counts, all tiers present"""
+        table = pd.crosstab(predictions['actual_tier'], predictions['predicted_tier'])
+        table = table.reindex(index=RISK_LEVELS, columns=RISK_LEVELS, fill_value=0)
+        table.index.name = 'actual'
+        table.columns.name = 'predicted'
+        return table
+
+
+def synthetic_history(days=365, start='2024-01-01'):
+    """Daily observation table built from the synthetic generator, for demos and tests"""
+    df = HealthcareSurgePredictionModel().generate_synthetic_training_data(n_samples=days)
+    dates = pd.date_range(start=start, periods=days, freq='D')
+    df['day_of_week'] = dates.dayofweek
+    df['month'] = dates.month
+    df.index = dates
+    return df
+
+
+if __name__ == "__main__":
+    history = synthetic_history(days=540)
+    backtester = RollingOriginBacktester(train_days=180, horizon_days=14, step_days=14)
+    results = backtester.run(history)
+
+    print(f"Backtest windows evaluated: {results['windows']}")
+    print("\nError by horizon (days ahead):")
+    print(results['error_by_horizon'].round(3).to_string())
+    print("\nRisk tier confusion (actual x predicted):")
+    print(results['risk_confusion'].to_string())
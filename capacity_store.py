@@ -0,0 +1,240 @@
+# capacity_store.py
+"""
+Columnar hospital capacity store
+Keeps bed capacity and occupancy for thousands of facilities in NumPy arrays
+(facilities x bed types) with categorical city/ward/state codes, so
+aggregation is a handful of vectorized bincounts and updates are O(1)
+"""
+
+import threading
+
+import numpy as np
+
+BED_TYPES = ["general", "hdu", "icu", "ventilator"]
+GROUP_COLUMNS = ("city", "ward", "state")
+
+
+class _Categories:
+    """String <-> integer code mapping for one grouping column"""
+
+    def __init__(self):
+        self.codes = {}
+        self.labels = []
+
+    def encode(self, label):
+        label = label or "Unknown"
+        code = self.codes.get(label)
+        if code is None:
+            code = self.codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+
+class CapacityStore:
+    """
+    Facility rows with per-bed-type `total` and `occupied` columns.
+
+    Arrays grow by doubling, so adding facilities is amortized O(1);
+    occupancy updates by facility id are O(1) single writes or one vectorized
+    scatter for bulk updates.
+    """
+
+    def __init__(self, bed_types=BED_TYPES, initial_capacity=1024):
+        self.bed_types = list(bed_types)
+        self._bed_index = {b: i for i, b in enumerate(self.bed_types)}
+        self._lock = threading.RLock()
+        self._size = 0
+        self._row_by_id = {}
+        self.ids = []
+        self.names = []
+        self._categories = {column: _Categories() for column in GROUP_COLUMNS}
+        self._codes = {column: np.zeros(initial_capacity, dtype=np.int32) for column in GROUP_COLUMNS}
+        self._total = np.zeros((initial_capacity, len(self.bed_types)), dtype=np.int32)
+        self._occupied = np.zeros((initial_capacity, len(self.bed_types)), dtype=np.int32)
+        self.updated_at = np.zeros(initial_capacity, dtype=np.float64)
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def total(self):
+        return self._total[:self._size]
+
+    @property
+    def occupied(self):
+        return self._occupied[:self._size]
+
+    def _grow(self):
+        capacity = len(self._total) * 2
+        for column in GROUP_COLUMNS:
+            self._codes[column] = np.resize(self._codes[column], capacity)
+        self._total = np.vstack([self._total, np.zeros_like(self._total)])
+        self._occupied = np.vstack([self._occupied, np.zeros_like(self._occupied)])
+        self.updated_at = np.resize(self.updated_at, capacity)
+
+    def _bed_column(self, bed_type):
+        try:
+            return self._bed_index[bed_type]
+        except KeyError:
+            raise ValueError(f"Unknown bed type '{bed_type}'. Valid types: {', '.join(self.bed_types)}")
+
+    def upsert_facility(self, facility_id, name, city=None, ward=None, state=None,
+                        total=None, occupied=None, timestamp=0.0):
+        """
+        Add a facility or replace its metadata. `total` / `occupied` are
+        {bed_type: beds} dicts; omitted bed types keep their current values.
+        Returns the facility's row index.
+        """
+        with self._lock:
+            row = self._row_by_id.get(facility_id)
+            if row is None:
+                if self._size == len(self._total):
+                    self._grow()
+                row = self._size
+                self._size += 1
+                self._row_by_id[facility_id] = row
+                self.ids.append(facility_id)
+                self.names.append(name)
+                self._total[row] = 0
+                self._occupied[row] = 0
+            else:
+                self.names[row] = name
+
+            for column, label in zip(GROUP_COLUMNS, (city, ward, state)):
+                self._codes[column][row] = self._categories[column].encode(label)
+            for bed_type, beds in (total or {}).items():
+                self._total[row, self._bed_column(bed_type)] = beds
+            for bed_type, beds in (occupied or {}).items():
+                self._occupied[row, self._bed_column(bed_type)] = beds
+            self.updated_at[row] = timestamp
+            return row
+
+    def facility_beds(self, facility_id):
+        """{bed_type: total beds} for one facility"""
+        with self._lock:
+            row = self._row_by_id[facility_id]
+            return dict(zip(self.bed_types, self._total[row].tolist()))
+
+    def update_occupancy(self, facility_id, bed_type, occupied, timestamp=0.0):
+        """Set occupied beds of one type at one facility"""
+        with self._lock:
+            row = self._row_by_id[facility_id]
+            self._occupied[row, self._bed_column(bed_type)] = occupied
+            self.updated_at[row] = timestamp
+
+    def update_occupancy_many(self, facility_ids, bed_types, occupied, timestamp=0.0):
+        """Vectorized occupancy update from parallel sequences"""
+        with self._lock:
+            rows = np.fromiter((self._row_by_id[f] for f in facility_ids), dtype=np.int64, count=len(facility_ids))
+            columns = np.fromiter((self._bed_column(b) for b in bed_types), dtype=np.int64, count=len(bed_types))
+            self._occupied[rows, columns] = occupied
+            self.updated_at[rows] = timestamp
+
+    def _mask(self, city=None, ward=None, state=None):
+        """Boolean row mask for optional group filters (unknown labels match nothing)"""
+        mask = np.ones(self._size, dtype=bool)
+        for column, label in zip(GROUP_COLUMNS, (city, ward, state)):
+            if label is not None:
+                code = self._categories[column].codes.get(label, -1)
+                mask &= self._codes[column][:self._size] == code
+        return mask
+
+    def aggregate(self, by="city", city=None, ward=None, state=None):
+        """
+        Beds per group and bed type as a DataFrame with columns
+        [by, bed_type, total, occupied, available, occupancy].
+        """
+        if by not in GROUP_COLUMNS:
+            raise ValueError(f"by must be one of {', '.join(GROUP_COLUMNS)}")
+        with self._lock:
+            mask = self._mask(city, ward, state)
+            codes = self._codes[by][:self._size][mask]
+            total, occupied = self.total[mask], self.occupied[mask]
+            labels = list(self._categories[by].labels)
+
+        n_groups = len(labels)
+        # One bincount per bed type; rows are groups, columns are bed types
+        group_total = np.stack([np.bincount(codes, weights=total[:, j], minlength=n_groups)
+                                for j in range(len(self.bed_types))], axis=1)
+        group_occupied = np.stack([np.bincount(codes, weights=occupied[:, j], minlength=n_groups)
+                                   for j in range(len(self.bed_types))], axis=1)
+        present = group_total.sum(axis=1) > 0
+
+        import pandas as pd  # Only frame-returning queries need pandas
+        frame = pd.DataFrame({
+            by: np.repeat(np.asarray(labels, dtype=object)[present], len(self.bed_types)),
+            "bed_type": np.tile(self.bed_types, int(present.sum())),
+            "total": group_total[present].ravel().astype(int),
+            "occupied": group_occupied[present].ravel().astype(int)
+        })
+        frame["available"] = frame["total"] - frame["occupied"]
+        frame["occupancy"] = np.where(frame["total"] > 0, frame["occupied"] / frame["total"].clip(lower=1), 0.0)
+        return frame
+
+    def totals(self, city=None, ward=None, state=None):
+        """Overall and per-bed-type totals for the filtered facilities as plain dicts"""
+        with self._lock:
+            mask = self._mask(city, ward, state)
+            total = self.total[mask].sum(axis=0)
+            occupied = self.occupied[mask].sum(axis=0)
+            facilities = int(mask.sum())
+
+        by_type = {
+            bed_type: {"total": int(t), "occupied": int(o), "available": int(t - o)}
+            for bed_type, t, o in zip(self.bed_types, total, occupied)
+        }
+        beds, in_use = int(total.sum()), int(occupied.sum())
+        return {
+            "facilities": facilities,
+            "total": beds,
+            "occupied": in_use,
+            "available": beds - in_use,
+            "occupancy": in_use / beds if beds else 0.0,
+            "by_bed_type": by_type
+        }
+
+    def facility_frame(self, city=None, ward=None, state=None):
+        """One row per facility with total/occupied beds and occupancy rate"""
+        import pandas as pd
+
+        with self._lock:
+            mask = self._mask(city, ward, state)
+            rows = np.flatnonzero(mask)
+            total = self.total[mask].sum(axis=1)
+            occupied = self.occupied[mask].sum(axis=1)
+            frame = pd.DataFrame({
+                "facility_id": [self.ids[r] for r in rows],
+                "name": [self.names[r] for r in rows],
+                "city": [self._categories["city"].labels[c] for c in self._codes["city"][rows]],
+                "ward": [self._categories["ward"].labels[c] for c in self._codes["ward"][rows]],
+                "total": total,
+                "occupied": occupied
+            })
+        frame["occupancy"] = np.where(total > 0, occupied / np.maximum(total, 1), 0.0)
+        return frame
+
+    def summary(self, location, city=None, top_n=10):
+        """
+        Compact text summary for the agents: overall capacity, per-bed-type
+        availability and only the most strained facilities.
+        """
+        totals = self.totals(city=city)
+        if totals["facilities"] == 0:
+            return None
+
+        text = f"Real Hospital Data for {location}:\n"
+        text += f"Total Hospital Capacity: {totals['total']} beds across {totals['facilities']} facilities\n"
+        text += f"Current Occupancy: {totals['occupancy']:.1%}\n"
+        text += f"Available Beds: {totals['available']}\n"
+        text += "Available by bed type: " + ", ".join(
+            f"{bed_type.upper() if len(bed_type) <= 3 else bed_type.title()} {counts['available']}/{counts['total']}"
+            for bed_type, counts in totals["by_bed_type"].items() if counts["total"] > 0
+        ) + "\n\n"
+
+        facilities = self.facility_frame(city=city).sort_values("occupancy", ascending=False)
+        shown = facilities.head(top_n)
+        text += "Individual Hospital Status:\n" if len(facilities) <= top_n else f"Most Strained Hospitals (top {top_n} of {len(facilities)}):\n"
+        for row in shown.itertuples():
+            status = "Critical" if row.occupancy > 0.9 else "High" if row.occupancy > 0.8 else "Moderate"
+            text += f"- {row.name}: {row.occupied}/{row.total} beds occupied ({row.occupancy:.1%}) - {status} capacity\n"
+        return text
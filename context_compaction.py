@@ -0,0 +1,281 @@
+# context_compaction.py
+"""
+Context compaction for Arogya Sentinel's agents
+Reduces verbose tool outputs (raw health records, hospital listings, the
+model's full prediction report) to schema-bound digests of the key numbers,
+flags and top factors before they enter an agent's context, and tallies the
+prompt tokens and estimated LLM latency saved per run
+"""
+
+import math
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from data_sources import is_live_data
+from report_builder import expected_conditions
+
+# Bump when a digest format changes; part of the crew's analysis fingerprint
+COMPACTION_VERSION = "1"
+
+# Prompt processing cost used to turn saved tokens into saved latency (override per deployment)
+PROMPT_MS_PER_1K_TOKENS = float(os.environ.get("AROGYA_PROMPT_MS_PER_1K_TOKENS", "40"))
+
+# The only fields each digest may carry
+DIGEST_SCHEMAS = {
+    "public_health": ("live", "records", "trend", "signals"),
+    "air_quality": ("live", "aqi", "category", "station", "forecast_aqi"),
+    "festival_calendar": ("live", "events", "major"),
+    "hospital": ("live", "occupancy", "occupied", "total", "available", "facilities", "strained"),
+    "prediction": ("surge_percentage", "risk_level", "timeline", "confidence", "key_factors", "conditions")
+}
+
+HEALTH_SIGNALS = ("respiratory", "influenza", "asthma", "dengue", "malaria", "covid", "cardiac", "trauma")
+TRENDS = ("spike", "surge", "increase", "decrease")
+TOP_N = 3
+
+
+def compaction_enabled():
+    """Compaction is bypassed (tools return raw output) when AROGYA_CONTEXT_COMPACTION_DISABLED=1"""
+    return os.environ.get("AROGYA_CONTEXT_COMPACTION_DISABLED") != "1"
+
+
+_encoder = None
+
+
+def estimate_tokens(text):
+    """Prompt tokens for `text`: tiktoken's cl100k count when installed, else about 4 characters per token"""
+    global _encoder
+    if _encoder is None:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding("cl100k_base")
+        except Exception:
+            # Not installed, or its encoding file cannot be downloaded (offline hosts)
+            _encoder = False
+    if _encoder:
+        return len(_encoder.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _number(pattern, text, cast=int):
+    match = re.search(pattern, text, re.IGNORECASE)
+    return cast(match.group(1)) if match else None
+
+
+# --- Digest extraction: tool output text -> schema-bound dict ---
+
+def digest_public_health(text):
+    lower = text.lower()
+    return {
+        "live": is_live_data(text),
+        "records": len(re.findall(r'^\d+\.', text, re.MULTILINE)),
+        "trend": next((trend for trend in TRENDS if trend in lower), "stable"),
+        "signals": [signal for signal in HEALTH_SIGNALS if signal in lower]
+    }
+
+
+def digest_air_quality(text):
+    aqi = re.search(r'AQI(?: in .+? is currently)?\s*(\d+)\s*\(([^)]+)\)', text)
+    station = re.search(r'Nearest monitoring station: (.+?) \(([\d.]+) km\)', text)
+    return {
+        "live": is_live_data(text),
+        "aqi": int(aqi.group(1)) if aqi else None,
+        "category": aqi.group(2) if aqi else None,
+        "station": f"{station.group(1)} ({station.group(2)} km)" if station else None,
+        "forecast_aqi": _number(r'spike to (\d+)', text)
+    }
+
+
+def digest_festival_calendar(text):
+    events = re.findall(r'^- (.+?) \(.*?\) (ongoing|in \d+ days)', text, re.MULTILINE)
+    # Fallback text names one festival in prose
+    events = events or re.findall(r'([A-Z][\w ]+?) celebrations .*?(in \d+ days)', text)
+    return {
+        "live": is_live_data(text),
+        "events": [f"{name} {timing}" for name, timing in events[:TOP_N]],
+        "major": "Major festival" in text or (not is_live_data(text) and "festival" in text.lower())
+    }
+
+
+def digest_hospital(text):
+    strained = re.findall(r'^- (.+?): (\d+)/(\d+) beds occupied \(([\d.]+)%\)', text, re.MULTILINE)
+    occupancy = _number(r'(?:Current Occupancy:|capacity at)\s*([\d.]+)%', text, float)
+    total = _number(r'Total Hospital Capacity: (\d+) beds', text)
+    available = _number(r'Available Beds: (\d+)', text)
+    if available is None:
+        available = _number(r'(\d+) beds available', text)
+    return {
+        "live": is_live_data(text),
+        "occupancy": occupancy,
+        "occupied": total - available if total is not None and available is not None else None,
+        "total": total,
+        "available": available,
+        "facilities": _number(r'across (\d+) facilities', text),
+        "strained": [f"{name} {float(pct):.0f}%" for name, _, _, pct in strained[:TOP_N]]
+    }
+
+
+def digest_prediction(result):
+    """Digest of a predict_surge / predict_from_features result dict"""
+    return {
+        "surge_percentage": round(float(result["surge_percentage"]), 1),
+        "risk_level": result["risk_level"],
+        "timeline": result["timeline"],
+        "confidence": result["confidence"],
+        "key_factors": list(result["key_factors"])[:TOP_N],
+        "conditions": expected_conditions(result["key_factors"])[:TOP_N]
+    }
+
+
+DIGESTERS = {
+    "public_health": digest_public_health,
+    "air_quality": digest_air_quality,
+    "festival_calendar": digest_festival_calendar,
+    "hospital": digest_hospital,
+    "prediction": digest_prediction
+}
+
+
+def digest(kind, output):
+    """Schema-bound digest of one tool output; ValueError if an extractor strays from its schema"""
+    values = DIGESTERS[kind](output)
+    if tuple(values) != DIGEST_SCHEMAS[kind]:
+        raise ValueError(f"{kind} digest fields {tuple(values)} do not match schema {DIGEST_SCHEMAS[kind]}")
+    return values
+
+
+# --- Digest text: what the next agent sees. Keeps the phrases the model's text parser reads ---
+
+def _source_tag(values):
+    return "live" if values["live"] else "fallback"
+
+
+def format_digest(kind, values):
+    if kind == "public_health":
+        signals = ", ".join(values["signals"]) or "no specific conditions"
+        records = f", {values['records']} records" if values["records"] else ""
+        return f"Public health ({_source_tag(values)}{records}): {values['trend']} in {signals}"
+    if kind == "air_quality":
+        if values["aqi"] is None:
+            return f"Air quality ({_source_tag(values)}): no AQI reading"
+        text = f"Air quality ({_source_tag(values)}): AQI {values['aqi']} ({values['category']})"
+        if values["station"]:
+            text += f"; station {values['station']}"
+        if values["forecast_aqi"]:
+            text += f"; forecast spike to AQI {values['forecast_aqi']}"
+        return text
+    if kind == "festival_calendar":
+        events = ", ".join(values["events"]) or "none in the next 30 days"
+        impact = ("; major festival: large gatherings, increased air pollution from fireworks (respiratory risk)"
+                  if values["major"] else "")
+        return f"Festivals ({_source_tag(values)}): {events}{impact}"
+    if kind == "hospital":
+        if values["occupancy"] is None:
+            return f"Hospitals ({_source_tag(values)}): no capacity data"
+        text = f"Hospitals ({_source_tag(values)}): occupancy {values['occupancy']:.0f}%"
+        if values["occupied"] is not None:
+            # City totals, not "N beds occupied": the model reads that phrase as baseline admissions
+            text += (f" ({values['occupied']}/{values['total']} beds in use, {values['available']} available"
+                     f" across {values['facilities']} facilities)")
+        elif values["available"] is not None:
+            text += f", {values['available']} beds available"
+        if values["strained"]:
+            text += f"; most strained: {', '.join(values['strained'])}"
+        return text
+    if kind == "prediction":
+        # Line labels match report_builder.parse_prediction, so the planning tool reads digests too
+        factors = "\n".join(f"  • {factor}" for factor in values["key_factors"]) or "  • Minimal risk factors detected"
+        return (f"ML SURGE FORECAST (confidence {values['confidence']}%):\n"
+                f"Predicted Surge Magnitude: {values['surge_percentage']:.1f}% increase in admissions\n"
+                f"Risk Level: {values['risk_level']}\n"
+                f"Expected Timeline: {values['timeline']}\n"
+                f"KEY RISK FACTORS IDENTIFIED:\n{factors}\n\n"
+                f"Expected conditions: {'; '.join(values['conditions'])}")
+    raise ValueError(f"Unknown digest kind '{kind}'")
+
+
+# --- Per-run accounting ---
+
+class CompactionLedger:
+    """Raw and digest token counts for every compacted output in one run"""
+
+    def __init__(self):
+        self.entries = []
+        self._lock = threading.Lock()
+
+    def record(self, kind, raw_tokens, digest_tokens, seconds):
+        with self._lock:
+            self.entries.append({"kind": kind, "raw_tokens": raw_tokens, "digest_tokens": digest_tokens,
+                                 "seconds": seconds})
+
+    def report(self, ms_per_1k_tokens=None):
+        """
+        {'calls', 'raw_tokens', 'digest_tokens', 'saved_tokens', 'saved_fraction',
+        'compaction_ms', 'estimated_latency_saved_ms', 'by_kind'}. Latency saved is
+        the saved prompt tokens at `ms_per_1k_tokens`, less the time spent compacting.
+        """
+        ms_per_1k_tokens = PROMPT_MS_PER_1K_TOKENS if ms_per_1k_tokens is None else ms_per_1k_tokens
+        with self._lock:
+            entries = list(self.entries)
+        by_kind = {}
+        for entry in entries:
+            kind = by_kind.setdefault(entry["kind"], {"calls": 0, "raw_tokens": 0, "digest_tokens": 0})
+            kind["calls"] += 1
+            kind["raw_tokens"] += entry["raw_tokens"]
+            kind["digest_tokens"] += entry["digest_tokens"]
+        raw = sum(entry["raw_tokens"] for entry in entries)
+        compacted = sum(entry["digest_tokens"] for entry in entries)
+        compaction_ms = sum(entry["seconds"] for entry in entries) * 1000
+        return {
+            "calls": len(entries),
+            "raw_tokens": raw,
+            "digest_tokens": compacted,
+            "saved_tokens": raw - compacted,
+            "saved_fraction": (raw - compacted) / raw if raw else 0.0,
+            "compaction_ms": compaction_ms,
+            "estimated_latency_saved_ms": (raw - compacted) / 1000 * ms_per_1k_tokens - compaction_ms,
+            "by_kind": by_kind
+        }
+
+
+current_ledger = ContextVar("current_ledger", default=None)
+
+
+@contextmanager
+def compaction_ledger():
+    """Collect compaction statistics for tool calls made in this context (and threads that copy it)"""
+    ledger = CompactionLedger()
+    token = current_ledger.set(ledger)
+    try:
+        yield ledger
+    finally:
+        current_ledger.reset(token)
+
+
+def compact(kind, output, raw_text=None):
+    """
+    Digest text for a tool output (a string, or a prediction result dict for
+    kind 'prediction'), recorded in the current run's ledger. Returns the raw
+    text unchanged when compaction is disabled.
+    """
+    start = time.perf_counter()
+    if raw_text is None:
+        raw_text = output
+    if not compaction_enabled():
+        return raw_text
+    text = format_digest(kind, digest(kind, output))
+    ledger = current_ledger.get()
+    if ledger is not None:
+        ledger.record(kind, estimate_tokens(raw_text), estimate_tokens(text), time.perf_counter() - start)
+    return text
+
+
+def format_compaction_report(report):
+    """One-line summary of a CompactionLedger report"""
+    return (f"🗜️  Context compaction: {report['raw_tokens']} -> {report['digest_tokens']} tokens over "
+            f"{report['calls']} tool outputs ({report['saved_fraction']:.0%} saved, about "
+            f"{report['estimated_latency_saved_ms']:.0f} ms less prompt processing)")
@@ -0,0 +1,461 @@
+# crew_benchmark.py
+"""
+Offline end-to-end benchmark for the Arogya Sentinel crew
+Runs the full four-agent crew against a deterministic local fake LLM
+(scripted tool calls, configurable delay) and stubbed data backends, and
+records per-agent, per-tool and per-model-step timings plus memory across
+iterations, so framework overhead can be measured apart from OpenAI and
+network latency and regressions caught offline
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+import data_prefetch
+from context_compaction import compaction_ledger
+
+# Canned backend outputs shaped like the live fetchers' answers
+STUB_OUTPUTS = {
+    "public_health": (
+        "Real Health Data for {argument}:\n"
+        "1. {{'state': 'Maharashtra', 'disease': 'Influenza-like illness', 'cases': 441, 'week': 41, 'trend': 'increase'}}...\n"
+        "2. {{'state': 'Maharashtra', 'disease': 'Acute respiratory infection', 'cases': 1290, 'week': 41}}...\n"
+        "3. {{'state': 'Maharashtra', 'disease': 'Dengue', 'cases': 97, 'week': 41}}...\n"
+    ),
+    "air_quality": (
+        "Real AQI Data for {argument}: AQI 182 (Unhealthy). Nearest monitoring station: Bandra Kurla Complex - MPCB "
+        "(2.1 km). Forecast: Monitor for potential health impacts, especially for sensitive groups."
+    ),
+    "festival_calendar": (
+        "Real Festival Data for {argument} (India):\n"
+        "- Navratri (Navratri) ongoing (2026-10-11, 9-day festival)\n"
+        "- Diwali (Diwali) in 18 days (2026-11-06, 5-day festival)\n\n"
+        "Health Impact: Major festival detected - expect increased air pollution from fireworks, large gatherings, "
+        "and potential respiratory issues."
+    ),
+    "hospital": (
+        "Real Hospital Data for {argument}:\n"
+        "Total Hospital Capacity: 3284 beds across 5 facilities\n"
+        "Current Occupancy: 84.1%\n"
+        "Available Beds: 522\n"
+        "Available by bed type: General 420/2627, HDU 40/263, ICU 38/263, Ventilator 24/131\n\n"
+        "Individual Hospital Status:\n"
+        "- Tata Memorial Hospital: 566/628 beds occupied (90.1%) - Critical capacity\n"
+        "- Hinduja Hospital: 330/375 beds occupied (88.0%) - High capacity\n"
+        "- KEM Hospital: 1510/1800 beds occupied (83.9%) - High capacity\n"
+        "- Lilavati Hospital: 250/323 beds occupied (77.4%) - Moderate capacity\n"
+        "- Breach Candy Hospital: 106/158 beds occupied (67.1%) - Moderate capacity\n"
+    )
+}
+
+# Tool names as registered in main.py, per source
+SOURCE_TOOLS = {
+    "public_health": "Public Health Data Tool",
+    "air_quality": "Air Quality Data Tool",
+    "festival_calendar": "Festival Calendar Tool",
+    "hospital": "Hospital Data Tool"
+}
+
+
+class BenchmarkRecorder:
+    """Thread-safe timing and memory samples for one benchmark run"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.current_agent = None
+        self.iteration = 0
+        self.llm_steps = []
+        self.tools = []
+        self.backends = []
+        self.agents = []
+        self.iterations = []
+
+    def add(self, kind, **sample):
+        with self._lock:
+            getattr(self, kind).append(dict(sample, iteration=self.iteration))
+
+
+# --- Deterministic fake LLM ---
+
+def _context(prompt):
+    match = re.search(r"This is the context you're working with:\n(.*?)\n+Begin!", prompt, re.S)
+    return match.group(1).strip() if match else ""
+
+
+def _observations(messages):
+    """Tool results so far: one per assistant turn, without the tool list CrewAI re-appends every few uses"""
+    observations = []
+    for message in messages:
+        if message.get("role") == "assistant" and "\nObservation:" in message["content"]:
+            observation = message["content"].split("\nObservation:", 1)[1]
+            observations.append(re.split(r"\n+You ONLY have access to the following tools", observation)[0].strip())
+    return observations
+
+
+def crew_script(location):
+    """
+    Agent role -> (tool calls, final answer builder). Each tool call is
+    (tool name, argument builder); builders get (task context, observations).
+    """
+    return {
+        "Senior Public Health Data Analyst": (
+            [(SOURCE_TOOLS["public_health"], lambda ctx, obs: {"topic": f"{location} disease surveillance"})]
+            + [(SOURCE_TOOLS[source], lambda ctx, obs: {"location": location})
+               for source in ("air_quality", "festival_calendar", "hospital")],
+            lambda ctx, obs: "\n".join(obs)
+        ),
+        "Healthcare Predictive Modeling Specialist": (
+            [("Surge Prediction Model Tool", lambda ctx, obs: {"data_summary": ctx})],
+            lambda ctx, obs: obs[-1]
+        ),
+        "Hospital Operations Manager": (
+            [("Resource Planning Tool", lambda ctx, obs: {"surge_prediction": ctx})],
+            lambda ctx, obs: obs[-1]
+        ),
+        "Public and Internal Communications Chief": (
+            [("Communication Drafting Tool", lambda ctx, obs: {"plan": ctx, "prediction": ctx})],
+            lambda ctx, obs: obs[-1]
+        )
+    }
+
+
+def scripted_response(script, messages):
+    """
+    The ReAct-format reply for a conversation: the calling agent is found by
+    its role in the prompt, and its next step by how many tool observations
+    the conversation already holds
+    """
+    prompt = "\n".join(m["content"] for m in messages)
+    role = next((role for role in script if f"You are {role}" in prompt), None)
+    if role is None:
+        return role, "Thought: I now know the final answer\nFinal Answer: No scripted response for this agent."
+    calls, final = script[role]
+    context, observations = _context(prompt), _observations(messages)
+    if len(observations) < len(calls):
+        tool_name, arguments = calls[len(observations)]
+        return role, (f"Thought: I should use the {tool_name}.\nAction: {tool_name}\n"
+                      f"Action Input: {json.dumps(arguments(context, observations))}")
+    return role, f"Thought: I now know the final answer\nFinal Answer: {final(context, observations)}"
+
+
+def make_fake_llm(location="Mumbai", delay=0.0, recorder=None):
+    """
+    A CrewAI LLM that answers from crew_script() after `delay` seconds per
+    call, recording each call as a model step
+    """
+    from typing import Any
+
+    from crewai import BaseLLM
+
+    class FakeLLM(BaseLLM):
+        script: Any = None
+        delay: float = 0.0
+        recorder: Any = None
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None, **kwargs):
+            start = time.perf_counter()
+            if isinstance(messages, str):
+                messages = [{"role": "user", "content": messages}]
+            role, reply = scripted_response(self.script, messages)
+            if self.delay:
+                time.sleep(self.delay)
+            if self.recorder is not None:
+                self.recorder.current_agent = role
+                self.recorder.add("llm_steps", agent=role, prompt_chars=sum(len(m["content"]) for m in messages),
+                                  seconds=time.perf_counter() - start)
+            return reply
+
+        def supports_function_calling(self):
+            return False
+
+        def supports_stop_words(self):
+            return True
+
+        def get_context_window_size(self):
+            return 128_000
+
+    return FakeLLM(model="fake-llm", script=crew_script(location), delay=delay, recorder=recorder)
+
+
+# --- Stubbed backends and instrumentation ---
+
+@contextmanager
+def stub_backends(delay=0.0, recorder=None, outputs=None):
+    """
+    Replace the data fetchers used by the prefetch stage (and the tools'
+    live fallbacks, once main is loaded) with canned, timed stubs
+    """
+    main = sys.modules.get("main")
+    outputs = dict(STUB_OUTPUTS, **(outputs or {}))
+    main_names = {"public_health": "fetch_public_health_data", "air_quality": "fetch_air_quality_data",
+                  "festival_calendar": "fetch_festival_calendar", "hospital": "fetch_hospital_data"}
+
+    def stub(source):
+        def fetch(argument):
+            start = time.perf_counter()
+            if delay:
+                time.sleep(delay)
+            if recorder is not None:
+                recorder.add("backends", source=source, seconds=time.perf_counter() - start)
+            return outputs[source].format(argument=argument)
+        return fetch
+
+    originals = dict(data_prefetch.DATA_SOURCES), {name: getattr(main, name) for name in main_names.values()
+                                                   if main is not None}
+    try:
+        for source, name in main_names.items():
+            data_prefetch.DATA_SOURCES[source] = stub(source)
+            if main is not None:
+                setattr(main, name, data_prefetch.DATA_SOURCES[source])
+        yield
+    finally:
+        data_prefetch.DATA_SOURCES.update(originals[0])
+        for name, function in originals[1].items():
+            setattr(main, name, function)
+
+
+def instrument_crew(crew, recorder):
+    """
+    Time every tool call and task of a crew. Tool objects can be shared
+    module globals, so the returned function undoes the wrapping.
+    """
+    restore = []
+    for agent in crew.agents:
+        for tool in agent.tools:
+            attribute = "func" if getattr(tool, "func", None) is not None else "_run"
+            original = getattr(tool, attribute)
+
+            def timed(*args, _original=original, _name=tool.name, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    recorder.add("tools", tool=_name, agent=recorder.current_agent,
+                                 seconds=time.perf_counter() - start)
+
+            object.__setattr__(tool, attribute, timed)
+            restore.append((tool, attribute, original))
+
+    marks = {"last": None}
+    for task in crew.tasks:
+        original_callback = task.callback
+
+        def finished(output, _callback=original_callback, _role=task.agent.role):
+            now = time.perf_counter()
+            recorder.add("agents", agent=_role, seconds=now - marks["last"])
+            marks["last"] = now
+            if _callback is not None:
+                _callback(output)
+
+        task.callback = finished
+
+    def start():
+        marks["last"] = time.perf_counter()
+
+    def undo():
+        for tool, attribute, original in restore:
+            object.__setattr__(tool, attribute, original)
+
+    return start, undo
+
+
+def _rss_mb():
+    """Current resident set size in MiB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+# --- Benchmark ---
+
+def run_benchmark(iterations=20, location="Mumbai", llm_delay=0.0, tool_delay=0.0, warmup=1, trace_memory=False):
+    """
+    Run prefetch + crew kickoff `iterations` times (after `warmup` untimed
+    runs) and return summarize_benchmark()'s report. trace_memory adds
+    tracemalloc current/peak per iteration at some cost to timings.
+    """
+    import main
+
+    if trace_memory:
+        import tracemalloc
+        tracemalloc.start()
+
+    recorder = BenchmarkRecorder()
+    main.get_ml_model()  # Model loading is not part of a crew run
+    previous_llm = main._llm
+    main._llm = make_fake_llm(location, delay=llm_delay, recorder=recorder)
+    try:
+        crew = main.build_crew(location)
+        for agent in crew.agents:
+            agent.verbose = False
+        crew.verbose = False
+        start_clock, undo = instrument_crew(crew, recorder)
+        try:
+            with stub_backends(delay=tool_delay, recorder=recorder):
+                for i in range(warmup + iterations):
+                    recorder.iteration = i - warmup
+                    start = time.perf_counter()
+                    prefetch = data_prefetch.prefetch_data_sources(location)
+                    prefetch_seconds = time.perf_counter() - start
+                    start_clock()
+                    with compaction_ledger() as ledger:
+                        crew.kickoff()
+                    sample = {
+                        "seconds": time.perf_counter() - start, "prefetch_seconds": prefetch_seconds,
+                        "rss_mb": _rss_mb(), "prompt_tokens_saved": ledger.report()["saved_tokens"]
+                    }
+                    if trace_memory:
+                        current, peak = tracemalloc.get_traced_memory()
+                        sample.update(traced_mb=current / 2 ** 20, traced_peak_mb=peak / 2 ** 20)
+                        tracemalloc.reset_peak()
+                    recorder.add("iterations", **sample)
+                    data_prefetch.prefetched_data.clear(location)
+                    del prefetch
+        finally:
+            undo()
+    finally:
+        main._llm = previous_llm
+        if trace_memory:
+            tracemalloc.stop()
+
+    return summarize_benchmark(recorder, llm_delay=llm_delay, tool_delay=tool_delay)
+
+
+def _stats(values):
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return {"count": 0, "total": 0.0, "mean": 0.0, "p50": 0.0, "p95": 0.0}
+    return {"count": int(len(values)), "total": float(values.sum()), "mean": float(values.mean()),
+            "p50": float(np.percentile(values, 50)), "p95": float(np.percentile(values, 95))}
+
+
+def _group(samples, key):
+    groups = {}
+    for sample in samples:
+        groups.setdefault(sample[key], []).append(sample["seconds"])
+    return {name: _stats(seconds) for name, seconds in groups.items()}
+
+
+def summarize_benchmark(recorder, llm_delay=0.0, tool_delay=0.0):
+    """
+    {'iterations', 'iteration' (stats), 'prefetch', 'agents' (stats plus model,
+    tool and framework overhead seconds per run), 'tools', 'backends',
+    'model_steps', 'memory' (rss per iteration and growth per iteration)}.
+    Warm-up samples (negative iteration numbers) are left out.
+    """
+    def timed(samples):
+        return [sample for sample in samples if sample["iteration"] >= 0]
+
+    iterations = timed(recorder.iterations)
+    runs = max(len(iterations), 1)
+    llm_steps, tools = timed(recorder.llm_steps), timed(recorder.tools)
+    agents = _group(timed(recorder.agents), "agent")
+    for role, stats in agents.items():
+        model = sum(s["seconds"] for s in llm_steps if s["agent"] == role) / runs
+        tool = sum(s["seconds"] for s in tools if s["agent"] == role) / runs
+        stats.update(model_seconds=model, tool_seconds=tool, steps=sum(s["agent"] == role for s in llm_steps) / runs,
+                     overhead_seconds=stats["mean"] - model - tool)
+
+    rss = [sample["rss_mb"] for sample in iterations]
+    memory = {"rss_mb": rss, "growth_mb_per_iteration": float(np.polyfit(np.arange(len(rss)), rss, 1)[0])
+              if len(rss) > 1 else 0.0}
+    if iterations and "traced_mb" in iterations[0]:
+        memory["traced_mb"] = [sample["traced_mb"] for sample in iterations]
+        memory["traced_peak_mb"] = max(sample["traced_peak_mb"] for sample in iterations)
+
+    return {
+        "iterations": len(iterations),
+        "llm_delay": llm_delay,
+        "tool_delay": tool_delay,
+        "iteration": _stats([sample["seconds"] for sample in iterations]),
+        "prefetch": _stats([sample["prefetch_seconds"] for sample in iterations]),
+        "agents": agents,
+        "tools": _group(tools, "tool"),
+        "backends": _group(timed(recorder.backends), "source"),
+        "model_steps": _stats([s["seconds"] for s in llm_steps]),
+        "model_steps_per_iteration": len(llm_steps) / runs,
+        "prompt_chars_per_iteration": sum(s["prompt_chars"] for s in llm_steps) / runs,
+        "memory": memory
+    }
+
+
+def format_benchmark(report):
+    ms = 1000
+    lines = [
+        f"🏁 Crew benchmark: {report['iterations']} iterations, fake LLM delay {report['llm_delay'] * ms:.0f} ms, "
+        f"backend delay {report['tool_delay'] * ms:.0f} ms",
+        f"   Iteration: mean {report['iteration']['mean'] * ms:.1f} ms, p95 {report['iteration']['p95'] * ms:.1f} ms "
+        f"(prefetch {report['prefetch']['mean'] * ms:.1f} ms)",
+        f"   Model steps per iteration: {report['model_steps_per_iteration']:.0f} "
+        f"({report['prompt_chars_per_iteration']:,.0f} prompt characters)",
+        "",
+        "   Agent                                       mean ms   model ms   tools ms   overhead ms",
+    ]
+    for role, stats in report["agents"].items():
+        lines.append(f"   {role:<42} {stats['mean'] * ms:>8.1f} {stats['model_seconds'] * ms:>10.1f} "
+                     f"{stats['tool_seconds'] * ms:>10.1f} {stats['overhead_seconds'] * ms:>13.1f}")
+    lines += ["", "   Tool                                        calls   mean ms    p95 ms"]
+    for name, stats in sorted(report["tools"].items(), key=lambda item: -item[1]["mean"]):
+        lines.append(f"   {name:<42} {stats['count']:>6} {stats['mean'] * ms:>9.2f} {stats['p95'] * ms:>9.2f}")
+    memory = report["memory"]
+    if memory["rss_mb"]:
+        lines += ["", f"   Memory: RSS {memory['rss_mb'][0]:.1f} -> {memory['rss_mb'][-1]:.1f} MiB "
+                      f"({memory['growth_mb_per_iteration'] * 1024:+.0f} KiB per iteration)"]
+    if "traced_peak_mb" in memory:
+        lines.append(f"   Python heap: {memory['traced_mb'][-1]:.1f} MiB after last iteration, "
+                     f"peak {memory['traced_peak_mb']:.1f} MiB")
+    return "\n".join(lines)
+
+
+def compare_to_baseline(report, baseline, tolerance=0.25):
+    """Regressions (name, baseline ms, current ms) where mean time grew by more than `tolerance`"""
+    checks = [("iteration", baseline["iteration"]["mean"], report["iteration"]["mean"])]
+    checks += [(f"agent overhead: {role}", stats["overhead_seconds"], report["agents"][role]["overhead_seconds"])
+               for role, stats in baseline["agents"].items() if role in report["agents"]]
+    checks += [(f"tool: {name}", stats["mean"], report["tools"][name]["mean"])
+               for name, stats in baseline["tools"].items() if name in report["tools"]]
+    return [(name, old * 1000, new * 1000) for name, old, new in checks
+            if new > old * (1 + tolerance) and new - old > 0.001]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the crew offline with a fake LLM and stubbed data")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--location", default="Mumbai")
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="Seconds per fake model call")
+    parser.add_argument("--tool-delay", type=float, default=0.0, help="Seconds per stubbed backend fetch")
+    parser.add_argument("--trace-memory", action="store_true", help="Also track the Python heap with tracemalloc")
+    parser.add_argument("--save", help="Write the report as JSON (e.g. a baseline)")
+    parser.add_argument("--baseline", help="Compare with a saved report; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    # Every iteration must run the agents: no stored analyses, no cached completions
+    os.environ["AROGYA_ANALYSIS_CACHE_DISABLED"] = "1"
+    os.environ["AROGYA_LLM_CACHE_DISABLED"] = "1"
+    report = run_benchmark(args.iterations, args.location, args.llm_delay, args.tool_delay,
+                           trace_memory=args.trace_memory)
+    print(format_benchmark(report))
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), args.tolerance)
+        for name, old, new in regressions:
+            print(f"❌ {name}: {old:.1f} ms -> {new:.1f} ms")
+        if regressions:
+            sys.exit(1)
+        print(f"✅ No regressions beyond {args.tolerance:.0%} of the baseline")
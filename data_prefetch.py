@@ -0,0 +1,155 @@
+# data_prefetch.py
+"""
+Concurrent prefetch stage for the Data Fusion agent
+Fetches every external data source at once with asyncio before the crew
+starts, so the agent's tools answer from memory and data gathering takes as
+long as the slowest source instead of the sum of all of them
+"""
+
+import asyncio
+import threading
+import time
+from contextvars import copy_context
+
+from data_sources import (
+    fetch_public_health_data,
+    fetch_air_quality_data,
+    fetch_festival_calendar,
+    fetch_hospital_data
+)
+from location_registry import normalize_name
+from progress_events import SOURCE_COMPLETED, STAGE_COMPLETED, STAGE_STARTED, emit
+
+# Source name -> fetcher; public health takes a topic, the rest a location
+DATA_SOURCES = {
+    "public_health": fetch_public_health_data,
+    "air_quality": fetch_air_quality_data,
+    "festival_calendar": fetch_festival_calendar,
+    "hospital": fetch_hospital_data
+}
+
+
+class PrefetchedData:
+    """Thread-safe holder for prefetched source outputs, one result set per location"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._by_location = {}
+
+    def store(self, location, results):
+        with self._lock:
+            self._by_location[location] = dict(results)
+
+    def clear(self, location=None):
+        with self._lock:
+            if location is None:
+                self._by_location.clear()
+            else:
+                self._by_location.pop(location, None)
+
+    def lookup(self, source, argument):
+        """
+        Prefetched output for a tool call, or None to fetch live.
+        Location-based tools only reuse data fetched for the location named
+        in their argument: an exact (normalized) match first, otherwise the
+        longest stored location contained in it as whole words, so
+        "Navi Mumbai" never picks up Mumbai's data. The public health tool's
+        free-text topic reuses the prefetch of the location it mentions, or
+        the only stored one.
+        """
+        wanted = normalize_name(argument)
+        with self._lock:
+            names = {normalize_name(location): results for location, results in self._by_location.items()}
+            results = names.get(wanted)
+            if results is None:
+                contained = [name for name in names if name and f" {name} " in f" {wanted} "]
+                if contained:
+                    results = names[max(contained, key=len)]
+            if results is None and source == "public_health" and len(self._by_location) == 1:
+                results = next(iter(self._by_location.values()))
+            if results is None:
+                return None
+            result = results.get(source)
+            if result is None or result["error"] is not None:
+                return None
+            return result["output"]
+
+
+# Shared store consulted by the tools in main.py
+prefetched_data = PrefetchedData()
+
+
+async def _fetch(source, argument, timeout):
+    fetcher = DATA_SOURCES[source]
+    start = time.perf_counter()
+    try:
+        output = await asyncio.wait_for(asyncio.to_thread(fetcher, argument), timeout)
+        error = None
+    except Exception as e:
+        output, error = None, f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+    emit(SOURCE_COMPLETED, "data_collection", source=source, argument=argument,
+         ok=error is None, error=error, elapsed=elapsed)
+    return source, {"output": output, "error": error, "elapsed": elapsed}
+
+
+async def prefetch_all(location, topic=None, timeout=30, shared=None, sources=None):
+    """
+    Fire sources concurrently (all of them unless `sources` names a subset)
+    and gather {source: {output, error, elapsed}}. Results in `shared`
+    (fetched once for several locations) are reused instead of fetched.
+    """
+    shared = shared or {}
+    topic = topic or f"{location} disease surveillance"
+    arguments = {source: location for source in (sources or DATA_SOURCES) if source not in shared}
+    if "public_health" in arguments:
+        arguments["public_health"] = topic
+    results = await asyncio.gather(*(_fetch(s, arguments[s], timeout) for s in arguments))
+    return dict(shared, **dict(results))
+
+
+def _run(coroutine):
+    """Run a coroutine to completion, on a helper thread if this thread already has a loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coroutine)
+    # Already inside an event loop (e.g. a notebook)
+    holder = {}
+    worker = threading.Thread(target=copy_context().run,
+                              args=(lambda: holder.update(result=asyncio.run(coroutine)),))
+    worker.start()
+    worker.join()
+    return holder["result"]
+
+
+def source_outputs(sources):
+    """Per-source output text, or 'error: ...' for failed sources, from prefetch results"""
+    return {name: result["output"] if result["output"] is not None else f"error: {result['error']}"
+            for name, result in sources.items()}
+
+
+def prefetch_data_sources(location, topic=None, timeout=30, store=prefetched_data, shared=None):
+    """
+    Synchronous entry point: prefetch every source for a location and load the
+    results into the shared store. Returns the per-source results plus total
+    wall time under the 'wall_time' key.
+    """
+    start = time.perf_counter()
+    emit(STAGE_STARTED, "data_collection", location=location,
+         sources=[source for source in DATA_SOURCES if source not in (shared or {})])
+    results = _run(prefetch_all(location, topic, timeout, shared))
+    store.store(location, results)
+    wall_time = time.perf_counter() - start
+    emit(STAGE_COMPLETED, "data_collection", location=location, wall_time=wall_time,
+         failed=[source for source, result in results.items() if result["error"] is not None])
+    return {"sources": results, "wall_time": wall_time}
+
+
+# Sources whose answer does not depend on the location (national public health feed)
+LOCATION_INDEPENDENT_SOURCES = ["public_health"]
+
+
+def prefetch_shared_sources(topic="disease surveillance", timeout=30):
+    """Fetch the location-independent sources once, to pass as `shared` for many locations"""
+    return _run(prefetch_all("", topic, timeout, sources=LOCATION_INDEPENDENT_SOURCES))
@@ -0,0 +1,373 @@
+# data_sources.py
+"""
+External data source fetchers for Arogya Sentinel
+Plain functions behind the Data Fusion agent's tools, so they can also be
+called directly (e.g. by the concurrent prefetch stage) without CrewAI
+"""
+
+import os
+import random
+import threading
+import time
+from datetime import date
+
+from capacity_store import CapacityStore
+from festival_calendar import FestivalCalendar
+from fhir_ingest import ingest_fhir
+from hedged_fetch import HedgedFetcher
+from http_client import http_client
+from location_registry import get_location_registry
+from source_cache import SOURCE_TTLS, cached_call, cached_source
+
+def is_live_data(output):
+    """True unless a fetcher fell back to canned data; fallbacks are never cached"""
+    return "Using fallback data" not in output
+
+def get_public_holidays(year, country="IN"):
+    """
+    Nager.Date public holidays for one year, cached on disk since the list
+    changes about once a year. Returns None when the API is unavailable and
+    nothing is cached.
+    """
+    def fetch():
+        response = http_client.get(f"https://date.nager.at/api/v3/PublicHolidays/{year}/{country}", source="nager_date")
+        response.raise_for_status()
+        return response.json()
+    
+    try:
+        return cached_call("public_holidays", {"year": year, "country": country}, fetch)
+    except Exception as e:
+        print(f"Error fetching public holidays: {str(e)}")
+        return None
+
+_festival_calendar = None
+_festival_calendar_lock = threading.Lock()
+
+def get_festival_calendar():
+    """Shared festival calendar index, backed by cached Nager.Date holidays"""
+    global _festival_calendar
+    with _festival_calendar_lock:
+        if _festival_calendar is None:
+            # Keep holidays served by a mock server out of the real persisted calendar
+            store_dir = os.path.join("calendar_data", "mock") if os.environ.get("AROGYA_MOCK_SERVER") else "calendar_data"
+            _festival_calendar = FestivalCalendar(fetch_holidays=get_public_holidays, store_dir=store_dir)
+        return _festival_calendar
+
+@cached_source("public_health", is_valid=is_live_data)
+def fetch_public_health_data(topic: str) -> str:
+    """
+    A tool to fetch real-time public health data from India's Open Government Data Platform.
+    Connects to data.gov.in APIs from the Ministry of Health and Family Welfare.
+    """
+    print(f"Data Fusion Agent: Fetching public health data for '{topic}'...")
+    
+    try:
+        # India's Open Government Data Platform - Health datasets
+        # Example: Disease surveillance data
+        base_url = "https://api.data.gov.in/resource"
+        
+        # Sample endpoints for different health topics
+        endpoints = {
+            "disease_surveillance": "9ef84268-d588-465a-a308-a864a43d0070",  # Disease surveillance
+            "hospital_statistics": "bed-availability-and-occupancy-in-hospitals-statewise",
+            "health_infrastructure": "health-infrastructure-statistics"
+        }
+        
+        # Try to fetch disease surveillance data
+        api_key = "579b464db66ec23bdd000001cdd3946e44ce4aad7209ff7b23ac571b"  # Sample public key
+        endpoint = endpoints.get("disease_surveillance", endpoints["hospital_statistics"])
+        
+        url = f"{base_url}/{endpoint}"
+        params = {
+            "api-key": api_key,
+            "format": "json",
+            "limit": 10
+        }
+        
+        response = http_client.get(url, params=params, source="data.gov.in")
+        
+        if response.status_code == 200:
+            data = response.json()
+            if data.get("records"):
+                # Process the real data
+                records = data["records"][:3]  # Get first 3 records
+                health_summary = f"Real Health Data for {topic}:\n"
+                for i, record in enumerate(records, 1):
+                    health_summary += f"{i}. {str(record)[:100]}...\n"
+                return health_summary
+            else:
+                return f"No recent health data available for {topic}. Using fallback data: Minor increase in respiratory illnesses reported in Mumbai area."
+        else:
+            return f"API Error (Status {response.status_code}): Using fallback data - Minor increase in influenza-like illnesses reported in Mumbai suburbs."
+            
+    except Exception as e:
+        print(f"Error fetching health data: {str(e)}")
+        return f"Connection Error: Using fallback data - Minor increase in influenza-like illnesses reported in Mumbai suburbs. No major epidemic alerts."
+
+def aqi_category(aqi_value):
+    """US EPA category name for an AQI value"""
+    if aqi_value <= 50:
+        return "Good"
+    elif aqi_value <= 100:
+        return "Moderate"
+    elif aqi_value <= 150:
+        return "Unhealthy for Sensitive Groups"
+    elif aqi_value <= 200:
+        return "Unhealthy"
+    elif aqi_value <= 300:
+        return "Very Unhealthy"
+    return "Hazardous"
+
+def query_google_air_quality(location, place, station, station_note):
+    """Google Air Quality API at the place's coordinates; None without a usable answer"""
+    google_api_key = os.environ.get("GOOGLE_MAPS_API_KEY")
+    google_url = "https://airquality.googleapis.com/v1/currentConditions:lookup"
+    payload = {
+        "location": {
+            "latitude": place["lat"],
+            "longitude": place["lon"]
+        }
+    }
+    
+    headers = {"Content-Type": "application/json"}
+    response = http_client.post(
+        f"{google_url}?key={google_api_key}",
+        headers=headers,
+        json=payload,
+        source="google_air_quality",
+        max_retries=0  # The hedge races WAQI instead of retrying
+    )
+    
+    if response.status_code != 200:
+        return None
+    index = response.json().get("indexes", [{}])[0]
+    aqi = index.get("aqi", "Unknown")
+    category = index.get("category", "Unknown")
+    pollutants = index.get("dominantPollutant", "Unknown")
+    
+    return f"Real AQI Data for {location}: AQI {aqi} ({category}). Dominant pollutant: {pollutants}. Forecast: Monitor for changes due to weather patterns."
+
+def query_waqi(location, place, station, station_note):
+    """World Air Quality Index (CPCB stations) feed; None without a usable answer"""
+    # Query the nearest known station by coordinates, or fall back to WAQI's own name search
+    if station is not None:
+        aqicn_url = f"https://api.waqi.info/feed/geo:{station['lat']};{station['lon']}/"
+    else:
+        aqicn_url = f"https://api.waqi.info/feed/{location}/"
+    aqicn_params = {"token": "demo"}  # Use 'demo' for testing, get real token from aqicn.org
+    
+    response = http_client.get(aqicn_url, params=aqicn_params, source="waqi", max_retries=0)
+    
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    if data.get("status") != "ok":
+        return None
+    aqi_value = data["data"]["aqi"]
+    city = data["data"]["city"]["name"]
+    
+    return f"Real AQI Data for {city}: AQI {aqi_value} ({aqi_category(aqi_value)}).{station_note} Forecast: Monitor for potential health impacts, especially for sensitive groups."
+
+# Google first; WAQI is raced if Google has not answered within the hedge delay
+aqi_providers = HedgedFetcher(
+    [("google_air_quality", query_google_air_quality), ("waqi", query_waqi)],
+    hedge_delay=1.0,
+    timeout=12
+)
+
+@cached_source("air_quality", is_valid=is_live_data)
+def fetch_air_quality_data(location: str) -> str:
+    """
+    A tool to get real-time air quality index (AQI) data for a specific location.
+    Uses Google's Air Quality API hedged with WAQI (CPCB stations).
+    """
+    print(f"Data Fusion Agent: Fetching AQI data for '{location}'...")
+    
+    try:
+        # Resolve the place and its nearest monitoring station from the local registry
+        registry = get_location_registry()
+        place = registry.resolve(location)
+        station, station_note = None, ""
+        if place is None:
+            print(f"Unknown location '{location}': no coordinates in the location registry")
+        else:
+            nearest_stations = registry.nearest(place["lat"], place["lon"], kind="aqi_station")
+            if nearest_stations:
+                station, distance_km = nearest_stations[0]
+                station_note = f" Nearest monitoring station: {station['name']} ({distance_km:.1f} km)."
+        
+        # Google needs an API key and coordinates
+        google_api_key = os.environ.get("GOOGLE_MAPS_API_KEY")
+        skip = ()
+        if not google_api_key or google_api_key == "YOUR_GOOGLE_MAPS_API_KEY_HERE" or place is None:
+            skip = ("google_air_quality",)
+        
+        result = aqi_providers.fetch(location, place, station, station_note, skip=skip)
+        if result["answer"] is not None:
+            print(f"AQI served by {result['provider']} in {result['elapsed']:.2f}s")
+            return result["answer"]
+        
+        # Fallback to mock data if APIs fail
+        print(f"All AQI providers failed (attempted: {result['attempted']}, circuit open: {result['skipped']})")
+        return f"API Unavailable: Using fallback data - AQI in {location} is currently 155 (Unhealthy for sensitive groups). Forecast predicts a spike to 210 (Severe) in 48 hours due to changing wind patterns."
+        
+    except Exception as e:
+        print(f"Error fetching AQI data: {str(e)}")
+        return f"Connection Error: Using fallback data - AQI in {location} is currently 155 (Unhealthy for sensitive groups). Monitor for weather-related changes."
+
+def fetch_festival_calendar(location: str) -> str:
+    """
+    A tool to check for major public festivals or events in a given location.
+    Uses Nager.Date API for real public holiday data.
+    """
+    print(f"Data Fusion Agent: Checking festival calendar for '{location}'...")
+    
+    try:
+        # Indexed calendar: public holidays persisted per year plus curated regional festivals
+        upcoming_holidays = get_festival_calendar().events_within(date.today(), 30, location)
+        
+        if upcoming_holidays:
+            festival_summary = f"Real Festival Data for {location} (India):\n"
+            for festival in upcoming_holidays[:3]:  # Show next 3 festivals
+                duration = (festival['end'] - festival['start']).days + 1
+                span = f", {duration}-day festival" if duration > 1 else ""
+                timing = "ongoing" if festival['start'] <= date.today() else f"in {festival['days_until']} days"
+                festival_summary += f"- {festival['name']} ({festival['local_name']}) {timing} ({festival['start'].isoformat()}{span})\n"
+            
+            # Add health impact assessment
+            if any(festival['major'] for festival in upcoming_holidays):
+                festival_summary += "\nHealth Impact: Major festival detected - expect increased air pollution from fireworks, large gatherings, and potential respiratory issues."
+            else:
+                festival_summary += "\nHealth Impact: Regular public holidays - minimal expected impact on healthcare demand."
+            
+            return festival_summary
+        else:
+            return f"No major festivals in {location} in the next 30 days. Regular healthcare demand expected."
+        
+    except Exception as e:
+        print(f"Error fetching festival data: {str(e)}")
+        return f"Connection Error: Using fallback data - Ganesh Chaturthi celebrations are scheduled to begin in Mumbai in 5 days, a 10-day festival known for large public gatherings."
+
+# Demo facilities: registry id -> (total beds, simulated occupancy range)
+DEMO_HOSPITAL_BEDS = {
+    "hosp-mumbai-kem": (1800, (0.75, 0.95)),
+    "hosp-mumbai-tata": (629, (0.80, 0.90)),
+    "hosp-mumbai-lilavati": (323, (0.70, 0.85)),
+    "hosp-mumbai-hinduja": (375, (0.75, 0.90)),
+    "hosp-mumbai-breachcandy": (158, (0.65, 0.80))
+}
+# Share of each demo facility's beds by bed type
+DEMO_BED_TYPE_SHARE = {"general": 0.80, "hdu": 0.08, "icu": 0.08, "ventilator": 0.04}
+
+# Refill the shared store's occupancy when it is older than the hospital source's fresh TTL
+CAPACITY_MAX_AGE = SOURCE_TTLS["hospital"][0]
+
+_capacity_store = None
+_capacity_store_lock = threading.Lock()
+_capacity_refresh_lock = threading.Lock()
+_capacity_refreshed_at = None
+
+def get_capacity_store():
+    """
+    Shared capacity store. Without a FHIR source it is seeded with the demo
+    facilities from the location registry.
+    """
+    global _capacity_store
+    with _capacity_store_lock:
+        if _capacity_store is None:
+            registry = get_location_registry()
+            store = CapacityStore()
+            demo_facilities = {} if os.getenv("AROGYA_FHIR_SOURCE") else DEMO_HOSPITAL_BEDS
+            for facility_id, (beds_total, _) in demo_facilities.items():
+                place = registry.resolve(facility_id)
+                nearest_ward = registry.nearest(place["lat"], place["lon"], kind="ward")
+                store.upsert_facility(
+                    facility_id, place["name"], city=place["city"], state=place["state"],
+                    ward=nearest_ward[0][0]["name"] if nearest_ward else None,
+                    total={bed_type: round(beds_total * share) for bed_type, share in DEMO_BED_TYPE_SHARE.items()}
+                )
+            _capacity_store = store
+        return _capacity_store
+
+def simulate_demo_occupancy(store):
+    """Draw fresh occupancy for the demo facilities in one vectorized update"""
+    ids, bed_types, occupied = [], [], []
+    for facility_id, (_, (low, high)) in DEMO_HOSPITAL_BEDS.items():
+        rate = random.uniform(low, high)
+        for bed_type, beds in store.facility_beds(facility_id).items():
+            ids.append(facility_id)
+            bed_types.append(bed_type)
+            occupied.append(int(beds * rate))
+    store.update_occupancy_many(ids, bed_types, occupied, timestamp=time.time())
+
+def refresh_capacity_store():
+    """
+    Fill the shared store with current occupancy: bed counts from the FHIR
+    Bundle/NDJSON export in AROGYA_FHIR_SOURCE (file path or FHIR server URL)
+    when one is configured, otherwise simulated demo occupancy
+    """
+    global _capacity_refreshed_at
+    store = get_capacity_store()
+    with _capacity_refresh_lock:
+        fhir_source = os.getenv("AROGYA_FHIR_SOURCE")
+        if fhir_source:
+            stats = ingest_fhir(fhir_source, store, registry=get_location_registry())
+            print(f"Ingested {stats['resources']} FHIR resources at {stats['resources_per_sec']:,.0f}/sec")
+        else:
+            simulate_demo_occupancy(store)
+        _capacity_refreshed_at = time.time()
+    return store
+
+def current_capacity_store(max_age=CAPACITY_MAX_AGE):
+    """
+    Shared capacity store, refilled first when this process has not filled it
+    within `max_age` seconds. The hospital fetcher is cached on disk, so its
+    cache hits say nothing about this process's store; everything reading
+    occupancy goes through here instead of relying on the fetcher having run.
+    A failed refresh is logged and leaves the store as it was.
+    """
+    refreshed_at = _capacity_refreshed_at
+    if refreshed_at is None or time.time() - refreshed_at > max_age:
+        try:
+            return refresh_capacity_store()
+        except Exception as e:
+            print(f"Error refreshing hospital capacity: {str(e)}")
+    return get_capacity_store()
+
+def capacity_snapshot(location, city, max_age=CAPACITY_MAX_AGE):
+    """
+    City totals and the hospital summary text read from the shared store
+    together, with no refresh in between, so features built from the totals
+    and the printed summary describe the same occupancy.
+    Returns (totals, summary); summary is None when the city has no facilities.
+    """
+    store = current_capacity_store(max_age)
+    with _capacity_refresh_lock:
+        totals = store.totals(city=city)
+        summary = store.summary(location, city=city) if totals["facilities"] else None
+    return totals, summary
+
+@cached_source("hospital", is_valid=is_live_data)
+def fetch_hospital_data(location: str) -> str:
+    """
+    A tool to fetch current hospital capacity and occupancy data.
+    Uses simulated FHIR API data for demonstration purposes.
+    """
+    print(f"Data Fusion Agent: Fetching hospital capacity data for '{location}'...")
+    
+    try:
+        store = current_capacity_store()
+        
+        place = get_location_registry().resolve(location)
+        if place is None:
+            print(f"Unknown location '{location}': no hospitals registered for it")
+            return f"API Unavailable: Using fallback data - Hospital capacity at 85% occupancy in {location} area. 150 beds available across major hospitals."
+        
+        hospital_summary = store.summary(location, city=place["city"])
+        if hospital_summary is None:
+            return f"API Unavailable: Using fallback data - Hospital capacity at 85% occupancy in {location} area. 150 beds available across major hospitals."
+        return hospital_summary
+        
+    except Exception as e:
+        print(f"Error fetching hospital data: {str(e)}")
+        return f"Connection Error: Using fallback data - Hospital capacity at 85% occupancy in {location} area. 150 beds available across major hospitals."
@@ -12,6 +12,8 @@ from datetime import datetime, timedelta
 import time
 import random
 
+from ui_cache import cached_data
+
 # Page configuration
 st.set_page_config(
     page_title="Arogya Sentinel - Healthcare Surge Prediction",
@@ -204,10 +206,9 @@ def main():
             # Show sample data visualization
             display_sample_dashboard()
 
-def display_sample_dashboard():
-    """Display sample dashboard when no analysis is running"""
-    st.markdown("#### 📈 Sample Healthcare Trends")
-    
+@cached_data("sample")
+def sample_dashboard_figures():
+    """Figures for the sample dashboard; built once per process, then served from cache on reruns"""
     # Sample data for visualization
     dates = pd.date_range(start='2024-01-01', end='2024-01-31', freq='D')
     sample_data = pd.DataFrame({
@@ -222,33 +223,39 @@ def display_sample_dashboard():
                    title='Daily Hospital Admissions Trend',
                    color_discrete_sequence=['#2a5298'])
     fig1.update_layout(height=300)
-    st.plotly_chart(fig1, use_container_width=True)
     
     # AQI correlation
-    col_chart1, col_chart2 = st.columns(2)
+    fig2 = px.scatter(sample_data, x='AQI', y='Predicted_Surge',
+                     title='AQI vs Predicted Surge',
+                     color_discrete_sequence=['#dc3545'])
+    fig2.update_layout(height=250)
+    
+    # Risk distribution pie chart
+    risk_data = pd.DataFrame({
+        'Risk Level': ['Low', 'Moderate', 'High', 'Very High'],
+        'Frequency': [40, 35, 20, 5]
+    })
+    fig3 = px.pie(risk_data, values='Frequency', names='Risk Level',
+                 title='Historical Risk Distribution',
+                 color_discrete_map={
+                     'Low': '#28a745',
+                     'Moderate': '#ffc107', 
+                     'High': '#fd7e14',
+                     'Very High': '#dc3545'
+                 })
+    fig3.update_layout(height=250)
+    return fig1, fig2, fig3
+
+def display_sample_dashboard():
+    """Display sample dashboard when no analysis is running"""
+    st.markdown("#### 📈 Sample Healthcare Trends")
+    fig1, fig2, fig3 = sample_dashboard_figures()
+    st.plotly_chart(fig1, use_container_width=True)
     
+    col_chart1, col_chart2 = st.columns(2)
     with col_chart1:
-        fig2 = px.scatter(sample_data, x='AQI', y='Predicted_Surge',
-                         title='AQI vs Predicted Surge',
-                         color_discrete_sequence=['#dc3545'])
-        fig2.update_layout(height=250)
         st.plotly_chart(fig2, use_container_width=True)
-    
     with col_chart2:
-        # Risk distribution pie chart
-        risk_data = pd.DataFrame({
-            'Risk Level': ['Low', 'Moderate', 'High', 'Very High'],
-            'Frequency': [40, 35, 20, 5]
-        })
-        fig3 = px.pie(risk_data, values='Frequency', names='Risk Level',
-                     title='Historical Risk Distribution',
-                     color_discrete_map={
-                         'Low': '#28a745',
-                         'Moderate': '#ffc107', 
-                         'High': '#fd7e14',
-                         'Very High': '#dc3545'
-                     })
-        fig3.update_layout(height=250)
         st.plotly_chart(fig3, use_container_width=True)
 
 def display_mock_results(location, risk_level):
@@ -330,6 +337,11 @@ def display_mock_results(location, risk_level):
         st.markdown(f"• {factor}")
     
     # Quick visualization
+    st.plotly_chart(surge_gauge(surge_pct, risk_level), use_container_width=True)
+
+@cached_data("sample")
+def surge_gauge(surge_pct, risk_level):
+    """Surge risk gauge for the quick-test scenarios"""
     fig = go.Figure(go.Indicator(
         mode = "gauge+number+delta",
         value = surge_pct,
@@ -352,7 +364,7 @@ def display_mock_results(location, risk_level):
         }
     ))
     fig.update_layout(height=300)
-    st.plotly_chart(fig, use_container_width=True)
+    return fig
 
 def run_full_analysis(location, start_date, end_date, include_festivals, include_weather, include_hospital_data):
     """Run the full analysis with progress tracking"""
@@ -466,28 +478,7 @@ def display_full_results(location, start_date, end_date):
             """)
         
         with col_pred2:
-            # Prediction confidence chart
-            fig_conf = go.Figure(go.Indicator(
-                mode = "gauge+number",
-                value = confidence,
-                title = {'text': "Prediction Confidence"},
-                gauge = {
-                    'axis': {'range': [None, 100]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, 50], 'color': "lightgray"},
-                        {'range': [50, 80], 'color': "yellow"},
-                        {'range': [80, 100], 'color': "green"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 90
-                    }
-                }
-            ))
-            fig_conf.update_layout(height=300)
-            st.plotly_chart(fig_conf, use_container_width=True)
+            st.plotly_chart(confidence_gauge(confidence), use_container_width=True)
     
     with tab2:
         st.markdown("#### ⚙️ Resource Allocation Plan")
@@ -567,52 +558,83 @@ Hospitals are prepared and adequately staffed. Emergency services remain fully o
     with tab4:
         st.markdown("#### 📈 Data Analysis & Trends")
         
-        # Sample trend data
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        baseline = 150
-        peak_day = len(dates) // 2
-        
-        trend_data = pd.DataFrame({
-            'Date': dates,
-            'Predicted_Admissions': [
-                baseline + i*2 + (surge_pct if abs(i-peak_day) < 2 else surge_pct*0.3) 
-                for i in range(len(dates))
-            ],
-            'Baseline': [baseline] * len(dates),
-            'AQI_Forecast': [
-                160 + (i*3) + (30 if abs(i-peak_day) < 2 else 0) 
-                for i in range(len(dates))
-            ]
-        })
-        
-        # Admissions forecast
-        fig_trend = px.line(trend_data, x='Date', y=['Predicted_Admissions', 'Baseline'],
-                           title='Hospital Admissions Forecast',
-                           color_discrete_map={'Predicted_Admissions': '#dc3545', 'Baseline': '#28a745'})
-        fig_trend.update_layout(height=400)
+        fig_trend, fig_aqi, fig_risk = forecast_figures(start_date, end_date, round(surge_pct, 1))
         st.plotly_chart(fig_trend, use_container_width=True)
         
         # Additional charts
         col_data1, col_data2 = st.columns(2)
-        
         with col_data1:
-            fig_aqi = px.line(trend_data, x='Date', y='AQI_Forecast',
-                             title='Air Quality Forecast',
-                             color_discrete_sequence=['#ffc107'])
-            fig_aqi.update_layout(height=300)
             st.plotly_chart(fig_aqi, use_container_width=True)
-        
         with col_data2:
-            # Risk level over time
-            risk_data = pd.DataFrame({
-                'Date': dates,
-                'Risk_Score': [2 + (2 if abs(i-peak_day) < 2 else 0) for i in range(len(dates))]
-            })
-            fig_risk = px.bar(risk_data, x='Date', y='Risk_Score',
-                             title='Risk Level Forecast',
-                             color_discrete_sequence=['#fd7e14'])
-            fig_risk.update_layout(height=300)
             st.plotly_chart(fig_risk, use_container_width=True)
 
+@cached_data("forecast")
+def confidence_gauge(confidence):
+    """Prediction confidence gauge"""
+    fig_conf = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = confidence,
+        title = {'text': "Prediction Confidence"},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, 50], 'color': "lightgray"},
+                {'range': [50, 80], 'color': "yellow"},
+                {'range': [80, 100], 'color': "green"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    ))
+    fig_conf.update_layout(height=300)
+    return fig_conf
+
+@cached_data("forecast")
+def forecast_figures(start_date, end_date, surge_pct):
+    """Admissions, AQI and risk forecast figures peaking mid-period at the predicted surge"""
+    # Sample trend data
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    baseline = 150
+    peak_day = len(dates) // 2
+    
+    trend_data = pd.DataFrame({
+        'Date': dates,
+        'Predicted_Admissions': [
+            baseline + i*2 + (surge_pct if abs(i-peak_day) < 2 else surge_pct*0.3) 
+            for i in range(len(dates))
+        ],
+        'Baseline': [baseline] * len(dates),
+        'AQI_Forecast': [
+            160 + (i*3) + (30 if abs(i-peak_day) < 2 else 0) 
+            for i in range(len(dates))
+        ]
+    })
+    
+    # Admissions forecast
+    fig_trend = px.line(trend_data, x='Date', y=['Predicted_Admissions', 'Baseline'],
+                       title='Hospital Admissions Forecast',
+                       color_discrete_map={'Predicted_Admissions': '#dc3545', 'Baseline': '#28a745'})
+    fig_trend.update_layout(height=400)
+    
+    fig_aqi = px.line(trend_data, x='Date', y='AQI_Forecast',
+                     title='Air Quality Forecast',
+                     color_discrete_sequence=['#ffc107'])
+    fig_aqi.update_layout(height=300)
+    
+    # Risk level over time
+    risk_data = pd.DataFrame({
+        'Date': dates,
+        'Risk_Score': [2 + (2 if abs(i-peak_day) < 2 else 0) for i in range(len(dates))]
+    })
+    fig_risk = px.bar(risk_data, x='Date', y='Risk_Score',
+                     title='Risk Level Forecast',
+                     color_discrete_sequence=['#fd7e14'])
+    fig_risk.update_layout(height=300)
+    return fig_trend, fig_aqi, fig_risk
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,234 @@
+# fast_pipeline.py
+"""
+LLM-free fast path for Arogya Sentinel
+Fetches every data source concurrently, builds the model's features from
+structured data, and fills the prediction, resource plan and communication
+templates directly, with no agent round trips
+"""
+
+import re
+import time
+from datetime import date
+
+from analysis_cache import memoized_analysis, model_version
+from advisory_renderer import render_for_location
+from data_prefetch import prefetch_data_sources, source_outputs
+from data_sources import capacity_snapshot, get_festival_calendar, is_live_data
+from location_registry import get_location_registry
+from progress_events import PARTIAL_RESULT, STAGE_COMPLETED, emit
+from report_builder import (
+    TEMPLATE_VERSION,
+    build_resource_plan,
+    draft_communications,
+    format_advisory_batch,
+    format_allocation_plan,
+    format_occupancy_risk,
+    format_prediction
+)
+from occupancy_simulation import occupancy_summary, simulate_for_location
+from resource_optimizer import plan_for_location
+
+# Bump when feature construction or confidence rules change; part of the analysis fingerprint
+PIPELINE_VERSION = "2"
+
+# Report sections in crew task order, with their headings
+REPORT_SECTIONS = {
+    "data_summary": "Data Synthesis",
+    "surge_prediction": "Surge Prediction",
+    "resource_plan": "Resource Plan",
+    "communications": "Communications"
+}
+
+SOURCE_LABELS = {
+    "public_health": "Public health",
+    "air_quality": "Air quality",
+    "festival_calendar": "Festivals and events",
+    "hospital": "Hospital capacity"
+}
+
+
+def hospital_snapshot(location, sources):
+    """
+    Swap a live hospital answer for one read from the capacity store together
+    with the totals the features use. The fetcher's text is cached on disk for
+    up to 20 minutes while the store refills every 5, so the printed hospital
+    section, the occupancy feature and the analysis fingerprint would otherwise
+    see different occupancy. Returns (sources, capacity totals or None); the
+    input dict is not modified.
+    """
+    result = sources.get("hospital")
+    place = get_location_registry().resolve(location)
+    if result is None or not result["output"] or not is_live_data(result["output"]) or place is None:
+        return sources, None
+    capacity, summary = capacity_snapshot(location, city=place["city"])
+    if summary is None:
+        return sources, None
+    return dict(sources, hospital=dict(result, output=summary)), capacity
+
+
+def structured_features(location, sources, model, capacity=None):
+    """
+    Model features for a location from the prefetched source results.
+
+    Text heuristics supply the health trend and calendar defaults; AQI comes
+    from a live air quality answer, the festival score from the calendar
+    index and hospital occupancy from `capacity`, the totals returned by
+    hospital_snapshot alongside the sources. Returns
+    (features, capacity totals or None, names of live sources).
+    """
+    outputs = {name: result["output"] for name, result in sources.items() if result["output"]}
+    live = {name for name, output in outputs.items() if is_live_data(output)}
+    features = model.extract_features_from_text("\n".join(outputs.values()))
+
+    aqi_match = re.search(r'AQI\s*(\d+)', outputs.get("air_quality", ""))
+    if "air_quality" in live and aqi_match:
+        features['aqi_value'] = float(aqi_match.group(1))
+
+    features['festival_score'] = float(
+        get_festival_calendar().proximity_features([date.today()], location)["festival_score"][0]
+    )
+
+    if capacity is not None:
+        features['hospital_occupancy'] = capacity["occupancy"]
+
+    return features, capacity, live
+
+
+def structured_confidence(features, capacity, live):
+    """Prediction confidence from which inputs came from live data (mirrors calculate_confidence)"""
+    confidence = 70
+    if "air_quality" in live:
+        confidence += 10
+    if features['festival_score'] > 0:
+        confidence += 8
+    if capacity is not None:
+        confidence += 7
+    if any(features[trend] != 1.0 for trend in
+           ['respiratory_cases_trend', 'cardiac_cases_trend', 'trauma_cases_trend']):
+        confidence += 5
+    return min(95, confidence)
+
+
+def format_data_summary(location, sources):
+    summary = f"Data summary for {location}:\n"
+    for name, label in SOURCE_LABELS.items():
+        result = sources.get(name)
+        if result is None:
+            continue
+        output = result["output"] if result["output"] else f"Unavailable ({result['error']})"
+        summary += f"\n{label}:\n{output.strip()}\n"
+    return summary
+
+
+def emit_prediction(prediction, capacity=None):
+    emit(PARTIAL_RESULT, "surge_prediction", prediction=prediction, capacity=capacity)
+
+
+def analyse(location, sources, model, capacity=None):
+    """
+    Prediction and report sections from prefetched source results (after
+    hospital_snapshot, whose totals are passed as `capacity`), publishing each
+    section as it is ready
+    """
+    sections = {"data_summary": format_data_summary(location, sources)}
+    emit(STAGE_COMPLETED, "data_summary", text=sections["data_summary"])
+
+    features, capacity, live = structured_features(location, sources, model, capacity)
+    prediction = model.predict_from_features(features, structured_confidence(features, capacity, live))
+    emit_prediction(prediction, capacity)
+    sections["surge_prediction"] = format_prediction(prediction)
+    emit(STAGE_COMPLETED, "surge_prediction", text=sections["surge_prediction"])
+
+    # Facility-level allocation needs live bed counts for the location's city
+    allocation = plan_for_location(location, prediction) if capacity is not None else None
+    sections["resource_plan"] = build_resource_plan(prediction['surge_percentage'], capacity)
+    if allocation is not None:
+        emit(PARTIAL_RESULT, "resource_plan", allocation=allocation)
+        sections["resource_plan"] += format_allocation_plan(allocation)
+    simulation = simulate_for_location(location, prediction) if capacity is not None else None
+    occupancy = occupancy_summary(simulation) if simulation is not None else None
+    if occupancy is not None:
+        emit(PARTIAL_RESULT, "resource_plan", occupancy=occupancy)
+        sections["resource_plan"] += format_occupancy_risk(occupancy)
+    emit(STAGE_COMPLETED, "resource_plan", text=sections["resource_plan"])
+
+    sections["communications"] = draft_communications(
+        sections["resource_plan"], sections["surge_prediction"], location=location,
+        risk_level=prediction['risk_level'], key_factors=prediction['key_factors']
+    )
+    # Per-hospital alerts and per-ward advisories in every supported language
+    advisories = render_for_location(location, prediction) if capacity is not None else None
+    if advisories is not None:
+        emit(PARTIAL_RESULT, "communications", advisories=advisories)
+        sections["communications"] += format_advisory_batch(advisories)
+    emit(STAGE_COMPLETED, "communications", text=sections["communications"])
+    return {
+        "location": location,
+        "prediction": prediction,
+        "features": features,
+        "capacity": capacity,
+        "allocation": allocation,
+        "occupancy": occupancy,
+        "advisories": advisories,
+        "live_sources": sorted(live),
+        "sections": sections,
+        "report": "\n\n".join(f"## {REPORT_SECTIONS[name]}\n{text.strip()}" for name, text in sections.items())
+    }
+
+
+def run_fast_pipeline(location="Mumbai", topic=None, model=None, timeout=30, force_refresh=False, shared=None):
+    """
+    Run data -> prediction -> resource plan -> communications without any LLM.
+    Returns {'location', 'prediction', 'features', 'capacity', 'allocation', 'occupancy', 'advisories',
+    'live_sources', 'sections', 'report', 'fingerprint', 'from_cache', 'timings'}; sections
+    match the crew's four tasks and 'advisories' is the advisory_renderer batch
+    for the city's hospitals and wards. Results are memoized on the fingerprint of
+    the source outputs and model/template versions unless force_refresh.
+    `shared` holds source results already fetched for several locations
+    (see prefetch_shared_sources).
+    """
+    start = time.perf_counter()
+    if model is None:
+        from surge_prediction_model import initialize_model
+        model = initialize_model()
+    timings = {"model_load": time.perf_counter() - start}
+
+    step = time.perf_counter()
+    prefetch = prefetch_data_sources(location, topic=topic, timeout=timeout, shared=shared)
+    sources, capacity = hospital_snapshot(location, prefetch["sources"])
+    timings["data_fetch"] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    versions = {"model": model_version(model), "templates": TEMPLATE_VERSION, "pipeline": PIPELINE_VERSION}
+    analysis, fingerprint, from_cache = memoized_analysis(
+        "fast_pipeline", location, source_outputs(sources), versions,
+        lambda: analyse(location, sources, model, capacity), force_refresh=force_refresh
+    )
+    timings["analysis"] = time.perf_counter() - step
+    if from_cache:
+        # Subscribers still see every stage when the stored analysis is returned
+        emit_prediction(analysis["prediction"], analysis["capacity"])
+        for name, text in analysis["sections"].items():
+            emit(STAGE_COMPLETED, name, text=text, cached=True)
+    timings["total"] = time.perf_counter() - start
+
+    return dict(analysis, fingerprint=fingerprint, from_cache=from_cache, timings=timings)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Arogya Sentinel analysis without LLM calls")
+    parser.add_argument("location", nargs="?", default="Mumbai")
+    parser.add_argument("--topic", default=None, help="Public health topic (default: '<location> disease surveillance')")
+    parser.add_argument("--force-refresh", action="store_true", help="Recompute even if an analysis of identical inputs is stored")
+    args = parser.parse_args()
+
+    result = run_fast_pipeline(args.location, topic=args.topic, force_refresh=args.force_refresh)
+    print("\n########################")
+    print("## Arogya Sentinel Fast-Path Report")
+    print("########################\n")
+    print(result["report"])
+    if result["from_cache"]:
+        print(f"\n♻️  Inputs unchanged: stored analysis {result['fingerprint'][:12]} returned")
+    print("\n⏱️  " + ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in result["timings"].items()))
@@ -0,0 +1,248 @@
+# festival_calendar.py
+"""
+Indexed multi-year holiday and festival calendar
+Persists public holidays per year once, merges curated regional festivals
+with their multi-day durations and answers date-window queries by binary search
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+import numpy as np
+
+# Curated regional festivals known for large gatherings: (first day per year,
+# duration in days, states where it is celebrated at scale; None = nationwide).
+# Lunar-calendar dates must be extended each year.
+REGIONAL_FESTIVALS = {
+    "Ganesh Chaturthi": {
+        "starts": {2024: "2024-09-07", 2025: "2025-08-27", 2026: "2026-09-14", 2027: "2027-09-04"},
+        "duration": 10, "regions": ["Maharashtra", "Karnataka", "Goa"]
+    },
+    "Navratri": {
+        "starts": {2024: "2024-10-03", 2025: "2025-09-22", 2026: "2026-10-11", 2027: "2027-09-30"},
+        "duration": 9, "regions": None
+    },
+    "Durga Puja": {
+        "starts": {2024: "2024-10-09", 2025: "2025-09-28", 2026: "2026-10-17", 2027: "2027-10-06"},
+        "duration": 5, "regions": ["West Bengal", "Delhi"]
+    },
+    "Diwali": {
+        "starts": {2024: "2024-10-29", 2025: "2025-10-18", 2026: "2026-11-06", 2027: "2027-10-27"},
+        "duration": 5, "regions": None
+    },
+    "Holi": {
+        "starts": {2024: "2024-03-24", 2025: "2025-03-13", 2026: "2026-03-03", 2027: "2027-03-21"},
+        "duration": 2, "regions": None
+    },
+    "Dahi Handi": {
+        "starts": {2024: "2024-08-27", 2025: "2025-08-16", 2026: "2026-09-05", 2027: "2027-08-26"},
+        "duration": 1, "regions": ["Maharashtra"]
+    },
+    "Gudi Padwa": {
+        "starts": {2024: "2024-04-09", 2025: "2025-03-30", 2026: "2026-03-19", 2027: "2027-04-07"},
+        "duration": 1, "regions": ["Maharashtra"]
+    },
+    "Pongal": {
+        "starts": {2024: "2024-01-15", 2025: "2025-01-14", 2026: "2026-01-14", 2027: "2027-01-15"},
+        "duration": 4, "regions": ["Tamil Nadu"]
+    }
+}
+
+# Public holiday names that also signal a major gathering
+MAJOR_FESTIVAL_KEYWORDS = ["Diwali", "Holi", "Ganesh", "Durga", "Navratri", "Dussehra", "Eid"]
+
+CITY_STATES = {
+    "mumbai": "Maharashtra", "pune": "Maharashtra", "nagpur": "Maharashtra",
+    "delhi": "Delhi", "bangalore": "Karnataka", "bengaluru": "Karnataka",
+    "chennai": "Tamil Nadu", "kolkata": "West Bengal"
+}
+
+MAJOR_WEIGHT = 1.0
+MINOR_WEIGHT = 0.6
+LEAD_DAYS = 10  # Days before an event when its proximity score starts rising
+
+
+def location_state(location):
+    """State for a city name, or None when unknown (nationwide events only)"""
+    if not location:
+        return None
+    lowered = location.lower()
+    return next((state for city, state in CITY_STATES.items() if city in lowered), None)
+
+
+class FestivalCalendar:
+    """
+    Sorted index of holidays and festivals across years.
+
+    Events are kept sorted by first day along with the longest event duration.
+    events_within bisects the starts over [D - longest + 1, D + N], so "events
+    overlapping [D, D+N]" is two bisections plus a short scan of that window.
+    proximity_features answers many dates at once with vectorized
+    searchsorted calls, checking ongoing events against a running maximum of
+    last days (np.maximum.accumulate) built per call.
+    """
+
+    def __init__(self, fetch_holidays=None, store_dir="calendar_data", country="IN", retry_after=3600):
+        self.fetch_holidays = fetch_holidays
+        self.store_dir = store_dir
+        self.country = country
+        self.retry_after = retry_after
+        self._lock = threading.Lock()
+        self._holidays = {}        # year -> list of Nager.Date holiday dicts
+        self._failed_years = {}    # year -> time of last failed fetch
+        self._events = []
+        self._starts = []
+        self._max_duration = 1
+
+    def _year_path(self, year):
+        return os.path.join(self.store_dir, f"holidays_{self.country}_{year}.json")
+
+    def _load_year(self, year):
+        """Holidays for a year from the local store, fetching and persisting on first use"""
+        path = self._year_path(year)
+        if os.path.exists(path):
+            with open(path) as f:
+                return json.load(f)
+
+        if self.fetch_holidays is None:
+            return []
+        if time.time() - self._failed_years.get(year, 0) < self.retry_after:
+            return None
+
+        holidays = self.fetch_holidays(year)
+        if holidays is None:
+            self._failed_years[year] = time.time()
+            return None
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(holidays, f)
+        os.replace(tmp_path, path)
+        return holidays
+
+    def ensure_years(self, years):
+        """Make sure every year in `years` is indexed, rebuilding the index if anything changed"""
+        with self._lock:
+            changed = False
+            for year in years:
+                if year in self._holidays:
+                    continue
+                holidays = self._load_year(year)
+                if holidays is not None:
+                    self._holidays[year] = holidays
+                    changed = True
+            if changed or not self._events:
+                self._rebuild()
+
+    def _rebuild(self):
+        events = {}
+        for holidays in self._holidays.values():
+            for holiday in holidays:
+                start = date.fromisoformat(holiday["date"])
+                name = holiday["name"]
+                events[(name, start)] = {
+                    "name": name,
+                    "local_name": holiday.get("localName", name),
+                    "start": start,
+                    "end": start,
+                    "source": "public_holiday",
+                    "regions": None,
+                    "major": any(k in name for k in MAJOR_FESTIVAL_KEYWORDS)
+                }
+
+        for name, festival in REGIONAL_FESTIVALS.items():
+            for start in festival["starts"].values():
+                start = date.fromisoformat(start)
+                # Replace a same-named one-day public holiday with the full festival span
+                keyword = name.split()[0]
+                for key in [k for k in events
+                            if keyword in k[0].replace("(", " ").split() and abs((k[1] - start).days) <= festival["duration"]]:
+                    del events[key]
+                events[(name, start)] = {
+                    "name": name,
+                    "local_name": name,
+                    "start": start,
+                    "end": start + timedelta(days=festival["duration"] - 1),
+                    "source": "curated",
+                    "regions": festival["regions"],
+                    "major": True
+                }
+
+        self._events = sorted(events.values(), key=lambda e: (e["start"], e["name"]))
+        self._starts = [e["start"].toordinal() for e in self._events]
+        self._max_duration = max([(e["end"] - e["start"]).days + 1 for e in self._events] or [1])
+
+    def _applies(self, event, state):
+        return event["regions"] is None or state in event["regions"]
+
+    def events_within(self, day, days, location=None):
+        """
+        Events overlapping [day, day + days], sorted by first day, each with
+        days_until (0 while ongoing). Years are loaded on demand, so windows
+        crossing New Year include next year's festivals.
+        """
+        end_day = day + timedelta(days=days)
+        self.ensure_years(range(day.year, end_day.year + 1))
+        state = location_state(location)
+        with self._lock:
+            events, starts, max_duration = self._events, self._starts, self._max_duration
+
+        lo = bisect_left(starts, day.toordinal() - max_duration + 1)
+        hi = bisect_right(starts, end_day.toordinal())
+        matches = []
+        for event in events[lo:hi]:
+            if event["end"] >= day and self._applies(event, state):
+                matches.append(dict(event, days_until=max(0, (event["start"] - day).days)))
+        return matches
+
+    def proximity_features(self, dates, location=None):
+        """
+        Per-day festival features for batched forecasting. Returns a dict of
+        arrays aligned with `dates`:
+          in_festival          - 1 if any applicable event is ongoing
+          days_to_next_major   - days until the next major event starts (ongoing = 0)
+          festival_score       - 0-1 score compatible with the model's festival_score
+        """
+        ordinals = np.array([d.toordinal() for d in dates], dtype=np.int64)
+        if ordinals.size == 0:
+            return {"in_festival": ordinals, "days_to_next_major": ordinals, "festival_score": ordinals.astype(float)}
+
+        first, last = date.fromordinal(int(ordinals.min())), date.fromordinal(int(ordinals.max()))
+        self.ensure_years(range(first.year, last.year + 2))
+        state = location_state(location)
+        with self._lock:
+            all_events = self._events
+
+        score = np.zeros(len(ordinals))
+        in_festival = np.zeros(len(ordinals), dtype=int)
+        days_to_major = np.full(len(ordinals), 10_000, dtype=np.int64)
+
+        for major, weight in ((True, MAJOR_WEIGHT), (False, MINOR_WEIGHT)):
+            events = [e for e in all_events if e["major"] == major and self._applies(e, state)]
+            if not events:
+                continue
+            starts = np.array([e["start"].toordinal() for e in events], dtype=np.int64)
+            running_end = np.maximum.accumulate(np.array([e["end"].toordinal() for e in events], dtype=np.int64))
+
+            # Ongoing: the latest-ending event among those already started covers the day
+            started = np.searchsorted(starts, ordinals, side="right")
+            ongoing = (started > 0) & (running_end[np.maximum(started - 1, 0)] >= ordinals)
+
+            # Upcoming: next event start at or after the day
+            following = np.searchsorted(starts, ordinals, side="left")
+            has_next = following < len(starts)
+            days_until = np.where(has_next, starts[np.minimum(following, len(starts) - 1)] - ordinals, 10_000)
+            days_until = np.where(ongoing, 0, days_until)
+
+            lead_score = weight * np.clip(1 - days_until / LEAD_DAYS, 0, 1)
+            score = np.maximum(score, np.where(ongoing, weight, lead_score))
+            in_festival |= ongoing.astype(int)
+            if major:
+                days_to_major = days_until
+
+        return {"in_festival": in_festival, "days_to_next_major": days_to_major, "festival_score": score}
@@ -0,0 +1,333 @@
+# fhir_ingest.py
+"""
+Streaming FHIR ingestion for hospital bed occupancy
+Reads FHIR Bundle JSON or bulk-export NDJSON incrementally from files or a
+local FHIR server, counts bed Locations per facility and bed type, and loads
+the totals into the capacity store with memory independent of bundle size
+"""
+
+import codecs
+import json
+import re
+import time
+
+from capacity_store import BED_TYPES
+
+CHUNK_SIZE = 1 << 20  # characters read per step
+
+# Location.operationalStatus codes (HL7 v2 table 0116) that mean the bed is in use
+OCCUPIED_STATUS_CODES = {"O", "I", "K"}  # occupied, isolated, contaminated
+# Bed Locations in these states do not count towards capacity
+UNAVAILABLE_STATUS_CODES = {"C"}          # closed
+
+# Location.type codes / text fragments -> capacity store bed type (first match wins)
+BED_TYPE_CODES = [
+    ("vent", "ventilator"),
+    ("icu", "icu"),
+    ("hdu", "hdu"),
+    ("stepdown", "hdu")
+]
+
+_WHITESPACE = re.compile(r"[\s,]*")
+_decoder = json.JSONDecoder()
+
+
+class _ChunkReader:
+    """Text buffer over a stream of chunks that decodes one JSON value at a time"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.bytes_read = 0
+        self.exhausted = False
+
+    def _fill(self):
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self.exhausted = True
+            self.buffer += self._decoder.decode(b"", final=True)
+            return False
+        if isinstance(chunk, bytes):
+            self.bytes_read += len(chunk)
+            chunk = self._decoder.decode(chunk)
+        else:
+            self.bytes_read += len(chunk)
+        # Drop the consumed prefix so the buffer stays about one chunk long
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Next significant character (skipping whitespace and commas), or '' at end of input"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Malformed FHIR JSON: expected '{char}' near byte {self.bytes_read}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value, reading more chunks until it is whole"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise ValueError(f"Malformed FHIR JSON: truncated value near byte {self.bytes_read}")
+                continue
+            # A number at the very end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.exhausted and self.buffer[self.pos] not in "{[\"":
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_bundle_resources(chunks):
+    """
+    Yield each entry.resource of a FHIR Bundle, parsing only one entry at a
+    time. Top-level fields other than `entry` are decoded and discarded.
+    """
+    reader = _ChunkReader(chunks)
+    reader.expect("{")
+    while reader.peek() != "}":
+        if reader.peek() == "":
+            raise ValueError("Malformed FHIR JSON: unexpected end of bundle")
+        key = reader.value()
+        reader.expect(":")
+        if key != "entry":
+            reader.value()
+            continue
+        reader.expect("[")
+        while reader.peek() != "]":
+            entry = reader.value()
+            resource = entry.get("resource") if isinstance(entry, dict) else None
+            if resource is not None:
+                yield resource
+        reader.expect("]")
+
+
+def iter_ndjson_resources(lines):
+    """Yield resources from FHIR bulk-export NDJSON, one per line"""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def _reference_id(reference):
+    """'Organization/hosp-mumbai-kem' -> 'hosp-mumbai-kem'"""
+    if not reference:
+        return None
+    return reference.get("reference", "").rsplit("/", 1)[-1] or None
+
+
+def bed_type_of(location):
+    """Capacity store bed type for a bed Location from its type codes and text"""
+    labels = []
+    for concept in location.get("type", []):
+        labels.append(concept.get("text", ""))
+        labels.extend(f"{c.get('code', '')} {c.get('display', '')}" for c in concept.get("coding", []))
+    text = " ".join(labels).lower()
+    return next((bed_type for fragment, bed_type in BED_TYPE_CODES if fragment in text), "general")
+
+
+def _is_bed(location):
+    return any(c.get("code") == "bd" for c in location.get("physicalType", {}).get("coding", []))
+
+
+class BedCensus:
+    """
+    Running per-facility bed counts built from a stream of FHIR resources.
+
+    Only one counter row per facility and the facility's Organization details
+    are kept, so memory grows with the number of facilities, not beds.
+    """
+
+    def __init__(self, bed_types=BED_TYPES):
+        self.bed_types = list(bed_types)
+        self.total = {}
+        self.occupied = {}
+        self.facilities = {}
+        self.resources = 0
+        self.beds = 0
+
+    def _counts(self, counts, facility_id):
+        if facility_id not in counts:
+            counts[facility_id] = dict.fromkeys(self.bed_types, 0)
+        return counts[facility_id]
+
+    def add(self, resource):
+        self.resources += 1
+        resource_type = resource.get("resourceType")
+
+        if resource_type == "Organization":
+            address = (resource.get("address") or [{}])[0]
+            self.facilities[resource["id"]] = {
+                "name": resource.get("name", resource["id"]),
+                "city": address.get("city"),
+                "ward": address.get("district"),
+                "state": address.get("state")
+            }
+        elif resource_type == "Location" and _is_bed(resource):
+            if resource.get("status", "active") != "active":
+                return
+            facility_id = _reference_id(resource.get("managingOrganization")) or _reference_id(resource.get("partOf"))
+            status = resource.get("operationalStatus", {}).get("code")
+            if facility_id is None or status in UNAVAILABLE_STATUS_CODES:
+                return
+            bed_type = bed_type_of(resource)
+            self.beds += 1
+            self._counts(self.total, facility_id)[bed_type] += 1
+            if status in OCCUPIED_STATUS_CODES:
+                self._counts(self.occupied, facility_id)[bed_type] += 1
+
+    def load_into(self, store, registry=None, timestamp=None):
+        """
+        Write the counts into a CapacityStore, replacing each facility's beds.
+        Facilities without an Organization resource take their name and place
+        from the location registry when their id is registered there.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        for facility_id, total in self.total.items():
+            details = self.facilities.get(facility_id)
+            if details is None:
+                place = registry.resolve(facility_id, kinds={"hospital"}) if registry is not None else None
+                details = {"name": place["name"], "city": place["city"], "ward": None, "state": place["state"]} \
+                    if place is not None else {"name": facility_id, "city": None, "ward": None, "state": None}
+            store.upsert_facility(
+                facility_id, details["name"], city=details["city"], ward=details["ward"], state=details["state"],
+                total=total, occupied=self.occupied.get(facility_id, dict.fromkeys(self.bed_types, 0)),
+                timestamp=timestamp
+            )
+        return len(self.total)
+
+
+def _file_chunks(path, chunk_size=CHUNK_SIZE):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def _file_lines(path):
+    with open(path, encoding="utf-8") as f:
+        yield from f
+
+
+def _is_ndjson(source):
+    return source.split("?", 1)[0].endswith((".ndjson", ".jsonl"))
+
+
+def _resources_from(source):
+    """Resource iterator and byte counter for a file path or http(s) URL"""
+    if source.startswith(("http://", "https://")):
+        from http_client import http_client
+
+        response = http_client.get(source, source="fhir", stream=True, headers={"Accept": "application/fhir+json"})
+        response.raise_for_status()
+        if _is_ndjson(source) or "ndjson" in response.headers.get("Content-Type", ""):
+            return iter_ndjson_resources(response.iter_lines(decode_unicode=True)), response
+        return iter_bundle_resources(response.iter_content(CHUNK_SIZE)), response
+
+    if _is_ndjson(source):
+        return iter_ndjson_resources(_file_lines(source)), None
+    return iter_bundle_resources(_file_chunks(source)), None
+
+
+def ingest_fhir(source, store, registry=None):
+    """
+    Stream a FHIR Bundle (.json) or bulk export (.ndjson) from a path or URL
+    into a CapacityStore. Returns ingestion stats including resources/sec.
+    """
+    start = time.perf_counter()
+    census = BedCensus(store.bed_types)
+    resources, response = _resources_from(source)
+    try:
+        for resource in resources:
+            census.add(resource)
+    finally:
+        close = getattr(resources, "close", None)
+        if close is not None:
+            close()
+        if response is not None:
+            response.close()
+
+    facilities = census.load_into(store, registry)
+    elapsed = time.perf_counter() - start
+    return {
+        "source": source,
+        "resources": census.resources,
+        "beds": census.beds,
+        "facilities": facilities,
+        "elapsed": elapsed,
+        "resources_per_sec": census.resources / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def write_synthetic_bundle(path, facilities=100, beds_per_facility=500, occupancy=0.85, seed=42):
+    """
+    Write a FHIR Bundle of Organizations and bed Locations for benchmarks and
+    tests, streaming entries to disk so large bundles never sit in memory.
+    """
+    import random
+
+    rng = random.Random(seed)
+    type_shares = [("general", None, 0.80), ("hdu", "HDU", 0.08), ("icu", "ICU", 0.08), ("ventilator", "VENT", 0.04)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"resourceType": "Bundle", "type": "collection", "entry": [\n')
+        first = True
+        for i in range(facilities):
+            org_id = f"synthetic-hospital-{i}"
+            entries = [{"resource": {
+                "resourceType": "Organization", "id": org_id, "name": f"Synthetic Hospital {i}",
+                "address": [{"city": "Mumbai", "district": f"Ward {i % 24}", "state": "Maharashtra"}]
+            }}]
+            for b in range(beds_per_facility):
+                draw = rng.random()
+                for _, code, share in type_shares:
+                    draw -= share
+                    if draw <= 0:
+                        break
+                location = {
+                    "resourceType": "Location", "id": f"{org_id}-bed-{b}", "status": "active",
+                    "operationalStatus": {"code": "O" if rng.random() < occupancy else "U"},
+                    "physicalType": {"coding": [{"code": "bd", "display": "Bed"}]},
+                    "managingOrganization": {"reference": f"Organization/{org_id}"}
+                }
+                if code is not None:
+                    location["type"] = [{"coding": [{"code": code}]}]
+                entries.append({"resource": location})
+            for entry in entries:
+                f.write(("" if first else ",\n") + json.dumps(entry))
+                first = False
+        f.write("\n]}\n")
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import tracemalloc
+
+    from capacity_store import CapacityStore
+
+    path = os.path.join(tempfile.mkdtemp(), "bundle.json")
+    write_synthetic_bundle(path, facilities=200, beds_per_facility=1000)
+    print(f"Bundle size: {os.path.getsize(path) / 1e6:.1f} MB")
+
+    tracemalloc.start()
+    stats = ingest_fhir(path, CapacityStore())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"Ingested {stats['resources']:,} resources ({stats['beds']:,} beds, {stats['facilities']} facilities) "
+          f"in {stats['elapsed']:.2f}s - {stats['resources_per_sec']:,.0f} resources/sec, peak {peak / 1e6:.1f} MB")
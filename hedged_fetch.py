@@ -0,0 +1,163 @@
+# hedged_fetch.py
+"""
+Hedged requests across redundant data providers
+Starts the primary provider, races the next one if no answer arrives within a
+short hedge delay, returns the first valid answer and skips providers whose
+circuit breaker is open
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class CircuitBreaker:
+    """
+    Per-provider breaker: opens after `failure_threshold` consecutive
+    failures, then lets one trial call through every `reset_timeout` seconds
+    (half-open) until a call succeeds.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=60):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def allow(self):
+        """Whether a call may go out now; claims the single half-open trial slot"""
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_timeout and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def release(self):
+        """Give back a trial slot claimed by allow() for a call that never went out"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class HedgedFetcher:
+    """
+    Providers are (name, callable) pairs in priority order. Each callable
+    takes the fetch arguments and returns an answer, or None when it has no
+    valid answer; exceptions count as failures.
+
+    Python threads cannot be interrupted, so "cancelling" the losing request
+    means never starting queued ones and ignoring the result of a running one
+    (its HTTP timeout bounds how long it lingers). Late results still update
+    that provider's circuit breaker.
+    """
+
+    def __init__(self, providers, hedge_delay=1.0, timeout=15, failure_threshold=3,
+                 reset_timeout=60, max_workers=8):
+        self.providers = list(providers)
+        self.hedge_delay = hedge_delay
+        self.timeout = timeout
+        self.breakers = {name: CircuitBreaker(failure_threshold, reset_timeout) for name, _ in self.providers}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-fetch")
+        self._lock = threading.Lock()
+        self._served = {name: 0 for name, _ in self.providers}
+        self._served["none"] = 0
+        self.last_provider = None
+
+    def _call(self, name, provider, args):
+        try:
+            answer = provider(*args)
+        except Exception as e:
+            # Exception text can include the request URL and its API key
+            print(f"Provider {name} failed: {type(e).__name__}")
+            answer = None
+        if answer is None:
+            self.breakers[name].record_failure()
+        else:
+            self.breakers[name].record_success()
+        return answer
+
+    def fetch(self, *args, skip=()):
+        """
+        Return {'answer', 'provider', 'elapsed', 'attempted', 'skipped'}.
+        `answer` and `provider` are None when every provider failed, timed
+        out or was skipped (by name in `skip` or by an open breaker).
+        """
+        start = time.perf_counter()
+        deadline = start + self.timeout
+        queue, skipped = [], []
+        for name, provider in self.providers:
+            if name in skip:
+                continue
+            if self.breakers[name].allow():
+                queue.append((name, provider))
+            else:
+                skipped.append(name)
+
+        running, attempted = {}, []
+        answer = provider_name = None
+        while queue or running:
+            # Launch the next provider if nothing is running or the hedge delay elapsed
+            if queue and (not running or time.perf_counter() >= next_hedge):
+                name, provider = queue.pop(0)
+                running[self._executor.submit(self._call, name, provider, args)] = name
+                attempted.append(name)
+                next_hedge = time.perf_counter() + self.hedge_delay
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            wait_for = min(remaining, max(0.0, next_hedge - time.perf_counter())) if queue else remaining
+            done, _ = wait(running, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                if answer is None and future.result() is not None:
+                    answer, provider_name = future.result(), name
+            if answer is not None:
+                break
+            if done and queue:
+                next_hedge = time.perf_counter()  # A provider failed: hedge immediately
+
+        for future in running:
+            future.cancel()
+        for name, _ in queue:
+            self.breakers[name].release()
+
+        with self._lock:
+            self._served[provider_name or "none"] += 1
+            self.last_provider = provider_name
+        return {
+            "answer": answer,
+            "provider": provider_name,
+            "elapsed": time.perf_counter() - start,
+            "attempted": attempted,
+            "skipped": skipped
+        }
+
+    def stats(self):
+        """How many answers each provider served ('none' = all failed) and breaker states"""
+        with self._lock:
+            served = dict(self._served)
+        return {"served": served, "breakers": {name: b.state for name, b in self.breakers.items()}}
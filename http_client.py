@@ -0,0 +1,170 @@
+# http_client.py
+"""
+Shared pooled HTTP client for the Arogya Sentinel data tools
+Keeps connections alive in per-host pools, retries retryable failures with
+jittered exponential backoff inside an overall per-call deadline and records
+per-call statistics
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Responses worth retrying: throttling and transient upstream failures
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# External hosts served by mock_data_server.py when a mock server is configured
+MOCKED_HOSTS = frozenset({
+    "api.data.gov.in", "api.waqi.info", "date.nager.at", "airquality.googleapis.com"
+})
+
+
+class PooledHTTPClient:
+    """
+    One requests.Session shared by every tool.
+
+    The mounted HTTPAdapter keeps a keep-alive connection pool per host, so
+    repeated calls to data.gov.in, WAQI, Google and Nager.Date reuse their
+    TLS connections instead of handshaking on every call.
+
+    `deadline` caps a whole call, retries and backoff included: each attempt's
+    timeouts shrink to the time left and no retry starts once it has passed,
+    so a failing provider costs at most about that long.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=10, max_retries=2, deadline=12.0,
+                 backoff_base=0.5, backoff_cap=8.0, pool_connections=16,
+                 pool_maxsize=16, history_size=500, mock_server=None):
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.deadline = deadline
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        # Base URL of a local mock data server standing in for MOCKED_HOSTS
+        self.mock_server = mock_server if mock_server is not None else os.environ.get("AROGYA_MOCK_SERVER")
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        self._lock = threading.Lock()
+        self._history = deque(maxlen=history_size)
+
+    def _backoff(self, attempt, response=None):
+        """Seconds to wait before the next attempt: Retry-After if given, else full jitter"""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After", "")
+            if retry_after.isdigit():
+                return min(float(retry_after), self.backoff_cap)
+        return random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+
+    def use_mock_server(self, base_url):
+        """Route requests for MOCKED_HOSTS to a local mock server (None = real APIs)"""
+        self.mock_server = base_url
+
+    def _route(self, url):
+        """URL actually requested: external hosts become <mock>/<host>/<path> when mocking"""
+        if not self.mock_server:
+            return url
+        parts = urlsplit(url)
+        if parts.netloc not in MOCKED_HOSTS:
+            return url
+        query = f"?{parts.query}" if parts.query else ""
+        return f"{self.mock_server.rstrip('/')}/{parts.netloc}{parts.path}{query}"
+
+    def _record(self, method, url, source, status, attempts, elapsed, error=None):
+        parts = urlsplit(url)
+        with self._lock:
+            self._history.append({
+                "source": source or parts.netloc,
+                "host": parts.netloc,
+                "method": method,
+                "path": parts.path,  # Query strings are dropped; they can carry API keys
+                "status": status,
+                "attempts": attempts,
+                "elapsed": elapsed,
+                "error": error,
+                "timestamp": time.time()
+            })
+
+    def request(self, method, url, source=None, connect_timeout=None, read_timeout=None,
+                max_retries=None, deadline=None, **kwargs):
+        """
+        Send a request, retrying connection errors, timeouts and retryable
+        status codes while the deadline allows. Returns the final
+        requests.Response, or raises the last connection error once retries
+        or the deadline are exhausted.
+        """
+        connect_timeout = connect_timeout or self.connect_timeout
+        read_timeout = read_timeout or self.read_timeout
+        target = self._route(url)
+        retries = self.max_retries if max_retries is None else max_retries
+        start = time.perf_counter()
+        end = start + (deadline or self.deadline)
+
+        for attempt in range(retries + 1):
+            remaining = max(end - time.perf_counter(), 0.01)
+            timeout = (min(connect_timeout, remaining), min(read_timeout, remaining))
+            try:
+                response = self.session.request(method, target, timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self._backoff(attempt)
+                if attempt < retries and time.perf_counter() + delay < end:
+                    time.sleep(delay)
+                    continue
+                self._record(method, url, source, None, attempt + 1, time.perf_counter() - start, type(e).__name__)
+                raise
+
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < retries:
+                delay = self._backoff(attempt, response)
+                if time.perf_counter() + delay < end:
+                    response.close()
+                    time.sleep(delay)
+                    continue
+
+            self._record(method, url, source, response.status_code, attempt + 1, time.perf_counter() - start)
+            return response
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def calls(self):
+        """Per-call records, oldest first"""
+        with self._lock:
+            return list(self._history)
+
+    def stats(self):
+        """Per-source call counts, failures, retries and latency percentiles"""
+        summary = {}
+        for call in self.calls():
+            entry = summary.setdefault(call["source"], {"calls": 0, "failures": 0, "retries": 0, "latencies": []})
+            entry["calls"] += 1
+            entry["retries"] += call["attempts"] - 1
+            if call["error"] or (call["status"] or 500) >= 400:
+                entry["failures"] += 1
+            entry["latencies"].append(call["elapsed"])
+
+        for entry in summary.values():
+            latencies = sorted(entry.pop("latencies"))
+            entry["mean_latency"] = sum(latencies) / len(latencies)
+            entry["p95_latency"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        return summary
+
+    def reset_stats(self):
+        with self._lock:
+            self._history.clear()
+
+
+# Shared client used by every data tool
+http_client = PooledHTTPClient()
@@ -0,0 +1,102 @@
+# import_budget.py
+"""
+Cold-start import-time report for Arogya Sentinel
+Imports each entry module in a fresh interpreter with -X importtime, lists
+the slowest imports beneath it and fails when one exceeds its time budget
+"""
+
+import re
+import subprocess
+import sys
+
+# Cold import budgets in seconds for the entry points that users and workers start
+DEFAULT_BUDGETS = {
+    "surge_prediction_model": 0.25,
+    "data_sources": 0.5,
+    "fast_pipeline": 0.5,
+    "multi_city": 0.5,
+    "main": 1.5
+}
+
+_LINE = re.compile(r"import time:\s*(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S+)")
+
+
+def measure_import(module, python=None):
+    """
+    Import `module` in a new interpreter. Returns {'module', 'seconds'
+    (cumulative import time), 'imports' ([(name, self_s, cumulative_s,
+    depth)] in import order), 'error'}; seconds is None if the import failed.
+    """
+    proc = subprocess.run(
+        [python or sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    imports = []
+    for line in proc.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append((name, int(self_us) / 1e6, int(cumulative_us) / 1e6, (len(indent) - 1) // 2))
+
+    if proc.returncode != 0:
+        error = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        return {"module": module, "seconds": None, "imports": imports,
+                "error": error[-1] if error else f"exit code {proc.returncode}"}
+    total = next((cumulative for name, _, cumulative, depth in reversed(imports)
+                  if name == module and depth == 0), None)
+    return {"module": module, "seconds": total, "imports": imports, "error": None}
+
+
+def slowest_imports(measurement, top=8, max_depth=2):
+    """Slowest imports within `max_depth` levels of the entry module, by cumulative time"""
+    imports = measurement["imports"]
+    # -X importtime lists children before their parent: the entry module's
+    # imports are the lines after the previous top-level import
+    end = len(imports) - 1
+    start = end
+    while start > 0 and imports[start - 1][3] > 0:
+        start -= 1
+    candidates = [(name, cumulative) for name, _, cumulative, depth in imports[start:end]
+                  if depth <= max_depth]
+    return sorted(candidates, key=lambda item: item[1], reverse=True)[:top]
+
+
+def check_budgets(budgets=None, top=8):
+    """
+    Measure every module in `budgets` ({module: seconds}) and print a report.
+    Returns {module: 'ok' | 'over' | 'skipped'}; modules whose dependencies
+    are not installed here are skipped rather than failed.
+    """
+    budgets = budgets or DEFAULT_BUDGETS
+    outcome = {}
+    for module, budget in budgets.items():
+        measurement = measure_import(module)
+        if measurement["seconds"] is None:
+            print(f"⚠️  {module}: not importable here ({measurement['error']}); skipped")
+            outcome[module] = "skipped"
+            continue
+        seconds = measurement["seconds"]
+        outcome[module] = "ok" if seconds <= budget else "over"
+        icon = "✅" if outcome[module] == "ok" else "❌"
+        print(f"{icon} {module}: {seconds * 1000:.0f} ms (budget {budget * 1000:.0f} ms)")
+        for name, cumulative in slowest_imports(measurement, top):
+            print(f"     {cumulative * 1000:7.1f} ms  {name}")
+    return outcome
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Report cold import times against their budgets")
+    parser.add_argument("budgets", nargs="*", metavar="MODULE[=SECONDS]",
+                        help="Modules to check (default: the built-in entry point budgets)")
+    parser.add_argument("--top", type=int, default=8, help="Slowest imports to list per module")
+    args = parser.parse_args()
+
+    budgets = {}
+    for item in args.budgets:
+        module, _, seconds = item.partition("=")
+        budgets[module] = float(seconds) if seconds else DEFAULT_BUDGETS.get(module, 1.0)
+
+    outcome = check_budgets(budgets or None, top=args.top)
+    sys.exit(1 if "over" in outcome.values() else 0)
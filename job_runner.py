@@ -0,0 +1,336 @@
+# job_runner.py
+"""
+Background job runner for full analyses
+Runs fast-pipeline and crew analyses on a bounded worker pool instead of the
+caller's thread. Each job gets an ID; its status, stage and partial results
+are persisted to SQLite as its progress events arrive, so any session or
+process can poll a job or reattach to it. Duplicate submissions of an
+active analysis are rejected in favour of the running job.
+"""
+
+import importlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from progress_events import (
+    FINAL_EVENTS, PARTIAL_RESULT, RUN_COMPLETED, RUN_FAILED, RUN_STARTED, SOURCE_COMPLETED, STAGE_COMPLETED,
+    STAGE_STARTED, progress_bus, run_context
+)
+
+# Job kind -> "module:function" taking (location, **options)
+JOB_KINDS = {
+    "fast": "fast_pipeline:run_fast_pipeline",
+    "crew": "main:run_crew_analysis"
+}
+
+QUEUED, RUNNING, COMPLETED, FAILED = "queued", "running", "completed", "failed"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE = 16
+# Finished jobs are kept this long for polling and reattaching
+RETENTION = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    location TEXT NOT NULL,
+    dedup_key TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    stage TEXT,
+    partial TEXT NOT NULL DEFAULT '{}',
+    result TEXT,
+    error TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_active ON jobs (dedup_key) WHERE status IN ('queued', 'running');
+CREATE INDEX IF NOT EXISTS jobs_submitted ON jobs (submitted_at);
+"""
+
+
+def dedup_key(kind, location, options=None):
+    """Identity of an analysis: two active jobs may not share it"""
+    return json.dumps([kind, location.strip().lower(), options or {}], sort_keys=True)
+
+
+def _process_alive(owner):
+    """False only when `owner` is a process on this host that has exited"""
+    host, _, pid = owner.rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore:
+    """SQLite store of jobs and their progress (WAL mode, one connection per thread)"""
+
+    def __init__(self, path=None):
+        self.path = path or os.environ.get("AROGYA_JOB_DB", "jobs.sqlite")
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def insert(self, job_id, kind, location, options, owner):
+        """Record a queued job; False if an active job with the same analysis exists"""
+        try:
+            self._connect().execute(
+                "INSERT INTO jobs (job_id, kind, location, dedup_key, options, status, owner, submitted_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, location, dedup_key(kind, location, options), json.dumps(options, sort_keys=True),
+                 QUEUED, owner, time.time())
+            )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def update(self, job_id, **fields):
+        for name in ("partial", "result"):
+            if name in fields:
+                fields[name] = json.dumps(fields[name], default=str)
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        self._connect().execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", (*fields.values(), job_id))
+
+    def _row(self, row):
+        if row is None:
+            return None
+        job = dict(row)
+        job["options"] = json.loads(job["options"])
+        job["partial"] = json.loads(job["partial"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        del job["dedup_key"]
+        return job
+
+    def get(self, job_id):
+        """The job as a dict (partial and result decoded), or None"""
+        return self._row(self._connect().execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone())
+
+    def find_active(self, kind, location, options=None):
+        """The queued or running job for an analysis, or None"""
+        row = self._connect().execute(
+            "SELECT * FROM jobs WHERE dedup_key = ? AND status IN ('queued', 'running')",
+            (dedup_key(kind, location, options),)
+        ).fetchone()
+        return self._row(row)
+
+    def list(self, statuses=None, limit=20):
+        """Most recently submitted jobs, without their results"""
+        query = ("SELECT job_id, kind, location, status, stage, submitted_at, started_at, finished_at, error "
+                 "FROM jobs")
+        params = ()
+        if statuses:
+            query += f" WHERE status IN ({', '.join('?' for _ in statuses)})"
+            params = tuple(statuses)
+        rows = self._connect().execute(query + " ORDER BY submitted_at DESC LIMIT ?", (*params, limit))
+        return [dict(row) for row in rows]
+
+    def fail_orphans(self):
+        """Mark active jobs whose worker process has exited as failed; returns how many"""
+        orphans = [row["job_id"] for row in self._connect().execute(
+            "SELECT job_id, owner FROM jobs WHERE status IN ('queued', 'running')"
+        ) if not _process_alive(row["owner"])]
+        for job_id in orphans:
+            self.update(job_id, status=FAILED, finished_at=time.time(),
+                        error="Interrupted: the worker process exited")
+        return len(orphans)
+
+    def purge_finished(self, max_age=RETENTION):
+        self._connect().execute(
+            "DELETE FROM jobs WHERE status IN ('completed', 'failed') AND finished_at < ?", (time.time() - max_age,)
+        )
+
+
+def _merge_event(partial, event):
+    """Fold one progress event into a job's persisted partial results; False if nothing changed"""
+    kind, stage, data = event["kind"], event["stage"], event["data"]
+    if kind == SOURCE_COMPLETED:
+        partial.setdefault("sources", {})[data["source"]] = {"ok": data["ok"], "elapsed": data["elapsed"]}
+    elif kind == PARTIAL_RESULT:
+        partial.setdefault(stage, {}).update(data)
+    elif kind == STAGE_COMPLETED and data.get("text"):
+        partial.setdefault("sections", {})[stage] = data["text"]
+    elif kind != STAGE_STARTED:
+        return False
+    return True
+
+
+class JobRunner:
+    """
+    Bounded pool running analysis jobs. At most max_workers jobs run at once
+    and at most max_queued more wait; submissions beyond that raise
+    RuntimeError. Progress events of this runner's jobs are persisted to the
+    store by one listener thread.
+    """
+
+    def __init__(self, store=None, max_workers=None, max_queued=None, targets=None, bus=None):
+        self.store = store or JobStore()
+        self.max_workers = max_workers or int(os.environ.get("AROGYA_JOB_WORKERS", DEFAULT_WORKERS))
+        if max_queued is None:
+            max_queued = int(os.environ.get("AROGYA_JOB_QUEUE", DEFAULT_QUEUE))
+        self.max_queued = max_queued
+        self.targets = dict(JOB_KINDS, **(targets or {}))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._bus = bus or progress_bus
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="arogya-job")
+        self._lock = threading.Lock()
+        self._pending = set()  # Queued or running here
+        self._recording = set()  # Progress still to persist (until the job's final event)
+        self.store.fail_orphans()
+        self.store.purge_finished()
+        self._events = self._bus.subscribe()
+        threading.Thread(target=self._record_events, name="arogya-job-events", daemon=True).start()
+
+    def _target(self, kind):
+        target = self.targets[kind]
+        if isinstance(target, str):
+            module, _, function = target.partition(":")
+            target = getattr(importlib.import_module(module), function)
+        return target
+
+    def submit(self, kind, location, **options):
+        """
+        Queue an analysis and return (job_id, accepted). When the same
+        analysis is already queued or running it is not queued again:
+        accepted is False and job_id is the active job's, to attach to.
+        """
+        if kind not in self.targets:
+            raise ValueError(f"Unknown job kind '{kind}'; expected one of {sorted(self.targets)}")
+        with self._lock:
+            active = self.store.find_active(kind, location, options)
+            if active is not None:
+                return active["job_id"], False
+            if len(self._pending) >= self.max_workers + self.max_queued:
+                raise RuntimeError(f"Job queue full ({len(self._pending)} analyses pending); try again shortly")
+            job_id = uuid.uuid4().hex[:12]
+            if not self.store.insert(job_id, kind, location, options, self.owner):
+                # Submitted by another process in the meantime
+                return self.store.find_active(kind, location, options)["job_id"], False
+            self._pending.add(job_id)
+            self._recording.add(job_id)
+        self._executor.submit(self._run, job_id, kind, location, options)
+        return job_id, True
+
+    def _run(self, job_id, kind, location, options):
+        try:
+            with run_context(job_id):
+                self.store.update(job_id, status=RUNNING, started_at=time.time())
+                self._bus.publish(RUN_STARTED, run_id=job_id)
+                start = time.perf_counter()
+                try:
+                    result = self._target(kind)(location, **options)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    self.store.update(job_id, status=FAILED, finished_at=time.time(), error=error)
+                    self._bus.publish(RUN_FAILED, run_id=job_id, error=error, elapsed=time.perf_counter() - start)
+                else:
+                    self.store.update(job_id, status=COMPLETED, finished_at=time.time(), result=result)
+                    self._bus.publish(RUN_COMPLETED, run_id=job_id, result=result,
+                                      elapsed=time.perf_counter() - start)
+        finally:
+            with self._lock:
+                self._pending.discard(job_id)
+
+    def _record_events(self):
+        """Persist stage changes and partial results of this runner's jobs as their events arrive"""
+        partials = {}
+        while True:
+            event = self._events.get()
+            job_id = event["run_id"]
+            with self._lock:
+                if job_id not in self._recording:
+                    continue
+                if event["kind"] in FINAL_EVENTS:
+                    self._recording.discard(job_id)
+                    partials.pop(job_id, None)
+                    continue
+            partial = partials.setdefault(job_id, {})
+            if _merge_event(partial, event):
+                fields = {"partial": partial}
+                if event["kind"] in (STAGE_STARTED, STAGE_COMPLETED):
+                    fields["stage"] = event["stage"]
+                self.store.update(job_id, **fields)
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    def wait(self, job_id, timeout=None, poll=0.2):
+        """Poll until the job finishes and return it; TimeoutError after `timeout` seconds"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.store.get(job_id)
+            if job is None or job["status"] not in ACTIVE_STATUSES:
+                return job
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"Job {job_id} still {job['status']} after {timeout}s")
+            time.sleep(poll)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+        self._bus.unsubscribe(self._events)
+
+
+_shared_runner = None
+_shared_lock = threading.Lock()
+
+
+def get_job_runner():
+    """Process-wide JobRunner, started on first use"""
+    global _shared_runner
+    with _shared_lock:
+        if _shared_runner is None:
+            _shared_runner = JobRunner()
+        return _shared_runner
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Submit analyses as background jobs or list recent jobs")
+    parser.add_argument("--submit", help="Comma-separated locations to analyse")
+    parser.add_argument("--kind", choices=sorted(JOB_KINDS), default="fast")
+    parser.add_argument("--status", help="Show one job")
+    args = parser.parse_args()
+
+    if args.submit:
+        runner = get_job_runner()
+        job_ids = []
+        for location in [name.strip() for name in args.submit.split(",") if name.strip()]:
+            job_id, accepted = runner.submit(args.kind, location)
+            print(f"{'🆕 Queued' if accepted else '🔁 Already running'} {args.kind} analysis for {location}: {job_id}")
+            job_ids.append(job_id)
+        for job_id in job_ids:
+            job = runner.wait(job_id)
+            print(f"   {job_id} {job['location']}: {job['status']} {job['error'] or ''}")
+    elif args.status:
+        job = JobStore().get(args.status)
+        print(json.dumps(job, indent=2, default=str) if job else f"No job {args.status}")
+    else:
+        for job in JobStore().list():
+            elapsed = (job["finished_at"] or time.time()) - (job["started_at"] or job["submitted_at"])
+            print(f"{job['job_id']}  {job['kind']:<5} {job['location']:<12} {job['status']:<10} "
+                  f"{job['stage'] or '-':<17} {elapsed:6.1f}s  {job['error'] or ''}")
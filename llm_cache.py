@@ -0,0 +1,268 @@
+# llm_cache.py
+"""
+On-disk cache for individual LLM calls made by the crew's agents
+SQLite-backed (WAL mode) store of chat completions keyed on the model,
+normalized messages and call parameters, with size-bounded LRU eviction and
+hit-rate metrics; plugs into LangChain chat models as their cache
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import warnings
+
+DEFAULT_MAX_MB = 64
+
+# Client settings that do not change the completion, left out of the key
+IGNORED_PARAMS = {"streaming", "callbacks", "verbose", "max_retries", "request_timeout", "openai_api_key",
+                  "api_key", "timeout"}
+# Per-message fields that differ between byte-identical conversations
+IGNORED_MESSAGE_FIELDS = {"id", "response_metadata", "usage_metadata"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS calls (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS calls_last_used ON calls (last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    model TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (model, outcome)
+);
+"""
+
+
+def llm_cache_enabled():
+    """LLM calls always go to the provider when AROGYA_LLM_CACHE_DISABLED=1"""
+    return os.environ.get("AROGYA_LLM_CACHE_DISABLED") != "1"
+
+
+def normalize_text(text):
+    """Unify line endings and drop trailing whitespace, which never changes a completion"""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        return normalize_text(value)
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items() if k not in IGNORED_MESSAGE_FIELDS}
+    return value
+
+
+def normalize_messages(prompt):
+    """Canonical JSON for a serialized message list (LangChain's dumps(messages)) or a plain prompt"""
+    try:
+        messages = json.loads(prompt)
+    except (TypeError, ValueError):
+        return normalize_text(str(prompt))
+    return json.dumps(_normalize(messages), sort_keys=True, separators=(",", ":"))
+
+
+def normalize_params(llm_string):
+    """
+    (model, canonical parameters) from a LangChain llm_string: the serialized
+    client ("{...}") and the call parameters after "---"
+    """
+    serialized, _, call_params = llm_string.partition("---")
+    try:
+        client = json.loads(serialized)
+        kwargs = client.get("kwargs", {}) if isinstance(client, dict) else {}
+    except ValueError:
+        match = re.search(r"model(?:_name)?['\"]?\s*[:,]\s*['\"]([^'\"]+)", llm_string)
+        return (match.group(1) if match else "unknown"), normalize_text(llm_string)
+    settings = {k: v for k, v in kwargs.items() if k not in IGNORED_PARAMS}
+    model = settings.get("model_name") or settings.get("model") or "unknown"
+    return model, json.dumps(settings, sort_keys=True, default=str) + "---" + call_params.strip()
+
+
+def make_key(prompt, llm_string):
+    """(cache key, model) for one call"""
+    model, params = normalize_params(llm_string)
+    digest = hashlib.sha256(f"{params}\n{normalize_messages(prompt)}".encode("utf-8")).hexdigest()
+    return digest, model
+
+
+class LLMCallCache:
+    """
+    Disk-backed completion store. Lookups refresh an entry's last use; when
+    the stored values exceed max_bytes the least recently used are evicted.
+    Outcome counters (hit, miss, write, evicted) are kept per model.
+    """
+
+    def __init__(self, path=None, max_bytes=None):
+        self.path = path or os.environ.get("AROGYA_LLM_CACHE_PATH", "llm_cache.sqlite")
+        if max_bytes is None:
+            max_bytes = float(os.environ.get("AROGYA_LLM_CACHE_MAX_MB", DEFAULT_MAX_MB)) * 1024 * 1024
+        self.max_bytes = int(max_bytes)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        """One connection per thread; SQLite connections are not shareable across threads"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, model, outcome, count=1):
+        self._connect().execute(
+            "INSERT INTO counters (model, outcome, count) VALUES (?, ?, ?) "
+            "ON CONFLICT(model, outcome) DO UPDATE SET count = count + excluded.count",
+            (model, outcome, count)
+        )
+
+    def get(self, key, model="unknown"):
+        """Stored value for a key (counted as a hit or miss), or None"""
+        conn = self._connect()
+        row = conn.execute("SELECT value FROM calls WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._count(model, "miss")
+            return None
+        conn.execute("UPDATE calls SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        self._count(model, "hit")
+        return row[0]
+
+    def put(self, key, model, value):
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO calls (key, model, value, size, created_at, last_used, hits) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (key, model, value, len(value.encode("utf-8")), now, now)
+        )
+        self._count(model, "write")
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used entries until the stored values fit in max_bytes"""
+        conn = self._connect()
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM calls").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        evicted = []
+        for key, model, size in conn.execute("SELECT key, model, size FROM calls ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key, model))
+            total -= size
+        conn.executemany("DELETE FROM calls WHERE key = ?", [(key,) for key, _ in evicted])
+        for model in {model for _, model in evicted}:
+            self._count(model, "evicted", sum(1 for _, m in evicted if m == model))
+        return len(evicted)
+
+    def stats(self):
+        """Hit rate and outcome counts overall and per model, plus stored entries and bytes"""
+        conn = self._connect()
+        by_model = {}
+        for model, outcome, count in conn.execute("SELECT model, outcome, count FROM counters"):
+            by_model.setdefault(model, {"hit": 0, "miss": 0, "write": 0, "evicted": 0})[outcome] = count
+        for counts in by_model.values():
+            lookups = counts["hit"] + counts["miss"]
+            counts["hit_rate"] = counts["hit"] / lookups if lookups else 0.0
+        entries, stored = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM calls").fetchone()
+        hits = sum(counts["hit"] for counts in by_model.values())
+        lookups = hits + sum(counts["miss"] for counts in by_model.values())
+        return {
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evicted": sum(counts["evicted"] for counts in by_model.values()),
+            "entries": entries,
+            "bytes": stored,
+            "max_bytes": self.max_bytes,
+            "by_model": by_model
+        }
+
+    def reset_stats(self):
+        self._connect().execute("DELETE FROM counters")
+
+    def clear(self):
+        self._connect().execute("DELETE FROM calls")
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_llm_cache():
+    """Process-wide LLMCallCache, opened on first use"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = LLMCallCache()
+        return _shared_cache
+
+
+def langchain_llm_cache(cache=None):
+    """
+    A LangChain BaseCache over an LLMCallCache (the shared one by default),
+    for a chat model's `cache=` argument. The bypass switch is checked on
+    every call, so it takes effect without rebuilding the client.
+    """
+    from langchain_core.caches import BaseCache
+    from langchain_core.load import dumps, loads
+
+    store = cache or get_llm_cache()
+
+    class LangChainLLMCache(BaseCache):
+        def lookup(self, prompt, llm_string):
+            if not llm_cache_enabled():
+                return None
+            key, model = make_key(prompt, llm_string)
+            value = store.get(key, model)
+            if value is None:
+                return None
+            with warnings.catch_warnings():
+                # Our own serialized generations: silence LangChain's beta/untrusted-input notices
+                warnings.simplefilter("ignore")
+                return loads(value)
+
+        def update(self, prompt, llm_string, return_val):
+            if llm_cache_enabled():
+                key, model = make_key(prompt, llm_string)
+                store.put(key, model, dumps(return_val))
+
+        def clear(self, **kwargs):
+            store.clear()
+
+    return LangChainLLMCache()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or clear the on-disk LLM call cache")
+    parser.add_argument("--clear", action="store_true", help="Delete every stored completion")
+    parser.add_argument("--reset-stats", action="store_true", help="Zero the hit/miss counters")
+    args = parser.parse_args()
+
+    cache = get_llm_cache()
+    if args.clear:
+        cache.clear()
+    if args.reset_stats:
+        cache.reset_stats()
+    stats = cache.stats()
+    print(f"🧠 LLM cache {cache.path}: {stats['entries']} completions, {stats['bytes'] / 1024:.0f} KiB "
+          f"of {stats['max_bytes'] / 1024 / 1024:.0f} MiB")
+    print(f"   Hit rate {stats['hit_rate']:.0%} ({stats['hits']} hits, {stats['misses']} misses, "
+          f"{stats['evicted']} evicted)")
+    for model, counts in sorted(stats["by_model"].items()):
+        print(f"   - {model}: {counts['hit_rate']:.0%} of {counts['hit'] + counts['miss']} lookups")
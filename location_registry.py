@@ -0,0 +1,131 @@
+# location_registry.py
+"""
+Spatial location registry for cities, wards, AQI monitoring stations and hospitals
+Loads entries with aliases and coordinates from a local CSV and answers
+nearest-neighbour and radius queries with haversine ball trees
+"""
+
+import csv
+import os
+import re
+import threading
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "locations.csv")
+MAX_ALIAS_WORDS = 4
+
+
+def normalize_name(text):
+    """Lowercase, drop punctuation (keeping '/' for ward codes) and collapse whitespace"""
+    return " ".join(re.sub(r"[^\w/ ]+", " ", text.lower()).split())
+
+
+class LocationRegistry:
+    """
+    In-memory registry of named places.
+
+    Name resolution is a dictionary lookup over every alias and over word
+    n-grams of free text ("Andheri East, Mumbai" -> Andheri East ward), so it
+    does not scan the registry. Spatial queries use one sklearn BallTree per
+    kind with the haversine metric.
+    """
+
+    def __init__(self, entries):
+        self.entries = list(entries)
+        self._by_alias = {}
+        for index, entry in enumerate(self.entries):
+            for alias in [entry["name"], entry["id"]] + entry["aliases"]:
+                # First registration wins, so cities listed first keep short aliases
+                self._by_alias.setdefault(normalize_name(alias), index)
+
+        self._trees = {}
+        self._tree_lock = threading.Lock()
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_REGISTRY_PATH):
+        """Load entries from a CSV with id,name,kind,city,state,lat,lon,aliases ('|'-separated)"""
+        entries = []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                entries.append({
+                    "id": row["id"],
+                    "name": row["name"],
+                    "kind": row["kind"],
+                    "city": row.get("city") or None,
+                    "state": row.get("state") or None,
+                    "lat": float(row["lat"]),
+                    "lon": float(row["lon"]),
+                    "aliases": [a.strip() for a in (row.get("aliases") or "").split("|") if a.strip()]
+                })
+        return cls(entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def resolve(self, text, kinds=None):
+        """
+        Best registry entry named in free text, or None if nothing matches.
+        Longer alias matches win, then earlier positions in the text.
+        """
+        words = normalize_name(text).split()
+        for size in range(min(MAX_ALIAS_WORDS, len(words)), 0, -1):
+            for start in range(len(words) - size + 1):
+                index = self._by_alias.get(" ".join(words[start:start + size]))
+                if index is not None and (kinds is None or self.entries[index]["kind"] in kinds):
+                    return self.entries[index]
+        return None
+
+    def _tree(self, kind):
+        """Ball tree over one kind of entry, built on first use"""
+        with self._tree_lock:
+            if kind not in self._trees:
+                from sklearn.neighbors import BallTree
+
+                members = np.array([i for i, e in enumerate(self.entries) if e["kind"] == kind], dtype=int)
+                if members.size == 0:
+                    self._trees[kind] = (None, members)
+                else:
+                    coords = np.radians([[self.entries[i]["lat"], self.entries[i]["lon"]] for i in members])
+                    self._trees[kind] = (BallTree(coords, metric="haversine"), members)
+            return self._trees[kind]
+
+    def nearest(self, lat, lon, kind="aqi_station", k=1):
+        """The k nearest entries of a kind, each as (entry, distance_km), closest first"""
+        tree, members = self._tree(kind)
+        if tree is None:
+            return []
+        k = min(k, len(members))
+        distances, indices = tree.query(np.radians([[lat, lon]]), k=k)
+        return [(self.entries[members[i]], float(d * EARTH_RADIUS_KM)) for d, i in zip(distances[0], indices[0])]
+
+    def within_radius(self, lat, lon, radius_km, kind="hospital"):
+        """All entries of a kind within radius_km, each as (entry, distance_km), closest first"""
+        tree, members = self._tree(kind)
+        if tree is None:
+            return []
+        indices, distances = tree.query_radius(
+            np.radians([[lat, lon]]), r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True
+        )
+        return [(self.entries[members[i]], float(d * EARTH_RADIUS_KM)) for d, i in zip(distances[0], indices[0])]
+
+    def nearest_to(self, text, kind="aqi_station", k=1):
+        """Resolve a place name, then find its nearest entries of a kind; [] if the name is unknown"""
+        place = self.resolve(text)
+        if place is None:
+            return []
+        return self.nearest(place["lat"], place["lon"], kind=kind, k=k)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_location_registry():
+    """Process-wide registry loaded from AROGYA_LOCATIONS_PATH or data/locations.csv"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = LocationRegistry.from_csv(os.environ.get("AROGYA_LOCATIONS_PATH", DEFAULT_REGISTRY_PATH))
+        return _registry
@@ -0,0 +1,354 @@
+# mock_data_server.py
+"""
+Local stand-in for the external data APIs
+Serves the response shapes the data tools parse (data.gov.in, WAQI, Nager.Date,
+Google Air Quality, plus a FHIR bed bundle) with configurable latency, error
+rates and payload sizes, for offline load and tail-latency testing
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# Route name -> mocked host (first path segment of a rewritten URL)
+ROUTES = {
+    "data.gov.in": "api.data.gov.in",
+    "waqi": "api.waqi.info",
+    "nager_date": "date.nager.at",
+    "google_air_quality": "airquality.googleapis.com",
+    "fhir": "fhir"
+}
+
+DEFAULT_CONFIG = {
+    "latency_ms": 50,        # Base response delay
+    "jitter_ms": 20,         # Uniform extra delay 0..jitter_ms
+    "slow_rate": 0.0,        # Fraction of responses that take slow_ms instead (tail latency)
+    "slow_ms": 2000,
+    "error_rate": 0.0,       # Fraction of responses answered with error_status
+    "error_status": 503,
+    "records": 10,           # data.gov.in records per response
+    "record_bytes": 200,     # Approximate size of each data.gov.in record
+    "fhir_facilities": 20,   # Synthetic FHIR bundle size
+    "fhir_beds": 200,
+    "seed": 42
+}
+
+
+class MockBehaviour:
+    """
+    Latency and error decisions per request. Each decision is seeded from
+    (seed, route, per-route request number), so a run with the same config
+    and request order produces the same delays and errors.
+    """
+
+    def __init__(self, config=None, overrides=None):
+        self._lock = threading.Lock()
+        self.config = dict(DEFAULT_CONFIG, **(config or {}))
+        self.overrides = {route: dict(values) for route, values in (overrides or {}).items()}
+        self._counters = {}
+        self._served = {}
+
+    def update(self, config=None, overrides=None):
+        """Change behaviour while the server runs; route overrides are merged"""
+        with self._lock:
+            self.config.update(config or {})
+            for route, values in (overrides or {}).items():
+                self.overrides.setdefault(route, {}).update(values)
+
+    def settings(self, route):
+        with self._lock:
+            return dict(self.config, **self.overrides.get(route, {}))
+
+    def decide(self, route):
+        """(settings, delay seconds, error status or None) for the next request on a route"""
+        settings = self.settings(route)
+        with self._lock:
+            n = self._counters[route] = self._counters.get(route, 0) + 1
+        rng = random.Random(f"{settings['seed']}:{route}:{n}")
+        if rng.random() < settings["slow_rate"]:
+            delay_ms = settings["slow_ms"]
+        else:
+            delay_ms = settings["latency_ms"] + rng.uniform(0, settings["jitter_ms"])
+        error = settings["error_status"] if rng.random() < settings["error_rate"] else None
+        return settings, delay_ms / 1000, error
+
+    def record(self, route, status):
+        with self._lock:
+            counts = self._served.setdefault(route, {"requests": 0, "errors": 0})
+            counts["requests"] += 1
+            counts["errors"] += status >= 400
+
+    def stats(self):
+        with self._lock:
+            return {route: dict(counts) for route, counts in self._served.items()}
+
+
+def _rng_for(*parts):
+    return random.Random(hashlib.sha256(":".join(map(str, parts)).encode()).hexdigest())
+
+
+def aqi_for(place, day=None):
+    """Deterministic AQI for a place and day, so repeated runs see the same values"""
+    return _rng_for(place.lower(), day or date.today()).randint(40, 320)
+
+
+def data_gov_payload(settings, resource):
+    rng = _rng_for(settings["seed"], resource)
+    filler = "x" * max(0, settings["record_bytes"] - 120)
+    records = [{
+        "state": rng.choice(["Maharashtra", "Delhi", "Karnataka", "Tamil Nadu", "West Bengal"]),
+        "disease": rng.choice(["Influenza-like illness", "Dengue", "Acute diarrhoeal disease", "Malaria"]),
+        "cases": rng.randint(5, 500),
+        "week": rng.randint(1, 52),
+        "notes": filler
+    } for _ in range(settings["records"])]
+    return {"status": "ok", "total": len(records), "count": len(records), "records": records}
+
+
+def waqi_payload(feed):
+    place = feed.strip("/").split("/")[-1]
+    if place.startswith("geo:"):
+        lat, lon = (float(v) for v in place[4:].split(";"))
+        name = f"Mock station ({lat:.3f}, {lon:.3f})"
+    else:
+        name = place.title()
+    return {"status": "ok", "data": {"aqi": aqi_for(place), "idx": 1, "city": {"name": name}}}
+
+
+def google_payload(body):
+    location = body.get("location", {})
+    aqi = aqi_for(f"{location.get('latitude')};{location.get('longitude')}")
+    category = "Good air quality" if aqi <= 50 else "Moderate air quality" if aqi <= 100 else "Poor air quality"
+    return {"indexes": [{"code": "uaqi", "aqi": aqi, "category": category, "dominantPollutant": "pm25"}]}
+
+
+def nager_payload(year):
+    """Fixed-date national holidays plus a few lunar festivals at their mock dates"""
+    holidays = [("01-26", "Republic Day"), ("08-15", "Independence Day"), ("10-02", "Gandhi Jayanti"),
+                ("12-25", "Christmas Day")]
+    rng = _rng_for("festivals", year)
+    start = date(year, 1, 1)
+    for name in ["Holi", "Diwali", "Eid al-Fitr", "Dussehra"]:
+        holidays.append(((start + timedelta(days=rng.randint(30, 330))).strftime("%m-%d"), name))
+    return [{"date": f"{year}-{day}", "localName": name, "name": name, "countryCode": "IN",
+             "global": True, "types": ["Public"]} for day, name in sorted(holidays)]
+
+
+class MockDataServer:
+    """ThreadingHTTPServer on localhost running in a background thread"""
+
+    def __init__(self, host="127.0.0.1", port=0, config=None, overrides=None):
+        self.behaviour = MockBehaviour(config, overrides)
+        self._bundles = {}
+        self._bundle_dir = tempfile.mkdtemp(prefix="mock_fhir_")
+        self._bundle_lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def fhir_bundle(self, facilities, beds):
+        """Path of a synthetic FHIR bundle, written once per size"""
+        from fhir_ingest import write_synthetic_bundle
+
+        with self._bundle_lock:
+            key = (facilities, beds)
+            if key not in self._bundles:
+                path = os.path.join(self._bundle_dir, f"beds_{facilities}_{beds}.json")
+                write_synthetic_bundle(path, facilities=facilities, beds_per_facility=beds)
+                self._bundles[key] = path
+            return self._bundles[key]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_file(self, path):
+                self.send_response(200)
+                self.send_header("Content-Type", "application/fhir+json")
+                self.send_header("Content-Length", str(os.path.getsize(path)))
+                self.end_headers()
+                with open(path, "rb") as f:
+                    while chunk := f.read(1 << 16):
+                        self.wfile.write(chunk)
+
+            def _body(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+            def _control(self, method):
+                """/__stats (GET) and /__config (POST {config, overrides})"""
+                if self.path == "/__stats":
+                    self._send_json(200, server.behaviour.stats())
+                elif self.path == "/__config" and method == "POST":
+                    body = self._body()
+                    server.behaviour.update(body.get("config"), body.get("overrides"))
+                    self._send_json(200, {"config": server.behaviour.config, "overrides": server.behaviour.overrides})
+                else:
+                    self._send_json(404, {"error": "unknown control endpoint"})
+
+            def _handle(self, method):
+                parts = urlsplit(self.path)
+                if parts.path.startswith("/__"):
+                    return self._control(method)
+
+                host, _, path = parts.path.lstrip("/").partition("/")
+                route = next((name for name, mocked in ROUTES.items() if mocked == host), None)
+                body = self._body() if method == "POST" else {}
+                if route is None:
+                    return self._send_json(404, {"error": f"no mock for host {host}"})
+
+                settings, delay, error = server.behaviour.decide(route)
+                time.sleep(delay)
+                if error is not None:
+                    server.behaviour.record(route, error)
+                    return self._send_json(error, {"error": "mock failure"})
+
+                query = parse_qs(parts.query)
+                if route == "data.gov.in":
+                    payload = data_gov_payload(settings, path.rsplit("/", 1)[-1])
+                elif route == "waqi":
+                    payload = waqi_payload(path)
+                elif route == "google_air_quality":
+                    payload = google_payload(body)
+                elif route == "nager_date":
+                    payload = nager_payload(int(path.strip("/").split("/")[-2]))
+                else:
+                    facilities = int(query.get("facilities", [settings["fhir_facilities"]])[0])
+                    beds = int(query.get("beds", [settings["fhir_beds"]])[0])
+                    server.behaviour.record(route, 200)
+                    return self._send_file(server.fhir_bundle(facilities, beds))
+
+                server.behaviour.record(route, 200)
+                self._send_json(200, payload)
+
+            def do_GET(self):
+                self._handle("GET")
+
+            def do_POST(self):
+                self._handle("POST")
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+def start_mock_server(port=0, config=None, overrides=None):
+    """Start a mock server in the background and return it (server.url is its base URL)"""
+    return MockDataServer(port=port, config=config, overrides=overrides).start()
+
+
+def load_test(requests=200, concurrency=8, location="Mumbai"):
+    """
+    Call every data fetcher `requests` times through the shared HTTP client,
+    with the response cache bypassed, and report throughput and latency
+    percentiles per fetcher. Set AROGYA_MOCK_SERVER before data_sources is
+    imported so every call goes to the mock server.
+    """
+    import numpy as np
+
+    from data_sources import (
+        fetch_air_quality_data, fetch_festival_calendar, fetch_hospital_data, fetch_public_health_data
+    )
+
+    # __wrapped__ skips the response cache so every call reaches the server
+    fetchers = {
+        "public_health": lambda: fetch_public_health_data.__wrapped__(f"{location} disease surveillance"),
+        "air_quality": lambda: fetch_air_quality_data.__wrapped__(location),
+        "festival_calendar": lambda: fetch_festival_calendar(location),
+        "hospital": lambda: fetch_hospital_data.__wrapped__(location)
+    }
+
+    report = {}
+    for name, fetch in fetchers.items():
+        def timed(_):
+            start = time.perf_counter()
+            output = fetch()
+            return time.perf_counter() - start, "Using fallback data" in output
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, range(requests)))
+        wall = time.perf_counter() - start
+        latencies = np.array([r[0] for r in results]) * 1000
+        report[name] = {
+            "requests": requests,
+            "throughput": requests / wall,
+            "fallbacks": sum(r[1] for r in results),
+            "p50_ms": float(np.percentile(latencies, 50)),
+            "p95_ms": float(np.percentile(latencies, 95)),
+            "p99_ms": float(np.percentile(latencies, 99))
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local mock of the Arogya Sentinel external data APIs")
+    parser.add_argument("--port", type=int, default=8765)
+    for key, value in DEFAULT_CONFIG.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", type=type(value), default=value)
+    parser.add_argument("--load-test", type=int, metavar="N", help="Run N requests per fetcher against the server and exit")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    config = {key: getattr(args, key) for key in DEFAULT_CONFIG}
+    server = start_mock_server(args.port, config)
+    print(f"Mock data server running at {server.url}")
+
+    if args.load_test:
+        os.environ["AROGYA_MOCK_SERVER"] = server.url
+        os.environ.setdefault("AROGYA_FHIR_SOURCE", f"{server.url}/fhir/Bundle")
+        report = load_test(args.load_test, args.concurrency)
+        for name, row in report.items():
+            print(f"{name:18s} {row['throughput']:8.1f} req/s  p50 {row['p50_ms']:7.1f} ms  "
+                  f"p95 {row['p95_ms']:7.1f} ms  p99 {row['p99_ms']:7.1f} ms  fallbacks {row['fallbacks']}")
+        print(f"Server stats: {server.behaviour.stats()}")
+        server.shutdown()
+        return
+
+    print(f"Point the tools at it with: export AROGYA_MOCK_SERVER={server.url}")
+    print(f"FHIR bed bundle: export AROGYA_FHIR_SOURCE={server.url}/fhir/Bundle")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+# multi_city.py
+"""
+Concurrent multi-city analysis for Arogya Sentinel
+Runs the fast pipeline or a per-location crew for several cities at once
+under a concurrency limit and per-location timeouts, reusing the model and
+location-independent data, and aggregates the results into one comparison
+"""
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextvars import copy_context
+
+from data_prefetch import prefetch_shared_sources
+from report_builder import parse_surge_percentage
+from surge_prediction_model import classify_risk
+
+DEFAULT_CITIES = ["Mumbai", "Delhi", "Bangalore", "Pune", "Chennai"]
+
+
+def _fast_analysis(location, model, shared, force_refresh):
+    from fast_pipeline import run_fast_pipeline
+
+    result = run_fast_pipeline(location, model=model, force_refresh=force_refresh, shared=shared)
+    return {
+        "surge_percentage": result["prediction"]["surge_percentage"],
+        "risk_level": result["prediction"]["risk_level"],
+        "confidence": result["prediction"]["confidence"],
+        "aqi": result["features"]["aqi_value"],
+        "festival_score": result["features"]["festival_score"],
+        "capacity": result["capacity"],
+        "from_cache": result["from_cache"],
+        "report": result["report"]
+    }
+
+
+def _crew_analysis(location, model, shared, force_refresh):
+    # Imported here: CrewAI and the LLM client are only needed in crew mode
+    from main import run_crew_analysis
+
+    result = run_crew_analysis(location, force_refresh=force_refresh, shared=shared)
+    surge = parse_surge_percentage(result["report"])
+    return {
+        "surge_percentage": surge,
+        "risk_level": classify_risk(surge)[0] if surge is not None else None,
+        "confidence": None,
+        "aqi": None,
+        "festival_score": None,
+        "capacity": None,
+        "from_cache": result["from_cache"],
+        "report": result["report"]
+    }
+
+
+ANALYSES = {"fast": _fast_analysis, "crew": _crew_analysis}
+
+
+def format_comparison(rows):
+    """Markdown table of locations ranked by predicted surge (failed locations last)"""
+    def cell(value, fmt="{}"):
+        return "-" if value is None else fmt.format(value)
+
+    lines = [
+        "| Rank | Location | Surge | Risk | Confidence | AQI | Festival | Occupancy | Free beds | Status |",
+        "|---|---|---|---|---|---|---|---|---|---|"
+    ]
+    for rank, row in enumerate(rows, 1):
+        capacity = row.get("capacity") or {}
+        lines.append(
+            f"| {rank} | {row['location']} | {cell(row.get('surge_percentage'), '{:.1f}%')} "
+            f"| {cell(row.get('risk_level'))} | {cell(row.get('confidence'), '{}%')} "
+            f"| {cell(row.get('aqi'), '{:.0f}')} | {cell(row.get('festival_score'), '{:.2f}')} "
+            f"| {cell(capacity.get('occupancy'), '{:.0%}')} | {cell(capacity.get('available'))} "
+            f"| {row['status']} ({row['elapsed']:.1f}s) |"
+        )
+    return "\n".join(lines)
+
+
+def run_multi_city(locations=None, mode="fast", concurrency=3, timeout=60, model=None,
+                   force_refresh=False):
+    """
+    Analyse several locations concurrently and compare them.
+
+    At most `concurrency` analyses run at once; each has `timeout` seconds
+    from the moment it starts. The ML model is loaded once and the public
+    health feed is fetched once for all locations. Returns {'results'
+    (location -> analysis or error), 'comparison' (rows ranked by surge),
+    'report', 'wall_time'}.
+    """
+    if mode not in ANALYSES:
+        raise ValueError(f"Unknown analysis mode '{mode}'; expected one of {sorted(ANALYSES)}")
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+
+    locations = list(dict.fromkeys(locations or DEFAULT_CITIES))
+    start = time.perf_counter()
+    if model is None and mode == "fast":
+        from surge_prediction_model import initialize_model
+        model = initialize_model()
+    shared = prefetch_shared_sources(timeout=timeout)
+    print(f"🌐 Shared sources fetched once for {len(locations)} locations: {', '.join(shared)}")
+
+    analysis = ANALYSES[mode]
+    started = {}
+    started_lock = threading.Lock()
+
+    def run(location):
+        with started_lock:
+            started[location] = time.perf_counter()
+        return analysis(location, model, shared, force_refresh)
+
+    results = {}
+    # Threads cannot be killed: a timed-out analysis is reported and abandoned,
+    # and its worker slot frees up when the underlying call returns
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="multi-city")
+    try:
+        # Each worker keeps the caller's progress run context
+        pending = {executor.submit(copy_context().run, run, location): location for location in locations}
+        while pending:
+            done, _ = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+            for future in done:
+                location = pending.pop(future)
+                elapsed = time.perf_counter() - started[location]
+                try:
+                    results[location] = dict(future.result(), status="ok", elapsed=elapsed)
+                except Exception as e:
+                    print(f"❌ Analysis for {location} failed: {e}")
+                    results[location] = {"status": "error", "error": str(e), "elapsed": elapsed}
+            now = time.perf_counter()
+            with started_lock:
+                overdue = [(future, location) for future, location in pending.items()
+                           if location in started and now - started[location] > timeout]
+            for future, location in overdue:
+                print(f"⏱️  Analysis for {location} exceeded {timeout}s; skipping it")
+                pending.pop(future)
+                results[location] = {"status": "timeout", "error": f"exceeded {timeout}s",
+                                     "elapsed": now - started[location]}
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    rows = [dict(results[location], location=location) for location in locations]
+    rows.sort(key=lambda row: (row.get("surge_percentage") is None, -(row.get("surge_percentage") or 0)))
+    wall_time = time.perf_counter() - start
+    report = (f"## Multi-City Surge Comparison ({mode} mode, {len(locations)} locations, "
+              f"{wall_time:.1f}s)\n\n{format_comparison(rows)}")
+    return {"results": results, "comparison": rows, "report": report, "wall_time": wall_time}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare predicted surges across several locations")
+    parser.add_argument("locations", nargs="*", default=DEFAULT_CITIES)
+    parser.add_argument("--mode", choices=sorted(ANALYSES), default="fast")
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60, help="Seconds allowed per location")
+    parser.add_argument("--force-refresh", action="store_true")
+    args = parser.parse_args()
+
+    comparison = run_multi_city(args.locations, mode=args.mode, concurrency=args.concurrency,
+                                timeout=args.timeout, force_refresh=args.force_refresh)
+    print(comparison["report"])
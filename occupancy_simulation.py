@@ -0,0 +1,291 @@
+# occupancy_simulation.py
+"""
+Monte Carlo bed-occupancy simulation for Arogya Sentinel
+Simulates thousands of daily census trajectories per facility as NumPy
+arrays (runs x days x facilities) from the predicted admission uplift,
+length-of-stay distributions and current occupancy, and reports the
+probability of running out of beds on each day
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from resource_optimizer import BASE_CONDITION_MIX, CONDITIONS, condition_mix, surge_profile
+
+# Length of stay per condition as (mean days, gamma shape)
+LOS_PROFILES = {
+    "respiratory": (6.0, 2.0),
+    "trauma": (4.5, 1.5),
+    "cardiac": (5.5, 2.0),
+    "general": (3.5, 1.5)
+}
+MAX_LOS_DAYS = 60
+SURGE_SD = 3.2  # Spread of the true surge around the prediction (the model's MAE, in points)
+
+
+def los_survival(mix, max_days=MAX_LOS_DAYS):
+    """S[k] = P(length of stay > k days) for a condition mix; S[0] = 1 (present on the admission day)"""
+    from scipy.special import gammaincc
+
+    k = np.arange(max_days, dtype=float)
+    survival = np.zeros(max_days)
+    for condition, share in mix.items():
+        mean, shape = LOS_PROFILES[condition]
+        survival += share * gammaincc(shape, k * shape / mean)
+    survival[0] = 1.0
+    return survival
+
+
+def residual_survival(survival):
+    """
+    Share of today's (steady-state) census still in bed k days later; the
+    census counts today's admissions, so day 0 excludes their cohort
+    """
+    tail = np.cumsum(survival[::-1])[::-1]
+    return np.append(tail[1:], 0.0) / tail[0]
+
+
+def simulation_inputs(beds, occupied, surge_percentage, timeline="3-5 days", key_factors=None, days=30,
+                      surge_sd=SURGE_SD):
+    """
+    Arrays shared by every chunk of runs. Baseline admissions per facility
+    keep today's census steady (census / mean stay); surge admissions follow
+    the resource optimizer's surge profile with the key-factor condition mix.
+    """
+    base_mix = dict(BASE_CONDITION_MIX)
+    surge_mix = condition_mix(key_factors)
+    base_survival = los_survival(base_mix)
+    surge_survival = los_survival(surge_mix)
+    occupied = np.asarray(occupied, dtype=float)
+    return {
+        "beds": np.asarray(beds, dtype=float),
+        "occupied": occupied,
+        "baseline_admissions": occupied / base_survival.sum(),
+        "profile": surge_profile(1.0, timeline, days) * 100,  # Uplift per day for a 1% surge, as a fraction
+        "surge_percentage": float(surge_percentage),
+        "surge_sd": float(surge_sd),
+        "base_survival": base_survival,
+        "surge_survival": surge_survival,
+        "initial_survival": residual_survival(base_survival)[:days],
+        "days": days
+    }
+
+
+def _survival_kernel(survival, days):
+    """Lower-triangular (days x days) matrix K[t, s] = S[t - s]: census on day t from admissions on day s"""
+    lags = np.subtract.outer(np.arange(days), np.arange(days))
+    padded = np.append(survival, 0.0)
+    return np.where(lags >= 0, padded[np.clip(lags, 0, len(survival))], 0.0)
+
+
+def _lag_covariance_kernel(kernel):
+    """
+    C[t, s] = K[t, s] * (1 - K[t - 1, s]): covariance between a day s
+    admission being in bed on day t - 1 and on day t (a stay that reaches
+    day t was in bed the day before). Zero on day 0 and for same-day admissions.
+    """
+    previous = np.vstack([np.zeros((1, kernel.shape[1])), kernel[:-1]])
+    return np.where(previous > 0, kernel * (1 - previous), 0.0)
+
+
+def _simulate_chunk(inputs, runs, seed):
+    """
+    One chunk of runs. Arrays are laid out (days, runs, facilities) so the
+    sum over admission cohorts is a single matrix product with the survival
+    kernels. Which patients are still in bed is random, but the same patients
+    stay from one day to the next, so that noise is carried forward as an
+    AR(1) process with each day's exact variance and lag-one covariance;
+    redrawing it every day would overstate the chance of exceeding capacity
+    on any day. Returns per-day/facility exceedance counts, system-wide
+    exceedance counts, per-facility any-day counts, census sums for means and
+    the system census of every run (for quantiles).
+    """
+    rng = np.random.default_rng(seed)
+    days, n_f = inputs["days"], len(inputs["beds"])
+
+    # Each run draws its own surge magnitude, which correlates its days
+    surge = np.maximum(rng.normal(inputs["surge_percentage"], inputs["surge_sd"], runs), 0) / 100
+    uplift = inputs["profile"][:, None] * surge[None, :]  # (days, runs)
+    # One Poisson draw for all admissions, split into baseline and surge
+    # patients by their expected shares (they differ only in length of stay)
+    total = rng.poisson((1 + uplift)[:, :, None] * inputs["baseline_admissions"][None, None, :])
+    admissions = np.empty((2, days, runs, n_f), dtype=np.float32)
+    np.multiply(total, (uplift / (1 + uplift))[:, :, None], out=admissions[1], casting="unsafe")
+    np.subtract(total, admissions[1], out=admissions[0], casting="unsafe")
+    del total
+    admissions = admissions.reshape(2 * days, runs * n_f)
+
+    # Census given admissions: surviving cohorts (mean) and their binomial variance
+    kb = _survival_kernel(inputs["base_survival"], days)
+    ks = _survival_kernel(inputs["surge_survival"], days)
+    mean_kernel = np.hstack([kb, ks]).astype(np.float32)
+    variance_kernel = np.hstack([kb * (1 - kb), ks * (1 - ks)]).astype(np.float32)
+    covariance_kernel = np.hstack([_lag_covariance_kernel(kb), _lag_covariance_kernel(ks)]).astype(np.float32)
+    s0 = inputs["initial_survival"][:, None]
+    s0_previous = np.vstack([[[1.0]], s0[:-1]])
+    mean = (mean_kernel @ admissions).reshape(days, runs, n_f)
+    mean += (inputs["occupied"][None, :] * s0)[:, None, :].astype(np.float32)
+    variance = (variance_kernel @ admissions).reshape(days, runs, n_f)
+    variance += (inputs["occupied"][None, :] * s0 * (1 - s0))[:, None, :].astype(np.float32)
+    covariance = (covariance_kernel @ admissions).reshape(days, runs, n_f)
+    covariance += (inputs["occupied"][None, :] * s0 * (1 - s0_previous))[:, None, :].astype(np.float32)
+    del admissions
+
+    # Which admitted patients are still in bed is binomial; use its normal
+    # approximation, with standardized noise z[t] = rho[t] z[t-1] + sqrt(1 - rho[t]^2) e[t]
+    sd = np.sqrt(variance, out=variance)
+    z = rng.standard_normal((runs, n_f), dtype=np.float32)
+    mean[0] += sd[0] * z
+    for t in range(1, days):
+        scale = sd[t] * sd[t - 1]
+        rho = np.divide(covariance[t], scale, out=np.zeros_like(scale), where=scale > 0)
+        np.clip(rho, 0, 1, out=rho)
+        z = rho * z + np.sqrt(1 - rho * rho) * rng.standard_normal((runs, n_f), dtype=np.float32)
+        mean[t] += sd[t] * z
+    del covariance
+    census = np.rint(mean, out=mean)
+    np.maximum(census, 0, out=census)
+
+    over = census > inputs["beds"][None, None, :].astype(np.float32)
+    system_census = census.sum(axis=2)  # (days, runs)
+    return {
+        "exceed": over.sum(axis=1),
+        "system_exceed": (system_census > inputs["beds"].sum()).sum(axis=1),
+        "any_exceed": over.any(axis=0).sum(axis=0),
+        "census_sum": census.sum(axis=1, dtype=np.float64),
+        "system_census": system_census.T
+    }
+
+
+def simulate_occupancy(beds, occupied, surge_percentage, timeline="3-5 days", key_factors=None,
+                       days=30, runs=10_000, chunk_runs=1_000, n_jobs=1, seed=0, surge_sd=SURGE_SD):
+    """
+    Simulate `runs` census trajectories for every facility over `days`.
+
+    beds and occupied are per-facility arrays (e.g. from
+    CapacityStore.facility_frame). Runs are simulated in chunks of
+    `chunk_runs` to bound memory; chunks run in `n_jobs` processes (None = all
+    cores) with independent seeds spawned from `seed`, so results do not
+    depend on n_jobs. Returns a plain dict (see summarize_simulation).
+    """
+    start = time.perf_counter()
+    inputs = simulation_inputs(beds, occupied, surge_percentage, timeline, key_factors, days, surge_sd)
+    sizes = [min(chunk_runs, runs - offset) for offset in range(0, runs, chunk_runs)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1 or len(sizes) == 1:
+        chunks = [_simulate_chunk(inputs, size, s) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(sizes))) as executor:
+            chunks = list(executor.map(_simulate_chunk, [inputs] * len(sizes), sizes, seeds))
+
+    return summarize_simulation(inputs, chunks, runs, time.perf_counter() - start)
+
+
+def summarize_simulation(inputs, chunks, runs, elapsed):
+    """
+    {'runs', 'days', 'facilities', 'elapsed', 'p_exceed' (days x facilities),
+    'p_exceed_system' (days), 'p_any_exceed' (facilities), 'mean_census'
+    (days x facilities), 'system_census_quantiles' ({p10, p50, p90} per day),
+    'system_beds', 'peak_day'}
+    """
+    exceed = sum(chunk["exceed"] for chunk in chunks)
+    system_census = np.concatenate([chunk["system_census"] for chunk in chunks])  # (runs, days)
+    p_exceed_system = sum(chunk["system_exceed"] for chunk in chunks) / runs
+    quantiles = np.percentile(system_census, [10, 50, 90], axis=0)
+    return {
+        "runs": runs,
+        "days": inputs["days"],
+        "facilities": len(inputs["beds"]),
+        "elapsed": elapsed,
+        "p_exceed": exceed / runs,
+        "p_exceed_system": p_exceed_system,
+        "p_any_exceed": sum(chunk["any_exceed"] for chunk in chunks) / runs,
+        "mean_census": sum(chunk["census_sum"] for chunk in chunks) / runs,
+        "system_census_quantiles": {"p10": quantiles[0], "p50": quantiles[1], "p90": quantiles[2]},
+        "system_beds": int(inputs["beds"].sum()),
+        "peak_day": int(np.argmax(quantiles[1])) + 1
+    }
+
+
+def occupancy_summary(result, facility_names=None, top_n=10, threshold=0.5):
+    """
+    JSON-friendly digest of a simulation: system-wide daily exceedance
+    probability and census band, the first day the system is more likely than
+    not over capacity, and the facilities most likely to overflow with the
+    first day their risk passes `threshold`
+    """
+    names = facility_names or result.get("facility_names") or [f"Facility {i + 1}" for i in range(result["facilities"])]
+    p_system = result["p_exceed_system"]
+    over_threshold = np.nonzero(p_system > threshold)[0]
+    facilities = []
+    for i in np.argsort(-result["p_any_exceed"])[:top_n]:
+        risky_days = np.nonzero(result["p_exceed"][:, i] > threshold)[0]
+        facilities.append({
+            "name": names[i],
+            "p_any_exceed": round(float(result["p_any_exceed"][i]), 3),
+            "peak_p_exceed": round(float(result["p_exceed"][:, i].max()), 3),
+            "first_day": int(risky_days[0]) + 1 if len(risky_days) else None
+        })
+    quantiles = result["system_census_quantiles"]
+    return {
+        "runs": result["runs"],
+        "days": result["days"],
+        "system_beds": result["system_beds"],
+        "p_exceed_system": [round(float(p), 3) for p in p_system],
+        "system_census": {band: [int(v) for v in values] for band, values in quantiles.items()},
+        "first_overflow_day": int(over_threshold[0]) + 1 if len(over_threshold) else None,
+        "peak_day": result["peak_day"],
+        "facilities": facilities
+    }
+
+
+def simulate_for_location(location, prediction, days=14, runs=2_000, **kwargs):
+    """
+    Simulation for the shared capacity store's facilities in the city a
+    location resolves to, with facility names attached; None when the city
+    has no facilities
+    """
+    from data_sources import current_capacity_store
+    from location_registry import get_location_registry
+
+    place = get_location_registry().resolve(location)
+    if place is None or not place.get("city"):
+        return None
+    frame = current_capacity_store().facility_frame(city=place["city"])
+    if frame.empty:
+        return None
+    result = simulate_occupancy(
+        frame["total"].to_numpy(), frame["occupied"].to_numpy(), prediction["surge_percentage"],
+        timeline=prediction.get("timeline"), key_factors=prediction.get("key_factors"),
+        days=days, runs=runs, **kwargs
+    )
+    result["facility_names"] = frame["name"].tolist()
+    return result
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the Monte Carlo bed-occupancy simulation")
+    parser.add_argument("--runs", type=int, default=10_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--facilities", type=int, default=100)
+    parser.add_argument("--surge", type=float, default=30.0)
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes (0 = all cores)")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    beds = rng.integers(80, 900, args.facilities).astype(float)
+    occupied = np.floor(beds * rng.uniform(0.65, 0.95, args.facilities))
+    result = simulate_occupancy(beds, occupied, args.surge, days=args.days, runs=args.runs,
+                                n_jobs=args.jobs or None)
+    print(f"{args.runs} runs x {args.days} days x {args.facilities} facilities in {result['elapsed']:.2f}s "
+          f"({args.jobs or os.cpu_count()} process(es))")
+    p = result["p_exceed_system"]
+    print(f"System-wide P(over capacity): day 1 {p[0]:.1%}, peak {p.max():.1%} on day {int(np.argmax(p)) + 1}")
+    print(f"Facilities with >50% chance of overflowing at some point: {int((result['p_any_exceed'] > 0.5).sum())}")
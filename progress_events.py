@@ -0,0 +1,147 @@
+# progress_events.py
+"""
+In-process progress event bus for Arogya Sentinel
+Data fetchers, the model, the fast pipeline and crew tasks publish stage and
+partial-result events for the run they belong to; UIs subscribe to a run and
+render each stage as soon as it completes
+"""
+
+import itertools
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+
+# Event kinds
+RUN_STARTED = "run_started"
+STAGE_STARTED = "stage_started"
+SOURCE_COMPLETED = "source_completed"
+PARTIAL_RESULT = "partial_result"
+STAGE_COMPLETED = "stage_completed"
+TOKEN = "token"
+RUN_COMPLETED = "run_completed"
+RUN_FAILED = "run_failed"
+FINAL_EVENTS = (RUN_COMPLETED, RUN_FAILED)
+
+# Run that events published from this context belong to; asyncio.to_thread and
+# copy_context() carry it into worker threads
+current_run = ContextVar("arogya_progress_run", default=None)
+
+
+class ProgressBus:
+    """
+    Fan-out of progress events to subscriber queues. Events are dicts
+    {'run_id', 'seq', 'kind', 'stage', 'time', 'data'}. The last
+    `history_size` events of each run are kept so a late subscriber can replay
+    a run from its start.
+    """
+
+    def __init__(self, history_size=2000, max_runs=50):
+        self.history_size = history_size
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._history = {}  # run_id -> deque of events, oldest run first
+        self._subscribers = {}  # queue -> run_id (None = every run)
+        self._seq = itertools.count()
+
+    def subscribe(self, run_id=None, replay=True):
+        """Queue receiving the run's events (every run's if run_id is None), replaying its history first"""
+        events = queue.Queue()
+        with self._lock:
+            if replay and run_id is not None:
+                for event in self._history.get(run_id, ()):
+                    events.put(event)
+            self._subscribers[events] = run_id
+        return events
+
+    def unsubscribe(self, events):
+        with self._lock:
+            self._subscribers.pop(events, None)
+
+    def publish(self, kind, stage=None, run_id=None, **data):
+        """Deliver an event for `run_id` (default: the current run context) and return it"""
+        run_id = run_id or current_run.get()
+        event = {"run_id": run_id, "seq": next(self._seq), "kind": kind, "stage": stage,
+                 "time": time.time(), "data": data}
+        with self._lock:
+            if run_id is not None:
+                if run_id not in self._history:
+                    if len(self._history) >= self.max_runs:
+                        self._history.pop(next(iter(self._history)))
+                    self._history[run_id] = deque(maxlen=self.history_size)
+                self._history[run_id].append(event)
+            targets = [q for q, wanted in self._subscribers.items() if wanted is None or wanted == run_id]
+        for events in targets:
+            events.put(event)
+        return event
+
+    def history(self, run_id):
+        with self._lock:
+            return list(self._history.get(run_id, ()))
+
+    def forget(self, run_id):
+        with self._lock:
+            self._history.pop(run_id, None)
+
+
+progress_bus = ProgressBus()
+
+
+def emit(kind, stage=None, **data):
+    """Publish an event for the current run on the shared bus"""
+    return progress_bus.publish(kind, stage, **data)
+
+
+@contextmanager
+def run_context(run_id):
+    """Attribute events published inside the block (and threads it spawns via asyncio) to `run_id`"""
+    token = current_run.set(run_id)
+    try:
+        yield run_id
+    finally:
+        current_run.reset(token)
+
+
+def start_run(target, *args, run_id=None, bus=None, **kwargs):
+    """
+    Run target(*args, **kwargs) on a daemon thread inside a run context.
+    Publishes run_started, then run_completed with the return value under
+    data['result'] or run_failed with data['error']. Returns (run_id, thread).
+    """
+    bus = bus or progress_bus
+    run_id = run_id or uuid.uuid4().hex[:12]
+
+    def work():
+        with run_context(run_id):
+            bus.publish(RUN_STARTED, run_id=run_id)
+            start = time.perf_counter()
+            try:
+                result = target(*args, **kwargs)
+            except Exception as e:
+                bus.publish(RUN_FAILED, run_id=run_id, error=f"{type(e).__name__}: {e}",
+                            elapsed=time.perf_counter() - start)
+            else:
+                bus.publish(RUN_COMPLETED, run_id=run_id, result=result, elapsed=time.perf_counter() - start)
+
+    thread = threading.Thread(target=copy_context().run, args=(work,), name=f"run-{run_id}", daemon=True)
+    thread.start()
+    return run_id, thread
+
+
+def iter_events(events, timeout=None):
+    """
+    Yield events from a subscriber queue until a run_completed/run_failed
+    event (which is yielded too). Raises TimeoutError if `timeout` seconds
+    pass without any event.
+    """
+    while True:
+        try:
+            event = events.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No progress event within {timeout}s") from None
+        yield event
+        if event["kind"] in FINAL_EVENTS:
+            return
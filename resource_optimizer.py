@@ -0,0 +1,456 @@
+# resource_optimizer.py
+"""
+Capacity-aware resource allocation for Arogya Sentinel
+Turns a surge forecast into day-by-day census per facility and solves one
+sparse linear (optionally integer) program over surge beds, extra nursing
+shifts, supply orders and transfers between nearby hospitals with HiGHS
+"""
+
+import re
+import time
+
+import numpy as np
+
+from location_registry import EARTH_RADIUS_KM
+
+CONDITIONS = ["respiratory", "trauma", "cardiac", "general"]
+
+# Share of surge patients by condition before key factors shift the mix
+BASE_CONDITION_MIX = {"respiratory": 0.30, "trauma": 0.15, "cardiac": 0.15, "general": 0.40}
+
+# Supply units per patient-day, by condition: held while in use for reusable
+# items, used up for consumables
+SUPPLY_USE = {
+    "ventilators": {"respiratory": 0.10, "trauma": 0.04, "cardiac": 0.05, "general": 0.01},
+    "oxygen_cylinders": {"respiratory": 0.60, "trauma": 0.20, "cardiac": 0.30, "general": 0.05},
+    "trauma_kits": {"respiratory": 0.00, "trauma": 0.50, "cardiac": 0.05, "general": 0.02}
+}
+# Items returned to stock after use; every other supply is consumed
+REUSABLE_ITEMS = {"ventilators"}
+
+# Objective weights; unmet demand is priced far above every mitigation
+DEFAULT_COSTS = {
+    "unmet": 1000.0,
+    "surge_bed": 20.0,
+    "extra_shift": 12.0,
+    "transfer": 15.0,
+    "transfer_per_km": 1.5,
+    "ventilators": 60.0,
+    "oxygen_cylinders": 2.0,
+    "trauma_kits": 1.0
+}
+
+NURSE_SHIFTS_PER_PATIENT_DAY = 0.5  # Three 8-hour shifts a day at one nurse per six patients
+SURGE_BED_FRACTION = 0.15  # Extra beds a facility can open, as a share of its beds
+EXTRA_SHIFT_FRACTION = 0.30  # Extra nurse shifts, as a share of the roster
+TRANSFERABLE_FRACTION = 0.15  # Share of a facility's census stable enough to transfer
+WARD_DISTANCE_KM = (3.0, 12.0)  # Assumed distance within / across wards when coordinates are unknown
+CONSUMABLE_STOCK_DAYS = 7  # Default consumable stock, in days of current use
+
+
+def condition_mix(key_factors=None):
+    """Surge patient shares by condition, shifted towards the model's key risk factors"""
+    mix = dict(BASE_CONDITION_MIX)
+    factors = " ".join(key_factors or []).lower()
+    if "pollution" in factors or "aqi" in factors or "respiratory" in factors:
+        mix["respiratory"] += 0.20
+    if "festival" in factors:
+        mix["trauma"] += 0.10
+        mix["cardiac"] += 0.05
+    total = sum(mix.values())
+    return {condition: share / total for condition, share in mix.items()}
+
+
+def surge_profile(surge_percentage, timeline="3-5 days", horizon=14):
+    """
+    Fractional census uplift per day: a linear ramp to the full surge by the
+    middle of the predicted onset window, five days at the peak, then a
+    decline to a fifth of the peak by the end of the horizon.
+    """
+    days = re.findall(r"\d+", timeline or "")
+    onset = max(1.0, np.mean([float(d) for d in days[:2]])) if days else 4.0
+    t = np.arange(horizon, dtype=float)
+    peak_end = onset + 5
+    profile = np.where(t < onset, t / onset, 1.0)
+    tail = max(horizon - 1 - peak_end, 1.0)
+    profile = np.where(t > peak_end, 1.0 - 0.8 * np.minimum((t - peak_end) / tail, 1.0), profile)
+    return surge_percentage / 100.0 * profile
+
+
+def _stock_days(items):
+    """Days of current use held by default: one for reusable items, CONSUMABLE_STOCK_DAYS for consumables"""
+    return np.array([1 if item in REUSABLE_ITEMS else CONSUMABLE_STOCK_DAYS for item in items])
+
+
+def facility_inputs(store, city=None, rosters=None, stock=None, registry=None):
+    """
+    Facility arrays for the optimizer from a CapacityStore: ids, names,
+    cities, wards, beds, occupied, nurse shifts per day, supply stock and
+    coordinates (NaN where the registry has no entry).
+
+    `rosters` ({facility_id: nurse shifts per day}) and `stock`
+    ({facility_id: {item: units}}) override the defaults, which staff and
+    equip each facility for its current census plus 5% and hold
+    CONSUMABLE_STOCK_DAYS days of consumables at that census.
+    """
+    frame = store.facility_frame(city=city)
+    ids = frame["facility_id"].tolist()
+    occupied = frame["occupied"].to_numpy(dtype=float)
+    base_mix = np.array([BASE_CONDITION_MIX[c] for c in CONDITIONS])
+
+    roster = np.ceil(occupied * NURSE_SHIFTS_PER_PATIENT_DAY * 1.05)
+    items = list(SUPPLY_USE)
+    use = np.array([[SUPPLY_USE[item][c] for c in CONDITIONS] for item in items]) @ base_mix
+    supplies = np.ceil(np.outer(occupied * 1.05, use * _stock_days(items)))
+    for row, facility_id in enumerate(ids):
+        if rosters and facility_id in rosters:
+            roster[row] = rosters[facility_id]
+        for column, item in enumerate(items):
+            if stock and item in stock.get(facility_id, {}):
+                supplies[row, column] = stock[facility_id][item]
+
+    lat = np.full(len(ids), np.nan)
+    lon = np.full(len(ids), np.nan)
+    if registry is not None:
+        for row, facility_id in enumerate(ids):
+            place = registry.resolve(facility_id)
+            if place is not None and place["kind"] == "hospital":
+                lat[row], lon[row] = place["lat"], place["lon"]
+
+    return {
+        "ids": ids,
+        "names": frame["name"].tolist(),
+        "cities": frame["city"].tolist(),
+        "wards": frame["ward"].tolist(),
+        "beds": frame["total"].to_numpy(dtype=float),
+        "occupied": occupied,
+        "roster": roster,
+        "items": items,
+        "stock": supplies,
+        "lat": lat,
+        "lon": lon
+    }
+
+
+def _distance_matrix(facilities):
+    """Pairwise km: haversine where both coordinates are known, ward-based estimates otherwise"""
+    cities = np.asarray(facilities["cities"], dtype=object)
+    wards = np.asarray(facilities["wards"], dtype=object)
+    estimate = np.where(wards[:, None] == wards[None, :], WARD_DISTANCE_KM[0], WARD_DISTANCE_KM[1])
+
+    lat, lon = np.radians(facilities["lat"]), np.radians(facilities["lon"])
+    a = (np.sin((lat[:, None] - lat[None, :]) / 2) ** 2
+         + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin((lon[:, None] - lon[None, :]) / 2) ** 2)
+    haversine = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+    distances = np.where(np.isnan(haversine), estimate, haversine)
+
+    # Transfers stay within a city and never go to the same facility
+    distances[cities[:, None] != cities[None, :]] = np.inf
+    np.fill_diagonal(distances, np.inf)
+    return distances
+
+
+def transfer_edges(facilities, neighbours=5):
+    """(source rows, destination rows, km) for each facility's nearest same-city neighbours"""
+    n = len(facilities["ids"])
+    if n < 2 or neighbours < 1:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+    distances = _distance_matrix(facilities)
+    k = min(neighbours, n - 1)
+    nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    src = np.repeat(np.arange(n), k)
+    dst = nearest.ravel()
+    km = distances[src, dst]
+    keep = np.isfinite(km)
+    return src[keep], dst[keep], km[keep]
+
+
+def optimize_allocation(facilities, surge_percentage, timeline="3-5 days", key_factors=None,
+                        horizon=14, neighbours=5, integer=False, costs=None, time_limit=30,
+                        mip_gap=0.01):
+    """
+    Minimum-cost plan covering the forecast census at every facility and day.
+
+    Census at facility f on day t is its current occupancy raised by the
+    surge profile. The program chooses surge beds s[f,t], extra nurse shifts
+    h[f,t], transfers x[e,t] along nearest-neighbour edges, supply orders
+    o[f,item] over the horizon, and leaves u[f,t] patients unserved only when
+    nothing else fits. Each day's served census must fit the facility's beds
+    plus surge beds, its roster plus extra shifts and its reusable items
+    (REUSABLE_ITEMS) plus orders; consumables used over the whole horizon
+    must fit their stock plus orders. At most TRANSFERABLE_FRACTION of a
+    census may be moved out.
+
+    With integer=True beds, shifts, transfers and orders are integral
+    (scipy.optimize.milp); otherwise the LP relaxation is solved and the
+    plan rounds figures up. The integer program is far slower: 300 facilities
+    over 14 days take a couple of seconds at the default 1% relative gap
+    (`mip_gap`) but run into `time_limit` at a zero gap, in which case the
+    best plan found so far is returned. Returns a plain dict (see summarize_allocation).
+    """
+    from scipy import sparse
+    from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+    costs = dict(DEFAULT_COSTS, **(costs or {}))
+    mix = condition_mix(key_factors)
+    mix_vector = np.array([mix[c] for c in CONDITIONS])
+    items = facilities["items"]
+    use = np.array([[SUPPLY_USE[item][c] for c in CONDITIONS] for item in items]) @ mix_vector
+
+    n_f, n_t, n_k = len(facilities["ids"]), horizon, len(items)
+    if n_f == 0:
+        raise ValueError("No facilities to allocate resources across")
+    uplift = surge_profile(surge_percentage, timeline, horizon)
+    demand = facilities["occupied"][:, None] * (1.0 + uplift[None, :])  # (F, T)
+    src, dst, km = transfer_edges(facilities, neighbours)
+    n_e = len(src)
+
+    # Variable layout: s | h | u (F*T each), x (E*T), o (F*K)
+    ft = n_f * n_t
+    s0, h0, u0, x0, o0 = 0, ft, 2 * ft, 3 * ft, 3 * ft + n_e * n_t
+    n_vars = o0 + n_f * n_k
+
+    f_idx, t_idx = np.divmod(np.arange(ft), n_t)
+    e_idx, te_idx = np.divmod(np.arange(n_e * n_t), n_t)
+    x_cols = x0 + np.arange(n_e * n_t)
+    out_rows = src[e_idx] * n_t + te_idx  # (f, t) cell each transfer leaves
+    in_rows = dst[e_idx] * n_t + te_idx  # (f, t) cell each transfer arrives at
+
+    def served_census_terms(rows_offset, scale, extra_rows, extra_cols, per_day=True):
+        """
+        Coefficients of the served-census change (-u - out + in) * scale, one
+        row per (facility, day) cell or, with per_day=False, summed over the
+        horizon into one row per facility; each extra column gets -1
+        """
+        cells = [np.arange(ft), out_rows, in_rows]
+        if not per_day:
+            cells = [cell // n_t for cell in cells]
+        rows = [rows_offset + cell for cell in cells] + [rows_offset + extra_rows]
+        cols = [u0 + np.arange(ft), x_cols, x_cols, extra_cols]
+        vals = [np.full(ft, -scale), np.full(n_e * n_t, -scale), np.full(n_e * n_t, scale),
+                np.full(len(extra_cols), -1.0)]
+        return rows, cols, vals
+
+    rows, cols, vals, rhs = [], [], [], []
+
+    # Beds: demand - u - out + in <= beds + s
+    r, c, v = served_census_terms(0, 1.0, np.arange(ft), s0 + np.arange(ft))
+    rows += r; cols += c; vals += v
+    rhs.append((facilities["beds"][:, None] - demand).ravel())
+
+    # Staff: rate * (demand - u - out + in) <= roster + h
+    rate = NURSE_SHIFTS_PER_PATIENT_DAY
+    r, c, v = served_census_terms(ft, rate, np.arange(ft), h0 + np.arange(ft))
+    rows += r; cols += c; vals += v
+    rhs.append((facilities["roster"][:, None] - rate * demand).ravel())
+
+    # Transferable share: out <= fraction * demand
+    rows.append(2 * ft + out_rows); cols.append(x_cols); vals.append(np.ones(n_e * n_t))
+    rhs.append((TRANSFERABLE_FRACTION * demand).ravel())
+
+    # Supplies, one block per item. Reusable: use_k * (demand - u - out + in) <= stock_k + o_k
+    # every day. Consumable: the same summed over the horizon, once per facility.
+    offset = 3 * ft
+    for k, item in enumerate(items):
+        if item in REUSABLE_ITEMS:
+            r, c, v = served_census_terms(offset, use[k], np.arange(ft), o0 + f_idx * n_k + k)
+            rhs.append((facilities["stock"][:, k][:, None] - use[k] * demand).ravel())
+            offset += ft
+        else:
+            r, c, v = served_census_terms(offset, use[k], np.arange(n_f), o0 + np.arange(n_f) * n_k + k,
+                                          per_day=False)
+            rhs.append(facilities["stock"][:, k] - use[k] * demand.sum(axis=1))
+            offset += n_f
+        rows += r; cols += c; vals += v
+
+    n_rows = offset
+    A = sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                          shape=(n_rows, n_vars))
+    b = np.concatenate(rhs)
+
+    objective = np.concatenate([
+        np.full(ft, costs["surge_bed"]),
+        np.full(ft, costs["extra_shift"]),
+        np.full(ft, costs["unmet"]),
+        np.repeat(costs["transfer"] + costs["transfer_per_km"] * km, n_t),
+        np.tile([costs[item] for item in items], n_f)
+    ])
+    upper = np.concatenate([
+        np.repeat(np.floor(SURGE_BED_FRACTION * facilities["beds"]), n_t),
+        np.repeat(np.floor(EXTRA_SHIFT_FRACTION * facilities["roster"]), n_t),
+        demand.ravel(),
+        np.full(n_e * n_t, np.inf),
+        np.full(n_f * n_k, np.inf)
+    ])
+
+    start = time.perf_counter()
+    if integer:
+        integrality = np.ones(n_vars)
+        integrality[u0:u0 + ft] = 0
+        result = milp(objective, constraints=LinearConstraint(A, -np.inf, b), bounds=Bounds(0, upper),
+                      integrality=integrality, options={"time_limit": time_limit, "mip_rel_gap": mip_gap})
+    else:
+        result = linprog(objective, A_ub=A, b_ub=b, bounds=np.column_stack([np.zeros(n_vars), upper]),
+                         method="highs", options={"time_limit": time_limit})
+    solve_time = time.perf_counter() - start
+    if result.x is None:
+        raise RuntimeError(f"Resource allocation solve failed: {result.message}")
+
+    solution = result.x
+    return summarize_allocation(
+        facilities, demand, uplift, mix,
+        surge_beds=solution[s0:h0].reshape(n_f, n_t),
+        extra_shifts=solution[h0:u0].reshape(n_f, n_t),
+        unmet=solution[u0:x0].reshape(n_f, n_t),
+        transfers=solution[x0:o0].reshape(n_e, n_t),
+        orders=solution[o0:].reshape(n_f, n_k),
+        edges=(src, dst, km),
+        solve={"status": result.message, "objective": float(result.fun), "solve_time": solve_time,
+               "variables": n_vars, "constraints": n_rows, "integer": integer}
+    )
+
+
+def summarize_allocation(facilities, demand, uplift, mix, surge_beds, extra_shifts, unmet,
+                         transfers, orders, edges, solve, top_transfers=10):
+    """
+    Structured plan from the solved variables, with counts rounded up
+    (transfers to the nearest patient): {'solve', 'horizon', 'condition_mix',
+    'daily', 'facilities', 'transfers', 'orders'}.
+    """
+    src, dst, km = edges
+    eps = 1e-6
+    surge_beds = np.ceil(surge_beds - eps)
+    extra_shifts = np.ceil(extra_shifts - eps)
+    unmet = np.ceil(unmet - eps)
+    transfers = np.round(transfers)
+    orders = np.ceil(orders - eps)
+
+    n_f, n_t = demand.shape
+    moved_out = np.zeros((n_f, n_t))
+    moved_in = np.zeros((n_f, n_t))
+    np.add.at(moved_out, src, transfers)
+    np.add.at(moved_in, dst, transfers)
+    surge_patients = demand - facilities["occupied"][:, None]
+
+    daily = [{
+        "day": t + 1,
+        "uplift": float(uplift[t]),
+        "census": int(round(demand[:, t].sum())),
+        "surge_patients": {c: int(round(surge_patients[:, t].sum() * share)) for c, share in mix.items()},
+        "beds": int(facilities["beds"].sum() + surge_beds[:, t].sum()),
+        "surge_beds": int(surge_beds[:, t].sum()),
+        "extra_shifts": int(extra_shifts[:, t].sum()),
+        "transfers": int(transfers[:, t].sum()),
+        "unmet": int(unmet[:, t].sum())
+    } for t in range(n_t)]
+
+    peak_strain = (demand / np.maximum(facilities["beds"], 1)[:, None]).max(axis=1)
+    facility_plans = [{
+        "facility_id": facilities["ids"][f],
+        "name": facilities["names"][f],
+        "beds": int(facilities["beds"][f]),
+        "peak_census": int(round(demand[f].max())),
+        "peak_occupancy": float(peak_strain[f]),
+        "peak_surge_beds": int(surge_beds[f].max()),
+        "extra_shifts": int(extra_shifts[f].sum()),
+        "transferred_out": int(moved_out[f].sum()),
+        "transferred_in": int(moved_in[f].sum()),
+        "unmet": int(unmet[f].sum()),
+        "orders": {item: int(orders[f, k]) for k, item in enumerate(facilities["items"]) if orders[f, k] > 0}
+    } for f in np.argsort(-peak_strain)]
+
+    edge_idx, day_idx = np.nonzero(transfers > 0)
+    order = np.argsort(-transfers[edge_idx, day_idx])[:top_transfers]
+    transfer_list = [{
+        "day": int(day_idx[i] + 1),
+        "from": facilities["names"][src[edge_idx[i]]],
+        "to": facilities["names"][dst[edge_idx[i]]],
+        "patients": int(transfers[edge_idx[i], day_idx[i]]),
+        "km": round(float(km[edge_idx[i]]), 1)
+    } for i in order]
+
+    return {
+        "solve": solve,
+        "horizon": n_t,
+        "condition_mix": mix,
+        "daily": daily,
+        "facilities": facility_plans,
+        "transfers": transfer_list,
+        "orders": {item: int(orders[:, k].sum()) for k, item in enumerate(facilities["items"])}
+    }
+
+
+def plan_for_prediction(store, prediction, city=None, registry=None, horizon=14, **kwargs):
+    """
+    Optimized plan for a predict_surge / predict_from_features result across
+    the store's facilities (optionally one city), or None if there are none.
+    """
+    facilities = facility_inputs(store, city=city, registry=registry)
+    if not facilities["ids"]:
+        return None
+    return optimize_allocation(
+        facilities, prediction["surge_percentage"], timeline=prediction.get("timeline"),
+        key_factors=prediction.get("key_factors"), horizon=horizon, **kwargs
+    )
+
+
+def plan_for_location(location, prediction, **kwargs):
+    """
+    Optimized plan across the shared capacity store's facilities in the city
+    a location resolves to, or None when the city has no facilities
+    """
+    from data_sources import current_capacity_store
+    from location_registry import get_location_registry
+
+    registry = get_location_registry()
+    place = registry.resolve(location)
+    if place is None or not place.get("city"):
+        return None
+    return plan_for_prediction(current_capacity_store(), prediction, city=place["city"], registry=registry, **kwargs)
+
+
+def synthetic_facilities(n_facilities=300, city="Mumbai", wards=24, seed=0):
+    """Random facility arrays for benchmarking (no coordinates, ward-based distances)"""
+    rng = np.random.default_rng(seed)
+    beds = rng.integers(80, 900, n_facilities).astype(float)
+    occupied = np.floor(beds * rng.uniform(0.65, 0.97, n_facilities))
+    items = list(SUPPLY_USE)
+    use = np.array([[SUPPLY_USE[item][c] for c in CONDITIONS] for item in items]) @ np.array(
+        [BASE_CONDITION_MIX[c] for c in CONDITIONS])
+    return {
+        "ids": [f"fac-{i:04d}" for i in range(n_facilities)],
+        "names": [f"Facility {i:04d}" for i in range(n_facilities)],
+        "cities": [city] * n_facilities,
+        "wards": [f"Ward {w}" for w in rng.integers(0, wards, n_facilities)],
+        "beds": beds,
+        "occupied": occupied,
+        "roster": np.ceil(occupied * NURSE_SHIFTS_PER_PATIENT_DAY * rng.uniform(0.95, 1.15, n_facilities)),
+        "items": items,
+        "stock": np.ceil(np.outer(occupied * rng.uniform(0.9, 1.2, n_facilities), use * _stock_days(items))),
+        "lat": np.full(n_facilities, np.nan),
+        "lon": np.full(n_facilities, np.nan)
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark the resource allocation optimizer on synthetic facilities")
+    parser.add_argument("--facilities", type=int, default=300)
+    parser.add_argument("--horizon", type=int, default=14)
+    parser.add_argument("--surge", type=float, default=35.0)
+    parser.add_argument("--integer", action="store_true")
+    args = parser.parse_args()
+
+    facilities = synthetic_facilities(args.facilities)
+    start = time.perf_counter()
+    plan = optimize_allocation(facilities, args.surge, key_factors=["High air pollution"],
+                               horizon=args.horizon, integer=args.integer)
+    solve = plan["solve"]
+    print(f"{args.facilities} facilities x {args.horizon} days: {solve['variables']} variables, "
+          f"{solve['constraints']} constraints")
+    print(f"Solved in {solve['solve_time']:.2f}s ({time.perf_counter() - start:.2f}s total): {solve['status']}")
+    peak = max(plan["daily"], key=lambda day: day["census"])
+    print(f"Peak day {peak['day']}: census {peak['census']}, surge beds {peak['surge_beds']}, "
+          f"extra shifts {peak['extra_shifts']}, transfers {peak['transfers']}, unmet {peak['unmet']}")
+    print(f"Orders: {plan['orders']}")
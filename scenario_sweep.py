@@ -0,0 +1,134 @@
+# scenario_sweep.py
+"""
+What-if scenario sweeps over the Healthcare Surge Prediction Model
+Scores the Cartesian grid of chosen feature ranges in batches and returns a
+surge tensor or a long DataFrame ready for heatmaps
+"""
+
+import numpy as np
+import pandas as pd
+
+from surge_prediction_model import risk_tiers
+
+
+def build_axes(ranges, feature_columns):
+    """
+    Normalize sweep ranges into ordered numeric axes.
+    Each value may be an explicit sequence of points or a (start, stop, num) tuple.
+    """
+    axes = {}
+    for feature, spec in ranges.items():
+        if feature not in feature_columns:
+            raise ValueError(f"Unknown feature '{feature}'. Valid features: {', '.join(feature_columns)}")
+        if isinstance(spec, tuple) and len(spec) == 3:
+            start, stop, num = spec
+            values = np.linspace(start, stop, int(num))
+        else:
+            values = np.asarray(spec, dtype=float)
+        if values.ndim != 1 or values.size == 0:
+            raise ValueError(f"Range for '{feature}' must be a non-empty 1-D sequence")
+        axes[feature] = values
+    return axes
+
+
+def iter_grid_chunks(axes, base_vector, feature_index, chunk_size):
+    """
+    Lazily yield (offset, feature_matrix) blocks of the Cartesian grid.
+    Only one chunk of grid points is materialized at a time.
+    """
+    shape = tuple(len(values) for values in axes.values())
+    total = int(np.prod(shape))
+    columns = [feature_index[feature] for feature in axes]
+    values = list(axes.values())
+
+    for offset in range(0, total, chunk_size):
+        flat = np.arange(offset, min(offset + chunk_size, total))
+        positions = np.unravel_index(flat, shape)
+        X = np.tile(base_vector, (len(flat), 1))
+        for column, axis_values, axis_positions in zip(columns, values, positions):
+            X[:, column] = axis_values[axis_positions]
+        yield offset, X
+
+
+def sweep_scenarios(model, ranges, context=None, chunk_size=250_000, output="frame", n_jobs=-1,
+                    approximate=False):
+    """
+    Score every combination of the given feature ranges.
+
+    model       - trained HealthcareSurgePredictionModel
+    ranges      - {feature: sequence | (start, stop, num)} for any subset of feature_columns
+    context     - fixed values for the remaining features (defaults to the
+                  model's text-extraction defaults for an empty summary)
+    output      - "frame" for a long DataFrame (one row per grid point with
+                  surge_percentage and risk_level) or "tensor" for
+                  (surge_array shaped by the axes, axes dict)
+    n_jobs      - forest parallelism for the sweep's predictions (the shared
+                  model's own setting is left alone)
+    approximate - interpolate from the model's surrogate lookup table instead
+                  of running the forest, when one is loaded and it grids every
+                  swept and context feature; the remaining features then take
+                  the surrogate's fixed build context rather than today's
+                  defaults. Falls back to the forest otherwise.
+    """
+    if not model.is_trained and not model.load_model():
+        model.train_model()
+
+    feature_columns = model.feature_columns
+    axes = build_axes(ranges, feature_columns)
+    surrogate = getattr(model, "surrogate", None) if approximate else None
+    if surrogate is not None and not set(axes).union(context or {}) <= set(surrogate.features):
+        surrogate = None
+    if surrogate is not None:
+        base = dict(surrogate.context)
+        gridded = [feature_columns.index(feature) for feature in surrogate.features]
+    else:
+        base = model.extract_features_from_text("")
+    base.update(context or {})
+    base_vector = np.array([base[column] for column in feature_columns], dtype=float)
+    feature_index = {column: i for i, column in enumerate(feature_columns)}
+
+    shape = tuple(len(values) for values in axes.values())
+    surge = np.empty(int(np.prod(shape)), dtype=np.float32)
+
+    for offset, X in iter_grid_chunks(axes, base_vector, feature_index, chunk_size):
+        if surrogate is not None:
+            surge[offset:offset + len(X)] = np.maximum(surrogate.predict_batch(X[:, gridded]), 0)
+        else:
+            surge[offset:offset + len(X)] = model.predict_batch(X, n_jobs=n_jobs)
+
+    if output == "tensor":
+        return surge.reshape(shape), axes
+    if output != "frame":
+        raise ValueError("output must be 'frame' or 'tensor'")
+
+    grid = np.meshgrid(*axes.values(), indexing="ij")
+    frame = pd.DataFrame({feature: values.ravel() for feature, values in zip(axes, grid)})
+    frame["surge_percentage"] = surge
+    frame["risk_level"] = pd.Categorical(risk_tiers(surge))
+    return frame
+
+
+def risk_surface(frame, x, y, value="surge_percentage"):
+    """
+    Pivot a two-feature slice of a sweep frame into a y-by-x matrix for heatmaps.
+    Extra swept features are averaged out.
+    """
+    return frame.pivot_table(index=y, columns=x, values=value, aggfunc="mean")
+
+
+if __name__ == "__main__":
+    import time
+    from surge_prediction_model import initialize_model
+
+    model = initialize_model()
+    start = time.perf_counter()
+    frame = sweep_scenarios(model, {
+        "aqi_value": (50, 500, 100),
+        "hospital_occupancy": (0.6, 1.0, 100),
+        "festival_score": (0, 1, 100)
+    })
+    elapsed = time.perf_counter() - start
+
+    print(f"Scored {len(frame):,} scenarios in {elapsed:.2f}s")
+    print(frame["risk_level"].value_counts().to_string())
+    print(risk_surface(frame, "aqi_value", "hospital_occupancy").iloc[::20, ::20].round(1).to_string())
@@ -0,0 +1,223 @@
+# source_cache.py
+"""
+Persistent TTL cache for external data sources
+SQLite-backed (WAL mode) so Streamlit workers and CLI processes share one
+cache file. Entries have per-source TTLs with stale-while-revalidate, and
+stored data is served through provider outages
+"""
+
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# Per-source (fresh TTL, extra stale-while-revalidate window) in seconds
+SOURCE_TTLS = {
+    "air_quality": (15 * 60, 60 * 60),
+    "public_health": (24 * 3600, 48 * 3600),
+    "public_holidays": (30 * 24 * 3600, 365 * 24 * 3600),
+    "hospital": (5 * 60, 15 * 60)
+}
+DEFAULT_TTL = (10 * 60, 30 * 60)
+
+# How long past its stale window an entry is kept to fall back on when its provider is down
+OUTAGE_RETENTION = 7 * 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    value TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    fresh_until REAL NOT NULL,
+    stale_until REAL NOT NULL,
+    refreshing_until REAL NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS counters (
+    source TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (source, outcome)
+);
+"""
+
+
+class SourceCache:
+    """
+    Disk-backed cache keyed by source name and request parameters.
+
+    get_or_fetch() outcomes:
+      hit        - fresh entry returned
+      stale      - entry past its TTL but inside the stale window; returned
+                   immediately while one background refresh runs
+      miss       - no usable entry; fetched synchronously and stored
+      outage     - fetch failed; an expired entry was served instead
+      error      - fetch failed and nothing was stored; the failure output is returned
+    """
+
+    def __init__(self, path=None, ttls=None, refresh_lease=60):
+        self.path = path or os.environ.get("AROGYA_CACHE_PATH", "data_cache.sqlite")
+        self.ttls = dict(SOURCE_TTLS, **(ttls or {}))
+        self.refresh_lease = refresh_lease
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self):
+        """One connection per thread; SQLite connections are not shareable across threads"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(source, params):
+        return f"{source}:{json.dumps(params, sort_keys=True, default=str)}"
+
+    def _count(self, source, outcome):
+        self._connect().execute(
+            "INSERT INTO counters (source, outcome, count) VALUES (?, ?, 1) "
+            "ON CONFLICT(source, outcome) DO UPDATE SET count = count + 1",
+            (source, outcome)
+        )
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value, fetched_at, fresh_until, stale_until FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        return {"value": json.loads(row[0]), "fetched_at": row[1], "fresh_until": row[2], "stale_until": row[3]}
+
+    def put(self, source, key, value):
+        fresh_ttl, stale_window = self.ttls.get(source, DEFAULT_TTL)
+        now = time.time()
+        self._connect().execute(
+            "INSERT OR REPLACE INTO entries (key, source, value, fetched_at, fresh_until, stale_until, refreshing_until) "
+            "VALUES (?, ?, ?, ?, ?, ?, 0)",
+            (key, source, json.dumps(value), now, now + fresh_ttl, now + fresh_ttl + stale_window)
+        )
+
+    def _claim_refresh(self, key):
+        """Take the refresh lease for a key so only one process/thread revalidates it"""
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE entries SET refreshing_until = ? WHERE key = ? AND refreshing_until < ?",
+            (now + self.refresh_lease, key, now)
+        )
+        return cursor.rowcount == 1
+
+    def _refresh(self, source, key, fetcher, is_valid):
+        try:
+            value = fetcher()
+        except Exception:
+            return
+        if is_valid(value):
+            self.put(source, key, value)
+
+    def get_or_fetch(self, source, params, fetcher, is_valid=lambda value: True):
+        """
+        Return the cached value for (source, params), calling fetcher() when
+        needed. Values rejected by is_valid (e.g. fallback text produced while a
+        provider is down) are never stored.
+        """
+        key = self.make_key(source, params)
+        entry = self.get(key)
+        now = time.time()
+
+        if entry is not None and now < entry["fresh_until"]:
+            self._count(source, "hit")
+            return entry["value"]
+
+        if entry is not None and now < entry["stale_until"]:
+            self._count(source, "stale")
+            if self._claim_refresh(key):
+                threading.Thread(target=self._refresh, args=(source, key, fetcher, is_valid), daemon=True).start()
+            return entry["value"]
+
+        try:
+            value = fetcher()
+            failed = not is_valid(value)
+        except Exception:
+            value, failed = None, True
+
+        if not failed:
+            self._count(source, "miss")
+            self.put(source, key, value)
+            return value
+
+        if entry is not None and now < entry["stale_until"] + OUTAGE_RETENTION:
+            self._count(source, "outage")
+            return entry["value"]
+
+        self._count(source, "error")
+        if value is None:
+            raise RuntimeError(f"{source} fetch failed and no cached data is available")
+        return value
+
+    def stats(self):
+        """Per-source outcome counts and hit rate, aggregated across all processes"""
+        summary = {}
+        for source, outcome, count in self._connect().execute("SELECT source, outcome, count FROM counters"):
+            summary.setdefault(source, {"hit": 0, "stale": 0, "miss": 0, "outage": 0, "error": 0})[outcome] = count
+        for counts in summary.values():
+            total = sum(counts.values())
+            counts["hit_rate"] = (counts["hit"] + counts["stale"] + counts["outage"]) / total if total else 0.0
+        return summary
+
+    def reset_stats(self):
+        self._connect().execute("DELETE FROM counters")
+
+    def invalidate(self, source=None):
+        """Drop cached entries for one source, or everything"""
+        if source is None:
+            self._connect().execute("DELETE FROM entries")
+        else:
+            self._connect().execute("DELETE FROM entries WHERE source = ?", (source,))
+
+    def purge_expired(self):
+        """Remove entries too old to serve even during an outage"""
+        self._connect().execute("DELETE FROM entries WHERE stale_until < ?", (time.time() - OUTAGE_RETENTION,))
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_source_cache():
+    """Process-wide SourceCache, opened on first use"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = SourceCache()
+        return _shared_cache
+
+
+def cached_call(source, params, fetcher, is_valid=lambda value: True):
+    """
+    Shared-cache get_or_fetch, bypassed entirely when AROGYA_CACHE_DISABLED=1
+    or when the tools point at a mock server (AROGYA_MOCK_SERVER), so mock
+    responses never reach the real cache.
+    """
+    if os.environ.get("AROGYA_CACHE_DISABLED") == "1" or os.environ.get("AROGYA_MOCK_SERVER"):
+        return fetcher()
+    return get_source_cache().get_or_fetch(source, params, fetcher, is_valid)
+
+
+def cached_source(source, is_valid=lambda value: True):
+    """
+    Decorator caching a single-argument fetcher under `source`.
+    The undecorated function stays available as __wrapped__.
+    """
+    def decorator(fetcher):
+        @functools.wraps(fetcher)
+        def wrapper(argument):
+            params = {"argument": argument.strip().lower()}
+            return cached_call(source, params, lambda: fetcher(argument), is_valid)
+        return wrapper
+    return decorator
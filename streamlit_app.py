@@ -15,16 +15,18 @@ import io
 from contextlib import redirect_stdout
 import json
 
+from job_runner import ACTIVE_STATUSES, COMPLETED, QUEUED, get_job_runner
+from progress_events import STAGE_COMPLETED, TOKEN, progress_bus
+from ui_cache import cached_data, invalidate, shared_model
+
 # Import our system components
 try:
-    from surge_prediction_model import initialize_model
-    from main import (
-        arogya_sentinel_crew, 
-        public_health_data_tool, 
-        air_quality_data_tool, 
-        festival_calendar_tool,
-        hospital_data_tool
-    )
+    from fast_pipeline import REPORT_SECTIONS
+    from report_builder import expected_conditions
+    from scenario_sweep import sweep_scenarios, risk_surface
+    from main import get_crew, warm_up
+    # Importing main is cheap; load the model and crew off the script thread
+    warm_up()
     SYSTEM_AVAILABLE = True
 except ImportError as e:
     st.error(f"System components not available: {e}")
@@ -125,6 +127,9 @@ def main():
             st.error("❌ System Unavailable")
             st.markdown("Please ensure all dependencies are installed.")
         
+        if SYSTEM_AVAILABLE:
+            display_active_jobs()
+        
         st.markdown("---")
         st.markdown("### 📊 Model Information")
         st.markdown("""
@@ -143,6 +148,10 @@ def main():
         st.markdown("- Advanced ML predictions")
         st.markdown("- AI agent collaboration")
         st.markdown("- Clinical decision support")
+        
+        st.markdown("---")
+        if st.button("🔄 Refresh Charts", help="Rebuild cached charts and what-if surfaces"):
+            invalidate()
 
     # Main interface
     col1, col2 = st.columns([1, 2])
@@ -178,6 +187,8 @@ def main():
         include_festivals = st.checkbox("Include Festival Impact", value=True)
         include_weather = st.checkbox("Include Weather/AQI Data", value=True)
         include_hospital_data = st.checkbox("Include Hospital Capacity", value=True)
+        use_agents = st.checkbox("Use AI Agents (LLM narrative)", value=False,
+                                 help="Run the CrewAI agents instead of the fast deterministic pipeline")
         
         # Quick test buttons
         st.markdown("🚀 **Quick Tests**")
@@ -216,21 +227,28 @@ def main():
         # Handle full analysis
         elif run_analysis:
             if SYSTEM_AVAILABLE:
-                run_full_analysis(location, start_date, end_date, include_festivals, include_weather, include_hospital_data)
+                run_full_analysis(location, start_date, end_date, include_festivals, include_weather, include_hospital_data,
+                                  use_agents)
             else:
                 st.error("❌ System not available. Please check installation.")
         
+        # Analysis this session (or the page URL) is attached to, still running or finished
+        elif SYSTEM_AVAILABLE and attached_job():
+            display_job(attached_job(), start_date, end_date, include_festivals, include_weather, include_hospital_data)
+        
         else:
             # Default view
             st.info("👆 Configure your analysis parameters and click 'RUN FULL ANALYSIS' to begin")
             
             # Show sample data visualization
             display_sample_dashboard()
+            
+            if SYSTEM_AVAILABLE:
+                display_what_if_surface()
 
-def display_sample_dashboard():
-    """Display sample dashboard when no analysis is running"""
-    st.markdown("#### 📈 Sample Healthcare Trends")
-    
+@cached_data("sample")
+def sample_dashboard_figures():
+    """Figures for the sample dashboard; built once per process, then served from cache on reruns"""
     # Sample data for visualization
     dates = pd.date_range(start='2024-01-01', end='2024-01-31', freq='D')
     sample_data = pd.DataFrame({
@@ -245,35 +263,78 @@ def display_sample_dashboard():
                    title='Daily Hospital Admissions Trend',
                    color_discrete_sequence=['#2a5298'])
     fig1.update_layout(height=300)
-    st.plotly_chart(fig1, use_container_width=True)
     
     # AQI correlation
-    col_chart1, col_chart2 = st.columns(2)
+    fig2 = px.scatter(sample_data, x='AQI', y='Predicted_Surge',
+                     title='AQI vs Predicted Surge',
+                     color_discrete_sequence=['#dc3545'])
+    fig2.update_layout(height=250)
     
+    # Risk distribution pie chart
+    risk_data = pd.DataFrame({
+        'Risk Level': ['Low', 'Moderate', 'High', 'Very High'],
+        'Frequency': [40, 35, 20, 5]
+    })
+    fig3 = px.pie(risk_data, values='Frequency', names='Risk Level',
+                 title='Historical Risk Distribution',
+                 color_discrete_map={
+                     'Low': '#28a745',
+                     'Moderate': '#ffc107', 
+                     'High': '#fd7e14',
+                     'Very High': '#dc3545'
+                 })
+    fig3.update_layout(height=250)
+    return fig1, fig2, fig3
+
+def display_sample_dashboard():
+    """Display sample dashboard when no analysis is running"""
+    st.markdown("#### 📈 Sample Healthcare Trends")
+    fig1, fig2, fig3 = sample_dashboard_figures()
+    st.plotly_chart(fig1, use_container_width=True)
+    
+    col_chart1, col_chart2 = st.columns(2)
     with col_chart1:
-        fig2 = px.scatter(sample_data, x='AQI', y='Predicted_Surge',
-                         title='AQI vs Predicted Surge',
-                         color_discrete_sequence=['#dc3545'])
-        fig2.update_layout(height=250)
         st.plotly_chart(fig2, use_container_width=True)
-    
     with col_chart2:
-        # Risk distribution pie chart
-        risk_data = pd.DataFrame({
-            'Risk Level': ['Low', 'Moderate', 'High', 'Very High'],
-            'Frequency': [40, 35, 20, 5]
-        })
-        fig3 = px.pie(risk_data, values='Frequency', names='Risk Level',
-                     title='Historical Risk Distribution',
-                     color_discrete_map={
-                         'Low': '#28a745',
-                         'Moderate': '#ffc107', 
-                         'High': '#fd7e14',
-                         'Very High': '#dc3545'
-                     })
-        fig3.update_layout(height=250)
         st.plotly_chart(fig3, use_container_width=True)
 
+WHAT_IF_OPTIONS = {
+    "AQI": ("aqi_value", (50, 500, 46)),
+    "Hospital Occupancy": ("hospital_occupancy", (0.6, 1.0, 41)),
+    "Festival Score": ("festival_score", (0.0, 1.0, 21))
+}
+
+@cached_data("surface")
+def what_if_surface_figure(x_label, y_label):
+    """
+    Sweep the shared model over two features; each axis pair is computed once per TTL.
+    Uses the surrogate lookup table when one has been built for these features.
+    """
+    x_feature, x_range = WHAT_IF_OPTIONS[x_label]
+    y_feature, y_range = WHAT_IF_OPTIONS[y_label]
+    
+    frame = sweep_scenarios(shared_model(), {x_feature: x_range, y_feature: y_range}, approximate=True)
+    surface = risk_surface(frame, x_feature, y_feature)
+    
+    fig = px.imshow(surface, origin='lower', aspect='auto',
+                    labels={'x': x_label, 'y': y_label, 'color': 'Surge %'},
+                    color_continuous_scale='RdYlGn_r',
+                    title=f'Predicted Surge: {x_label} vs {y_label}')
+    fig.update_layout(height=400)
+    return fig
+
+def display_what_if_surface():
+    """Heatmap of predicted surge over two swept features from the ML model"""
+    st.markdown("#### 🧪 What-If Risk Surface")
+    
+    col_x, col_y = st.columns(2)
+    with col_x:
+        x_label = st.selectbox("X axis", list(WHAT_IF_OPTIONS), index=0)
+    with col_y:
+        y_label = st.selectbox("Y axis", [k for k in WHAT_IF_OPTIONS if k != x_label], index=0)
+    
+    st.plotly_chart(what_if_surface_figure(x_label, y_label), use_container_width=True)
+
 def display_mock_results(location, risk_level):
     """Display mock results for quick testing"""
     
@@ -364,86 +425,160 @@ def display_mock_results(location, risk_level):
     fig.update_layout(height=300)
     st.plotly_chart(fig, use_container_width=True)
 
-def run_full_analysis(location, start_date, end_date, include_festivals, include_weather, include_hospital_data):
-    """Run the full CrewAI analysis"""
+# Progress bar position once each stage has completed
+STAGE_PROGRESS = {"data_collection": 50, "data_summary": 60, "surge_prediction": 75,
+                  "resource_plan": 90, "communications": 100}
+STAGE_STATUS = {
+    "data_summary": "📊 Synthesizing collected data...",
+    "surge_prediction": "🧠 Running ML prediction model...",
+    "resource_plan": "⚙️ Generating resource allocation plan...",
+    "communications": "📝 Drafting communications..."
+}
+SOURCE_STEPS = {
+    "air_quality": ("include_weather", "🌬️ Air Quality Agent: AQI data"),
+    "festival_calendar": ("include_festivals", "🎉 Festival Calendar Agent: events"),
+    "public_health": (None, "🏥 Health Data Agent: health trends"),
+    "hospital": ("include_hospital_data", "🏨 Hospital Data Agent: capacity")
+}
+
+# Seconds between status polls while an attached analysis runs
+POLL_INTERVAL = 0.75
+
+def attached_job():
+    """Job ID this session follows; kept in the page URL so a reload reattaches"""
+    return st.session_state.get("job_id") or st.query_params.get("job")
+
+def attach_job(job_id):
+    st.session_state["job_id"] = job_id
+    st.query_params["job"] = job_id
+
+def detach_job():
+    st.session_state.pop("job_id", None)
+    st.query_params.pop("job", None)
+
+def display_active_jobs():
+    """Queued and running analyses from every session, each one attachable"""
+    jobs = get_job_runner().store.list(statuses=ACTIVE_STATUSES, limit=5)
+    if not jobs:
+        return
+    st.markdown("---")
+    st.markdown("### ⏳ Running Analyses")
+    for job in jobs:
+        label = f"{job['location']} ({'agents' if job['kind'] == 'crew' else 'fast'}) - {job['stage'] or job['status']}"
+        if st.button(label, key=f"attach-{job['job_id']}", help="Follow this analysis"):
+            attach_job(job["job_id"])
+
+def run_full_analysis(location, start_date, end_date, include_festivals, include_weather, include_hospital_data,
+                      use_agents=False):
+    """Submit the analysis as a background job and attach this session to it"""
+    try:
+        job_id, accepted = get_job_runner().submit("crew" if use_agents else "fast", location)
+    except RuntimeError as e:
+        st.warning(f"⏳ {e}")
+        return
+    if not accepted:
+        st.info(f"🔁 An analysis for {location} is already running; following it instead of starting another")
+    attach_job(job_id)
+    display_job(job_id, start_date, end_date, include_festivals, include_weather, include_hospital_data)
+
+def display_job(job_id, start_date, end_date, include_festivals, include_weather, include_hospital_data):
+    """
+    Render an analysis job from its persisted status. While it runs, show the
+    stages and partial results so far and poll again; the script thread never
+    waits on the analysis itself.
+    """
+    job = get_job_runner().get(job_id)
+    if job is None:
+        detach_job()
+        st.warning("This analysis is no longer available. Please run it again.")
+        return
+    if st.button("✖ Close Analysis", help="Stop following this analysis (it keeps running)"):
+        detach_job()
+        st.rerun()
     
-    # Progress tracking
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    results_container = st.empty()
+    partial = job["partial"]
+    sections = partial.get("sections", {})
+    shown = {"include_weather": include_weather, "include_festivals": include_festivals,
+             "include_hospital_data": include_hospital_data, None: True}
     
-    try:
-        # Step 1: Initialize
-        status_text.markdown('<div class="status-running">🤖 Initializing AI agents...</div>', unsafe_allow_html=True)
-        progress_bar.progress(10)
-        time.sleep(1)
-        
-        # Step 2: Data Collection
-        status_text.markdown('<div class="status-running">📊 Collecting real-time data...</div>', unsafe_allow_html=True)
-        progress_bar.progress(25)
-        
-        # Show individual data collection steps
-        step_container = st.empty()
-        
-        with step_container.container():
-            if include_weather:
-                st.markdown('<div class="agent-step">🌬️ Air Quality Agent: Fetching AQI data...</div>', unsafe_allow_html=True)
-                time.sleep(0.5)
-            
-            if include_festivals:
-                st.markdown('<div class="agent-step">🎉 Festival Calendar Agent: Checking events...</div>', unsafe_allow_html=True)
-                time.sleep(0.5)
-            
-            st.markdown('<div class="agent-step">🏥 Health Data Agent: Gathering health trends...</div>', unsafe_allow_html=True)
-            time.sleep(0.5)
-            
-            if include_hospital_data:
-                st.markdown('<div class="agent-step">🏨 Hospital Data Agent: Checking capacity...</div>', unsafe_allow_html=True)
-                time.sleep(0.5)
-        
-        progress_bar.progress(50)
-        
-        # Step 3: ML Prediction
-        status_text.markdown('<div class="status-running">🧠 Running ML prediction model...</div>', unsafe_allow_html=True)
-        progress_bar.progress(70)
-        time.sleep(2)
-        
-        # Step 4: Resource Planning
-        status_text.markdown('<div class="status-running">⚙️ Generating resource allocation plan...</div>', unsafe_allow_html=True)
-        progress_bar.progress(85)
-        time.sleep(1)
-        
-        # Step 5: Communications
-        status_text.markdown('<div class="status-running">📝 Drafting communications...</div>', unsafe_allow_html=True)
-        progress_bar.progress(95)
-        time.sleep(1)
-        
-        # Complete
-        progress_bar.progress(100)
-        status_text.success("✅ Analysis complete!")
-        
-        # Clear the step container
-        step_container.empty()
-        
-        # Show results (for demo, we'll use mock data - in production this would be real CrewAI results)
-        display_full_results(location, start_date, end_date)
-        
-    except Exception as e:
-        st.error(f"❌ Analysis failed: {str(e)}")
+    if job["status"] in ACTIVE_STATUSES:
+        sources = partial.get("sources", {})
+        steps = []
+        for source, outcome in sources.items():
+            option, label = SOURCE_STEPS.get(source, (None, source))
+            if shown[option]:
+                done = f"done in {outcome['elapsed']:.1f}s" if outcome["ok"] else "unavailable"
+                steps.append(f'<div class="agent-step">{label} {done}</div>')
+        remaining = [name for name in REPORT_SECTIONS if name not in sections]
+        if job["status"] == QUEUED:
+            progress, status = 0, f"⏳ Queued: waiting for a free worker (job {job_id})"
+        elif sections:
+            progress = max(STAGE_PROGRESS.get(name, 50) for name in sections)
+            status = STAGE_STATUS[remaining[0]] if remaining else "📝 Finishing report..."
+        else:
+            progress = min(STAGE_PROGRESS["data_collection"], 10 + 10 * len(sources))
+            status = "📊 Collecting real-time data..."
+        st.progress(progress)
+        st.markdown(f'<div class="status-running">{status}</div>', unsafe_allow_html=True)
+        st.markdown("".join(steps), unsafe_allow_html=True)
+        
+        # Agent output streamed token by token, when the job runs in this process
+        tokens = []
+        for event in progress_bus.history(job_id):
+            if event["kind"] == TOKEN:
+                tokens.append(event["data"]["text"])
+            elif event["kind"] == STAGE_COMPLETED:
+                tokens.clear()
+        if tokens:
+            st.markdown(f"💬 {''.join(tokens)[-600:]}")
+        
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+    
+    elif job["status"] == COMPLETED:
+        result = job["result"] or {}
+        elapsed = job["finished_at"] - (job["started_at"] or job["submitted_at"])
+        cached = " (unchanged inputs: stored analysis)" if result.get("from_cache") else ""
+        st.success(f"✅ Analysis for {job['location']} complete in {elapsed:.1f}s{cached}")
+        
+        prediction_data = partial.get("surge_prediction", {})
+        analysis = {
+            "prediction": prediction_data.get("prediction") or result.get("prediction"),
+            "capacity": prediction_data.get("capacity") or result.get("capacity"),
+            "sections": sections or result.get("sections") or {},
+            "report": result.get("report")
+        }
+        display_full_results(job["location"], start_date, end_date, analysis=analysis)
+    
+    else:
+        st.error(f"❌ Analysis failed: {job['error']}")
         st.markdown("Using fallback demo results...")
-        display_full_results(location, start_date, end_date, demo_mode=True)
+        display_full_results(job["location"], start_date, end_date, demo_mode=True)
 
-def display_full_results(location, start_date, end_date, demo_mode=False):
-    """Display comprehensive analysis results"""
+def display_full_results(location, start_date, end_date, demo_mode=False, analysis=None):
+    """Display comprehensive analysis results (sample figures in demo mode or when a section is missing)"""
     
     st.markdown("### 📊 Complete Analysis Results")
     
-    # Mock comprehensive results for demo
+    # Sample comprehensive results for demo
     surge_pct = 28.7
     confidence = 89
     risk_level = "High"
     timeline = "4-6 days"
     
+    analysis = analysis or {}
+    prediction = analysis.get("prediction")
+    sections = analysis.get("sections") or {}
+    if prediction:
+        surge_pct = round(prediction['surge_percentage'], 1)
+        confidence = prediction['confidence']
+        risk_level = prediction['risk_level']
+        timeline = prediction['timeline']
+    elif analysis.get("report"):
+        # Agent report stored from an earlier run: the stages were not replayed
+        st.markdown(analysis["report"])
+        return
+    
     # Key metrics row
     col1, col2, col3, col4 = st.columns(4)
     
@@ -468,7 +603,15 @@ def display_full_results(location, start_date, end_date, demo_mode=False):
         col_pred1, col_pred2 = st.columns(2)
         
         with col_pred1:
-            st.markdown("""
+            if prediction:
+                st.markdown("**Key Risk Factors Identified:**")
+                for factor in prediction['key_factors'] or ["Minimal risk factors detected"]:
+                    st.markdown(f"• {factor}")
+                st.markdown("**Expected Primary Conditions:**")
+                for condition in expected_conditions(prediction['key_factors']):
+                    st.markdown(f"• {condition}")
+            else:
+                st.markdown("""
             **Key Risk Factors Identified:**
             • High air pollution (AQI: 172)
             • Upcoming festival period (Diwali in 3 days)
@@ -483,33 +626,15 @@ def display_full_results(location, start_date, end_date, demo_mode=False):
             """)
         
         with col_pred2:
-            # Prediction confidence chart
-            fig_conf = go.Figure(go.Indicator(
-                mode = "gauge+number",
-                value = confidence,
-                title = {'text': "Prediction Confidence"},
-                gauge = {
-                    'axis': {'range': [None, 100]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, 50], 'color': "lightgray"},
-                        {'range': [50, 80], 'color': "yellow"},
-                        {'range': [80, 100], 'color': "green"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': 90
-                    }
-                }
-            ))
-            fig_conf.update_layout(height=300)
-            st.plotly_chart(fig_conf, use_container_width=True)
+            st.plotly_chart(confidence_gauge(confidence), use_container_width=True)
     
     with tab2:
         st.markdown("#### ⚙️ Resource Allocation Plan")
         
-        st.markdown("""
+        if "resource_plan" in sections:
+            st.text(sections["resource_plan"])
+        else:
+            st.markdown("""
         **🏥 IMMEDIATE STAFFING ACTIONS:**
         • Recall 15 off-duty respiratory therapists
         • Increase emergency department staffing by 40%
@@ -537,9 +662,87 @@ def display_full_results(location, start_date, end_date, demo_mode=False):
     with tab3:
         st.markdown("#### 📢 Communication Alerts")
         
-        # Internal Alert
-        st.markdown("**🔴 INTERNAL HOSPITAL ALERT:**")
-        st.code("""
+        if "communications" in sections:
+            st.markdown(sections["communications"])
+        else:
+            display_sample_communications()
+    
+    with tab4:
+        st.markdown("#### 📈 Data Analysis & Trends")
+        
+        fig_trend, fig_aqi, fig_risk = forecast_figures(start_date, end_date)
+        st.plotly_chart(fig_trend, use_container_width=True)
+        
+        col_data1, col_data2 = st.columns(2)
+        with col_data1:
+            st.plotly_chart(fig_aqi, use_container_width=True)
+        with col_data2:
+            st.plotly_chart(fig_risk, use_container_width=True)
+
+@cached_data("forecast")
+def confidence_gauge(confidence):
+    """Prediction confidence gauge"""
+    fig_conf = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = confidence,
+        title = {'text': "Prediction Confidence"},
+        gauge = {
+            'axis': {'range': [None, 100]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, 50], 'color': "lightgray"},
+                {'range': [50, 80], 'color': "yellow"},
+                {'range': [80, 100], 'color': "green"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 90
+            }
+        }
+    ))
+    fig_conf.update_layout(height=300)
+    return fig_conf
+
+@cached_data("forecast")
+def forecast_figures(start_date, end_date):
+    """Admissions, AQI and risk forecast figures for the analysis period"""
+    # Sample trend data
+    dates = pd.date_range(start=start_date, end=end_date, freq='D')
+    trend_data = pd.DataFrame({
+        'Date': dates,
+        'Predicted_Admissions': [150 + i*3 + (25 if i > 3 and i < 8 else 0) for i in range(len(dates))],
+        'Baseline': [150] * len(dates),
+        'AQI_Forecast': [160 + (i*5) + (30 if i > 3 and i < 8 else 0) for i in range(len(dates))]
+    })
+    
+    # Admissions forecast
+    fig_trend = px.line(trend_data, x='Date', y=['Predicted_Admissions', 'Baseline'],
+                       title='Hospital Admissions Forecast',
+                       color_discrete_map={'Predicted_Admissions': '#dc3545', 'Baseline': '#28a745'})
+    fig_trend.update_layout(height=400)
+    
+    fig_aqi = px.line(trend_data, x='Date', y='AQI_Forecast',
+                     title='Air Quality Forecast',
+                     color_discrete_sequence=['#ffc107'])
+    fig_aqi.update_layout(height=300)
+    
+    # Risk level over time
+    risk_data = pd.DataFrame({
+        'Date': dates,
+        'Risk_Score': [2 + (3 if i > 3 and i < 8 else 0) for i in range(len(dates))]
+    })
+    fig_risk = px.bar(risk_data, x='Date', y='Risk_Score',
+                     title='Risk Level Forecast',
+                     color_discrete_sequence=['#fd7e14'])
+    fig_risk.update_layout(height=300)
+    return fig_trend, fig_aqi, fig_risk
+
+def display_sample_communications():
+    """Sample internal alert and public advisory shown in demo mode"""
+    # Internal Alert
+    st.markdown("**🔴 INTERNAL HOSPITAL ALERT:**")
+    st.code("""
 PRIORITY: HIGH - PREDICTED PATIENT SURGE
 
 Expected surge magnitude: 28.7% increase in admissions
@@ -558,10 +761,10 @@ IMMEDIATE ACTIONS REQUIRED:
 ✓ Coordinate with department heads within 12 hours
 
 Department heads confirm readiness by 0800 tomorrow.
-        """)
-        
-        st.markdown("**📢 PUBLIC HEALTH ADVISORY:**")
-        st.info("""
+    """)
+    
+    st.markdown("**📢 PUBLIC HEALTH ADVISORY:**")
+    st.info("""
 **HEALTH ADVISORY FOR MUMBAI CITIZENS**
 
 Due to upcoming Diwali celebrations and current air quality conditions, 
@@ -575,48 +778,7 @@ RECOMMENDATIONS:
 • Consider postponing non-urgent medical visits during festival peak
 
 Hospitals are prepared and adequately staffed. Emergency services remain fully operational.
-        """)
-    
-    with tab4:
-        st.markdown("#### 📈 Data Analysis & Trends")
-        
-        # Sample trend data
-        dates = pd.date_range(start=start_date, end=end_date, freq='D')
-        trend_data = pd.DataFrame({
-            'Date': dates,
-            'Predicted_Admissions': [150 + i*3 + (25 if i > 3 and i < 8 else 0) for i in range(len(dates))],
-            'Baseline': [150] * len(dates),
-            'AQI_Forecast': [160 + (i*5) + (30 if i > 3 and i < 8 else 0) for i in range(len(dates))]
-        })
-        
-        # Admissions forecast
-        fig_trend = px.line(trend_data, x='Date', y=['Predicted_Admissions', 'Baseline'],
-                           title='Hospital Admissions Forecast',
-                           color_discrete_map={'Predicted_Admissions': '#dc3545', 'Baseline': '#28a745'})
-        fig_trend.update_layout(height=400)
-        st.plotly_chart(fig_trend, use_container_width=True)
-        
-        # AQI correlation
-        col_data1, col_data2 = st.columns(2)
-        
-        with col_data1:
-            fig_aqi = px.line(trend_data, x='Date', y='AQI_Forecast',
-                             title='Air Quality Forecast',
-                             color_discrete_sequence=['#ffc107'])
-            fig_aqi.update_layout(height=300)
-            st.plotly_chart(fig_aqi, use_container_width=True)
-        
-        with col_data2:
-            # Risk level over time
-            risk_data = pd.DataFrame({
-                'Date': dates,
-                'Risk_Score': [2 + (3 if i > 3 and i < 8 else 0) for i in range(len(dates))]
-            })
-            fig_risk = px.bar(risk_data, x='Date', y='Risk_Score',
-                             title='Risk Level Forecast',
-                             color_discrete_sequence=['#fd7e14'])
-            fig_risk.update_layout(height=300)
-            st.plotly_chart(fig_risk, use_container_width=True)
+    """)
 
 if __name__ == "__main__":
     main()
@@ -4,28 +4,39 @@ Healthcare Surge Prediction Model using Random Forest
 Predicts patient surge probability based on environmental, social, and health factors
 """
 
-import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.metrics import mean_absolute_error, r2_score
-import joblib
 import os
 from datetime import datetime, timedelta
 import re
 import json
+import threading
+
+# pandas, scikit-learn and joblib are imported where they are used: importing
+# this module (and main, the apps and the data tools with it) stays cheap, and
+# the forest is only built when a model is trained or loaded
+# Risk tiers shared by single predictions, batch scoring and backtesting
+RISK_LEVELS = ["Low", "Moderate", "High", "Very High"]
+RISK_THRESHOLDS = [15, 25, 40]  # Lower bounds (%) of Moderate, High, Very High
+RISK_TIMELINES = {
+    "Low": "7+ days",
+    "Moderate": "5-7 days",
+    "High": "3-5 days",
+    "Very High": "2-4 days"
+}
+
+def classify_risk(surge_percentage):
+    """Map a predicted surge percentage to its (risk_level, timeline) pair"""
+    risk_level = RISK_LEVELS[int(np.digitize(surge_percentage, RISK_THRESHOLDS))]
+    return risk_level, RISK_TIMELINES[risk_level]
+
+def risk_tiers(surge_percentages):
+    """Vectorized risk level labels for an array of surge percentages"""
+    return np.asarray(RISK_LEVELS)[np.digitize(surge_percentages, RISK_THRESHOLDS)]
 
 class HealthcareSurgePredictionModel:
     def __init__(self):
-        self.model = RandomForestRegressor(
-            n_estimators=100,
-            max_depth=10,
-            random_state=42,
-            min_samples_split=5,
-            min_samples_leaf=2
-        )
-        self.scaler = StandardScaler()
+        self._model = None
+        self._scaler = None
         self.feature_columns = [
             'aqi_value', 'temperature', 'humidity', 'festival_score', 
             'baseline_admissions', 'hospital_occupancy', 'day_of_week',
@@ -33,14 +44,47 @@ class HealthcareSurgePredictionModel:
             'trauma_cases_trend', 'population_density'
         ]
         self.is_trained = False
+        self.surrogate = None
         self.model_path = 'trained_surge_model.pkl'
         self.scaler_path = 'trained_scaler.pkl'
+        self.surrogate_path = 'trained_surrogate.pkl'
+    
+    @property
+    def model(self):
+        """The Random Forest, created untrained on first access"""
+        if self._model is None:
+            from sklearn.ensemble import RandomForestRegressor
+            self._model = RandomForestRegressor(
+                n_estimators=100,
+                max_depth=10,
+                random_state=42,
+                min_samples_split=5,
+                min_samples_leaf=2
+            )
+        return self._model
+    
+    @model.setter
+    def model(self, value):
+        self._model = value
+    
+    @property
+    def scaler(self):
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+    
+    @scaler.setter
+    def scaler(self, value):
+        self._scaler = value
         
     def generate_synthetic_training_data(self, n_samples=5000):
         """
         Generate synthetic but realistic healthcare data for training
         Based on patterns from real healthcare surge research
         """
+        import pandas as pd
+        
         np.random.seed(42)
         
         data = []
@@ -137,6 +181,10 @@ class HealthcareSurgePredictionModel:
     
     def train_model(self, df=None):
         """Train the Random Forest model"""
+        import pandas as pd
+        from sklearn.metrics import mean_absolute_error, r2_score
+        from sklearn.model_selection import train_test_split
+        
         if df is None:
             print("Generating synthetic training data...")
             df = self.generate_synthetic_training_data()
@@ -150,16 +198,12 @@ class HealthcareSurgePredictionModel:
             X, y, test_size=0.2, random_state=42
         )
         
-        # Scale features
-        X_train_scaled = self.scaler.fit_transform(X_train)
-        X_test_scaled = self.scaler.transform(X_test)
-        
-        # Train model
+        # Scale features and train model
         print("Training Random Forest model...")
-        self.model.fit(X_train_scaled, y_train)
+        self.fit(X_train, y_train)
         
         # Evaluate
-        y_pred = self.model.predict(X_test_scaled)
+        y_pred = self.model.predict(self.scaler.transform(np.asarray(X_test, dtype=float)))
         mae = mean_absolute_error(y_test, y_pred)
         r2 = r2_score(y_test, y_pred)
         
@@ -184,17 +228,80 @@ class HealthcareSurgePredictionModel:
         
         return mae, r2, feature_importance
     
+    def fit(self, X, y):
+        """Fit scaler and forest on prepared features without evaluating or saving"""
+        X_scaled = self.scaler.fit_transform(np.asarray(X, dtype=float))
+        self.model.fit(X_scaled, np.asarray(y, dtype=float))
+        self.is_trained = True
+        self.surrogate = None  # A lookup table built on the old forest is stale
+        return self
+    
+    def predict_batch(self, X, n_jobs=None):
+        """
+        Score many feature rows in one forest call.
+        X is a DataFrame holding feature_columns or an array in that column order.
+        n_jobs sets forest parallelism for this call only, on a shallow copy
+        of the forest, so concurrent callers of the shared model are unaffected.
+        Returns surge percentages clipped at 0, matching predict_surge.
+        """
+        import copy
+        import pandas as pd
+        
+        if isinstance(X, pd.DataFrame):
+            X = X[self.feature_columns]
+        X_scaled = self.scaler.transform(np.asarray(X, dtype=float))
+        forest = self.model
+        if n_jobs is not None and n_jobs != forest.n_jobs:
+            forest = copy.copy(forest)  # Shares the fitted trees
+            forest.n_jobs = n_jobs
+        return np.maximum(forest.predict(X_scaled), 0)
+    
+    def build_surrogate(self, context=None, **kwargs):
+        """
+        Build the interpolating lookup table used for near-instant approximate
+        predictions (see surrogate_model.SurrogateLookupTable.build), then save
+        it alongside the model files
+        """
+        import joblib
+        from surrogate_model import SurrogateLookupTable
+        
+        self.surrogate = SurrogateLookupTable.build(self, context=context, **kwargs)
+        joblib.dump(self.surrogate, self.surrogate_path)
+        report = self.surrogate.error_report
+        print(f"Surrogate saved to {self.surrogate_path} "
+              f"(max error {report['max_error']:.2f}% <= {report['error_bound']:.2f}%)")
+        return self.surrogate
+    
+    def predict_surge_approximate(self, features):
+        """
+        Approximate surge percentage from the surrogate lookup table.
+        Features not gridded by the surrogate are held at its build context.
+        """
+        if self.surrogate is None:
+            raise RuntimeError("No surrogate available; call build_surrogate() first")
+        return max(0.0, self.surrogate.predict(features))
+    
     def save_model(self):
         """Save trained model and scaler"""
+        import joblib
+        
         joblib.dump(self.model, self.model_path)
         joblib.dump(self.scaler, self.scaler_path)
+        if self.surrogate is not None:
+            joblib.dump(self.surrogate, self.surrogate_path)
+        elif os.path.exists(self.surrogate_path):
+            os.remove(self.surrogate_path)  # Built for a previous forest
         print(f"Model saved to {self.model_path}")
     
     def load_model(self):
         """Load pre-trained model"""
+        import joblib
+        
         if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
             self.model = joblib.load(self.model_path)
             self.scaler = joblib.load(self.scaler_path)
+            if os.path.exists(self.surrogate_path):
+                self.surrogate = joblib.load(self.surrogate_path)
             self.is_trained = True
             print("Pre-trained model loaded successfully")
             return True
@@ -268,15 +375,25 @@ class HealthcareSurgePredictionModel:
         """
         Main prediction function that takes text summary and returns detailed prediction
         """
+        # Extract features from text
+        features = self.extract_features_from_text(data_summary)
+        
+        # Calculate confidence based on feature certainty
+        confidence = self.calculate_confidence(features, data_summary)
+        
+        return self.predict_from_features(features, confidence)
+    
+    def predict_from_features(self, features, confidence=70):
+        """
+        Detailed prediction from a complete structured feature dict (one value
+        per feature column), skipping text extraction
+        """
         if not self.is_trained:
             if not self.load_model():
                 # Train model if not available
                 print("Training new model...")
                 self.train_model()
         
-        # Extract features from text
-        features = self.extract_features_from_text(data_summary)
-        
         # Create feature vector
         feature_vector = np.array([[features[col] for col in self.feature_columns]])
         
@@ -286,22 +403,8 @@ class HealthcareSurgePredictionModel:
         # Make prediction
         predicted_surge_percentage = self.model.predict(feature_vector_scaled)[0]
         
-        # Calculate confidence based on feature certainty
-        confidence = self.calculate_confidence(features, data_summary)
-        
         # Determine risk level
-        if predicted_surge_percentage >= 40:
-            risk_level = "Very High"
-            timeline = "2-4 days"
-        elif predicted_surge_percentage >= 25:
-            risk_level = "High"
-            timeline = "3-5 days"
-        elif predicted_surge_percentage >= 15:
-            risk_level = "Moderate"
-            timeline = "5-7 days"
-        else:
-            risk_level = "Low"
-            timeline = "7+ days"
+        risk_level, timeline = classify_risk(predicted_surge_percentage)
         
         # Generate detailed prediction
         prediction_result = {
@@ -359,13 +462,23 @@ class HealthcareSurgePredictionModel:
 
 # Initialize global model instance
 surge_model = HealthcareSurgePredictionModel()
+_init_lock = threading.Lock()
 
-def initialize_model():
-    """Initialize and train the model if needed"""
-    if not surge_model.load_model():
-        print("No pre-trained model found. Training new model...")
-        surge_model.train_model()
-    return surge_model
+def initialize_model(reload=False):
+    """
+    Initialize and train the model if needed. reload=True replaces the shared
+    model with a new instance read from the saved files, leaving the old
+    instance untouched for callers still holding it.
+    """
+    global surge_model
+    # Concurrent analyses share one model: load or train it once at a time
+    with _init_lock:
+        if reload:
+            surge_model = HealthcareSurgePredictionModel()
+        if not surge_model.load_model():
+            print("No pre-trained model found. Training new model...")
+            surge_model.train_model()
+        return surge_model
 
 if __name__ == "__main__":
     # Test the model
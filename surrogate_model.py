@@ -0,0 +1,246 @@
+# surrogate_model.py
+"""
+Surrogate lookup table for approximate surge inference
+Precomputes Random Forest predictions on an adaptive grid over the most
+important features and answers queries by multilinear interpolation
+"""
+
+import itertools
+import time
+from bisect import bisect_right
+
+import numpy as np
+
+# Sweep bounds per feature, matching the synthetic training distribution
+FEATURE_BOUNDS = {
+    'aqi_value': (50, 500),
+    'temperature': (13, 43),
+    'humidity': (30, 120),
+    'festival_score': (0.0, 1.0),
+    'baseline_admissions': (80, 250),
+    'hospital_occupancy': (0.6, 1.0),
+    'day_of_week': (0, 6),
+    'month': (1, 12),
+    'respiratory_cases_trend': (0.4, 1.9),
+    'cardiac_cases_trend': (0.4, 1.6),
+    'trauma_cases_trend': (0.25, 1.75),
+    'population_density': (5000, 35000)
+}
+
+# Calendar values for non-gridded features: a midweek, non-winter day, where the
+# training data adds no weekend or seasonal uplift. Fixed rather than taken from
+# the build date so a saved table means the same thing whenever it is loaded.
+CALENDAR_CONTEXT = {
+    'day_of_week': 2,
+    'month': 6
+}
+
+
+class SurrogateLookupTable:
+    """
+    Grid of forest predictions over a few features, with all other features
+    fixed to the context values the table was built for.
+
+    Build with SurrogateLookupTable.build(model, ...); query with predict()
+    for a single point or predict_batch() for arrays.
+    """
+
+    def __init__(self, features, knots, table, context, error_report):
+        self.features = list(features)
+        self.knots = [np.asarray(k, dtype=float) for k in knots]
+        self.table = np.asarray(table, dtype=float)
+        self.context = dict(context)
+        self.error_report = error_report
+        self._prepare_scalar_path()
+
+    def _prepare_scalar_path(self):
+        """Plain-Python copies of the grid so single queries avoid NumPy call overhead"""
+        self._knot_lists = [k.tolist() for k in self.knots]
+        self._flat_table = self.table.ravel().tolist()
+        strides, stride = [], 1
+        for k in reversed(self._knot_lists):
+            strides.append(stride)
+            stride *= len(k)
+        self._strides = strides[::-1]
+        self._corners = list(itertools.product((0, 1), repeat=len(self.features)))
+
+    def __getstate__(self):
+        return {
+            'features': self.features,
+            'knots': self.knots,
+            'table': self.table,
+            'context': self.context,
+            'error_report': self.error_report
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    @classmethod
+    def build(cls, model, context=None, features=None, top_k=3, max_error=5.0,
+              initial_points=9, max_points_per_axis=65, max_rounds=8,
+              n_probes=4000, random_state=42):
+        """
+        Build an adaptive grid for a trained HealthcareSurgePredictionModel.
+
+        context          - values for non-gridded features (defaults to the
+                           model's text-extraction defaults, with day_of_week
+                           and month from CALENDAR_CONTEXT unless gridded)
+        features         - features to grid (defaults to the top_k by forest importance)
+        max_error        - bound in surge percentage points; probe errors above
+                           it trigger refinement, and the build fails if the
+                           final validation still exceeds it
+
+        The forest is piecewise constant, so errors concentrate at its split
+        points and cannot be driven to zero; the bound is checked on an
+        independent random validation set rather than proven.
+        """
+        if not model.is_trained and not model.load_model():
+            model.train_model()
+
+        start = time.perf_counter()
+        if features is None:
+            order = np.argsort(model.model.feature_importances_)[::-1]
+            features = [model.feature_columns[i] for i in order[:top_k]]
+        base = model.extract_features_from_text("")
+        base.update(CALENDAR_CONTEXT)
+        base.update(context or {})
+        bounds = np.array([FEATURE_BOUNDS[f] for f in features], dtype=float)
+        columns = [model.feature_columns.index(f) for f in features]
+        base_vector = np.array([base[c] for c in model.feature_columns], dtype=float)
+
+        def forest(points):
+            X = np.tile(base_vector, (len(points), 1))
+            X[:, columns] = points
+            return model.predict_batch(X)
+
+        def evaluate_grid(knots):
+            mesh = np.meshgrid(*knots, indexing='ij')
+            points = np.stack([m.ravel() for m in mesh], axis=1)
+            return forest(points).reshape(tuple(len(k) for k in knots))
+
+        rng = np.random.default_rng(random_state)
+        knots = [np.linspace(lo, hi, initial_points) for lo, hi in bounds]
+
+        for _ in range(max_rounds):
+            surrogate = cls(features, knots, evaluate_grid(knots), base, {})
+            probes = rng.uniform(bounds[:, 0], bounds[:, 1], size=(n_probes, len(features)))
+            errors = np.abs(forest(probes) - surrogate.predict_batch(probes))
+            bad = errors > max_error
+            if not bad.any():
+                break
+
+            # Split the intervals that contain failing probes, worst first
+            refined = False
+            for axis, axis_knots in enumerate(knots):
+                budget = max_points_per_axis - len(axis_knots)
+                if budget <= 0:
+                    continue
+                cells = surrogate._cell_indices(probes[bad, axis], axis)
+                counts = np.bincount(cells, weights=errors[bad], minlength=len(axis_knots) - 1)
+                split = [i for i in np.argsort(counts)[::-1][:budget] if counts[i] > 0]
+                if split:
+                    midpoints = (axis_knots[split] + axis_knots[np.array(split) + 1]) / 2
+                    knots[axis] = np.union1d(axis_knots, midpoints)
+                    refined = True
+            if not refined:
+                break
+
+        table = evaluate_grid(knots)
+        surrogate = cls(features, knots, table, base, {})
+
+        # Independent validation against the full forest
+        validation = np.random.default_rng(random_state + 1).uniform(
+            bounds[:, 0], bounds[:, 1], size=(n_probes, len(features)))
+        errors = np.abs(forest(validation) - surrogate.predict_batch(validation))
+        surrogate.error_report = {
+            'max_error': float(errors.max()),
+            'mean_error': float(errors.mean()),
+            'p99_error': float(np.percentile(errors, 99)),
+            'error_bound': max_error,
+            'grid_shape': table.shape,
+            'validation_points': n_probes,
+            'build_seconds': time.perf_counter() - start
+        }
+
+        if errors.max() > max_error:
+            raise ValueError(
+                f"Surrogate max error {errors.max():.2f} exceeds bound {max_error:.2f} "
+                f"(grid {table.shape}); raise max_points_per_axis or the bound"
+            )
+        return surrogate
+
+    def _cell_indices(self, values, axis):
+        """Index of the grid interval containing each value along one axis"""
+        knots = self.knots[axis]
+        return np.clip(np.searchsorted(knots, values, side='right') - 1, 0, len(knots) - 2)
+
+    def predict_batch(self, points):
+        """Interpolate an (n, len(features)) array of points"""
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        cells = np.empty(points.shape, dtype=int)
+        weights = np.empty(points.shape)
+        for axis, knots in enumerate(self.knots):
+            values = np.clip(points[:, axis], knots[0], knots[-1])
+            cells[:, axis] = self._cell_indices(values, axis)
+            lower = knots[cells[:, axis]]
+            weights[:, axis] = (values - lower) / (knots[cells[:, axis] + 1] - lower)
+
+        result = np.zeros(len(points))
+        for corner in self._corners:
+            offset = np.array(corner)
+            corner_weight = np.prod(np.where(offset == 1, weights, 1 - weights), axis=1)
+            result += corner_weight * self.table[tuple((cells + offset).T)]
+        return result
+
+    def predict(self, values):
+        """
+        Interpolate a single point, given as a dict keyed by feature name or a
+        sequence in self.features order. Missing features take context values.
+        """
+        if isinstance(values, dict):
+            values = [values.get(f, self.context[f]) for f in self.features]
+
+        base_index = 0
+        fractions = []
+        for value, knots, stride in zip(values, self._knot_lists, self._strides):
+            value = min(max(value, knots[0]), knots[-1])
+            cell = min(bisect_right(knots, value) - 1, len(knots) - 2)
+            lower, upper = knots[cell], knots[cell + 1]
+            fractions.append(((value - lower) / (upper - lower), stride))
+            base_index += cell * stride
+
+        table = self._flat_table
+        result = 0.0
+        for corner in self._corners:
+            weight = 1.0
+            index = base_index
+            for bit, (fraction, stride) in zip(corner, fractions):
+                if bit:
+                    weight *= fraction
+                    index += stride
+                else:
+                    weight *= 1 - fraction
+            result += weight * table[index]
+        return result
+
+
+if __name__ == "__main__":
+    from surge_prediction_model import initialize_model
+
+    model = initialize_model()
+    surrogate = model.build_surrogate()
+    report = surrogate.error_report
+
+    print(f"Surrogate features: {', '.join(surrogate.features)}")
+    print(f"Grid shape: {report['grid_shape']} built in {report['build_seconds']:.2f}s")
+    print(f"Max error: {report['max_error']:.2f}% (bound {report['error_bound']:.2f}%), "
+          f"mean {report['mean_error']:.3f}%")
+
+    query = {f: surrogate.context[f] for f in surrogate.features}
+    n_queries = 100_000
+    start = time.perf_counter()
+    for _ in range(n_queries):
+        surrogate.predict(query)
+    per_query = (time.perf_counter() - start) / n_queries * 1e6
+    print(f"Single-point query: {per_query:.1f} µs")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for bulk alert and advisory rendering
+Run this to verify languages, deduplication, one-pass output and speed
+"""
+
+from advisory_renderer import CompiledTemplate, render_batch, synthetic_table, write_batch
+import json
+import os
+import sys
+import tempfile
+
+def test_advisory_renderer():
+    print("🧪 Testing Advisory Renderer")
+    print("=" * 60)
+
+    rows = [
+        {"city": "Pune", "ward": "Kothrud", "hospital": "A", "occupancy": 0.95, "surge_percentage": 31,
+         "key_factors": ["High pollution levels (AQI)"]},
+        {"city": "Pune", "ward": "Kothrud", "hospital": "B", "occupancy": 0.93, "surge_percentage": 31,
+         "key_factors": ["High pollution levels (AQI)"]},
+        {"city": "Pune", "ward": "Aundh", "hospital": "C", "occupancy": 0.70, "surge_percentage": 31,
+         "key_factors": ["High pollution levels (AQI)"]}
+    ]
+
+    # Test 1: Every language gets its own text
+    print("\n🗣️ Test 1: Languages")
+    batch = render_batch(rows)
+    advisories = {m["language"]: m["text"] for m in batch["messages"] if m["kind"] == "advisory"}
+    assert set(advisories) == {"en", "mr", "hi"}
+    assert "PUBLIC HEALTH ADVISORY for Pune" in advisories["en"] and "प्रदूषण" in advisories["mr"]
+    print(f"✅ {len(advisories)} advisory languages: {', '.join(sorted(advisories))}")
+
+    # Test 2: Identical messages are rendered once and list every recipient
+    print("\n🧬 Test 2: Deduplication")
+    en_alerts = [m for m in batch["messages"] if m["kind"] == "alert" and m["language"] == "en"]
+    assert len(en_alerts) == 2  # A and B are both critical; C is moderate
+    critical = next(m for m in en_alerts if "critical" in m["text"])
+    assert [r["hospital"] for r in critical["recipients"]] == ["A", "B"]
+    en_advisory = next(m for m in batch["messages"] if m["kind"] == "advisory" and m["language"] == "en")
+    assert sorted(r["ward"] for r in en_advisory["recipients"]) == ["Aundh", "Kothrud"]
+    assert batch["total"] == 3 * 3 + 2 * 3
+    print(f"✅ {batch['total']} recipient-messages from {batch['unique']} unique texts")
+
+    # Test 3: Templates reject unknown fields when compiled
+    print("\n🧩 Test 3: Template Compilation")
+    try:
+        CompiledTemplate("Beds at {hospital_name}")
+        raise AssertionError("unknown field accepted")
+    except ValueError as e:
+        print(f"✅ {e}")
+
+    # Test 4: Thousands of advisories in under a second, written in one pass
+    print("\n⚡ Test 4: Scale")
+    batch = render_batch(synthetic_table(5000))
+    assert batch["total"] > 15000 and batch["elapsed"] < 1.0
+    path = os.path.join(tempfile.mkdtemp(), "advisories.jsonl")
+    write_batch(batch, path)
+    with open(path, encoding="utf-8") as f:
+        written = [json.loads(line) for line in f]
+    assert len(written) == batch["unique"]
+    assert sum(len(m["recipients"]) for m in written) == batch["total"]
+    print(f"✅ {batch['total']} rendered in {batch['elapsed'] * 1000:.0f} ms ({batch['unique']} unique)")
+
+    print("\n🎉 Advisory renderer tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_advisory_renderer()
+    except AssertionError as e:
+        print(f"❌ Advisory renderer test failed: {e}")
+        sys.exit(1)
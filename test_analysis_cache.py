@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Test script for whole-analysis memoization
+Run this to verify fingerprints change with sources, model and template
+versions, and that force_refresh bypasses the store
+"""
+
+from analysis_cache import AnalysisStore, analysis_fingerprint, memoized_analysis, model_version
+from datetime import date
+import analysis_cache
+import os
+import sys
+import tempfile
+import time
+import types
+
+SOURCES = {"air_quality": "Current AQI in Mumbai: AQI 182", "hospital": "Current Occupancy: 84.0%"}
+VERSIONS = {"model": "abc123", "templates": "1", "pipeline": "1"}
+
+def test_analysis_cache():
+    print("🧪 Testing Analysis Cache")
+    print("=" * 60)
+    directory = tempfile.mkdtemp()
+
+    # Test 1: Any change to a source, the model or the templates gives a new fingerprint
+    print("\n🔑 Test 1: Fingerprints")
+    base = analysis_fingerprint("Mumbai", SOURCES, VERSIONS)
+    assert analysis_fingerprint(" mumbai ", dict(SOURCES), dict(VERSIONS)) == base
+    changed = [
+        analysis_fingerprint("Mumbai", dict(SOURCES, air_quality="Current AQI in Mumbai: AQI 183"), VERSIONS),
+        analysis_fingerprint("Mumbai", dict(SOURCES, public_health="New advisory"), VERSIONS),
+        analysis_fingerprint("Mumbai", SOURCES, dict(VERSIONS, model="def456")),
+        analysis_fingerprint("Mumbai", SOURCES, dict(VERSIONS, templates="2")),
+        analysis_fingerprint("Pune", SOURCES, VERSIONS),
+        analysis_fingerprint("Mumbai", SOURCES, VERSIONS, day=date(2020, 1, 1))
+    ]
+    assert len(set(changed + [base])) == len(changed) + 1
+    print(f"✅ {len(changed)} input changes give {len(changed)} new fingerprints")
+
+    # Test 2: The model version follows the saved forest and scaler contents
+    print("\n🌲 Test 2: Model Version")
+    model = types.SimpleNamespace(model_path=os.path.join(directory, "model.pkl"),
+                                  scaler_path=os.path.join(directory, "scaler.pkl"))
+    assert model_version(model) == "unsaved"
+    for path, content in ((model.model_path, b"forest v1"), (model.scaler_path, b"scaler")):
+        with open(path, "wb") as f:
+            f.write(content)
+    first = model_version(model)
+    assert model_version(model) == first
+    with open(model.model_path, "wb") as f:
+        f.write(b"forest v2")
+    os.utime(model.model_path, ns=(time.time_ns(), time.time_ns() + 1_000_000))
+    assert model_version(model) not in ("unsaved", first)
+    print(f"✅ Retrained forest changes the version ({first} -> {model_version(model)})")
+
+    # Test 3: Stored results are returned without recomputing; force_refresh recomputes
+    print("\n💾 Test 3: Memoization and force_refresh")
+    saved_store = analysis_cache._shared_store
+    saved_disabled = os.environ.pop("AROGYA_ANALYSIS_CACHE_DISABLED", None)
+    analysis_cache._shared_store = AnalysisStore(path=os.path.join(directory, "analyses.sqlite"))
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"surge_percentage": 30.0 + len(calls)}
+
+    try:
+        result, fingerprint, from_cache = memoized_analysis("fast_pipeline", "Mumbai", SOURCES, VERSIONS, compute)
+        assert (result, from_cache, len(calls)) == ({"surge_percentage": 31.0}, False, 1)
+        result, again, from_cache = memoized_analysis("fast_pipeline", "Mumbai", SOURCES, VERSIONS, compute)
+        assert (result, again, from_cache, len(calls)) == ({"surge_percentage": 31.0}, fingerprint, True, 1)
+
+        result, _, from_cache = memoized_analysis("fast_pipeline", "Mumbai", SOURCES, VERSIONS, compute,
+                                                  force_refresh=True)
+        assert (result, from_cache, len(calls)) == ({"surge_percentage": 32.0}, False, 2)
+        result, _, from_cache = memoized_analysis("fast_pipeline", "Mumbai", SOURCES, VERSIONS, compute)
+        assert result == {"surge_percentage": 32.0} and from_cache, "refreshed result should replace the stored one"
+
+        _, other, from_cache = memoized_analysis("fast_pipeline", "Mumbai", SOURCES,
+                                                 dict(VERSIONS, templates="2"), compute)
+        assert other != fingerprint and not from_cache and len(calls) == 3
+
+        os.environ["AROGYA_ANALYSIS_CACHE_DISABLED"] = "1"
+        memoized_analysis("fast_pipeline", "Mumbai", SOURCES, VERSIONS, compute)
+        assert len(calls) == 4
+        stats = analysis_cache._shared_store.stats()["fast_pipeline"]
+        assert stats == {"analyses": 2, "hits": 2}
+        print(f"✅ {len(calls)} computations for 6 calls; store holds {stats['analyses']} analyses")
+    finally:
+        os.environ.pop("AROGYA_ANALYSIS_CACHE_DISABLED", None)
+        if saved_disabled is not None:
+            os.environ["AROGYA_ANALYSIS_CACHE_DISABLED"] = saved_disabled
+        analysis_cache._shared_store = saved_store
+
+    # Test 4: Entries older than max_age are ignored
+    print("\n⌛ Test 4: Expiry")
+    store = AnalysisStore(path=os.path.join(directory, "expiring.sqlite"), max_age=0.2)
+    store.put("fp", "fast_pipeline", "Mumbai", {"ok": True})
+    assert store.get("fp") == {"ok": True}
+    time.sleep(0.3)
+    assert store.get("fp") is None
+    print("✅ Expired analysis not served")
+
+    print("\n🎉 Analysis cache tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_analysis_cache()
+    except AssertionError as e:
+        print(f"❌ Analysis cache test failed: {e}")
+        sys.exit(1)
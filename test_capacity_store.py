@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the columnar capacity store
+Run this to verify facility updates, aggregation and that the shared store is
+filled even when the hospital source is served from the disk cache
+"""
+
+from capacity_store import CapacityStore
+from fhir_ingest import write_synthetic_bundle
+from source_cache import SourceCache
+import data_sources
+import os
+import source_cache
+import sys
+import tempfile
+
+def new_process():
+    """Forget the shared store as a fresh process would; the disk cache stays"""
+    data_sources._capacity_store = None
+    data_sources._capacity_refreshed_at = None
+
+def test_capacity_store():
+    print("🧪 Testing Capacity Store")
+    print("=" * 60)
+
+    # Test 1: Rows grow past the initial capacity; updates and filters hit the right rows
+    print("\n🏥 Test 1: Updates and Aggregation")
+    store = CapacityStore(initial_capacity=2)
+    for i in range(5):
+        store.upsert_facility(f"h{i}", f"Hospital {i}", city="Pune" if i < 3 else "Nagpur",
+                              ward=f"Ward {i % 2}", total={"general": 100, "icu": 10})
+    store.update_occupancy("h0", "icu", 9)
+    store.update_occupancy_many(["h0", "h1", "h3"], ["general"] * 3, [90, 50, 70])
+    pune = store.totals(city="Pune")
+    assert len(store) == 5 and pune["facilities"] == 3
+    assert pune["total"] == 330 and pune["occupied"] == 149
+    assert pune["by_bed_type"]["icu"] == {"total": 30, "occupied": 9, "available": 21}
+    assert store.totals(city="Nowhere")["facilities"] == 0
+    wards = store.aggregate(by="ward", city="Pune").set_index(["ward", "bed_type"])
+    assert wards.loc[("Ward 0", "general"), "occupied"] == 90
+    assert store.facility_frame(city="Pune").sort_values("occupancy")["facility_id"].iloc[-1] == "h0"
+    try:
+        store.update_occupancy("h0", "burns", 1)
+        assert False, "unknown bed type accepted"
+    except ValueError:
+        pass
+    print(f"✅ {len(store)} facilities; Pune {pune['occupancy']:.1%} occupied")
+
+    saved_env = {name: os.environ.pop(name, None) for name in
+                 ("AROGYA_CACHE_DISABLED", "AROGYA_MOCK_SERVER", "AROGYA_FHIR_SOURCE")}
+    saved_cache = source_cache._shared_cache
+    directory = tempfile.mkdtemp()
+    try:
+        # Test 2: A cache hit in a fresh process still finds occupancy in the store
+        print("\n💾 Test 2: Warm Source Cache, Empty Store")
+        source_cache._shared_cache = SourceCache(path=os.path.join(directory, "cache.sqlite"))
+        new_process()
+        text = data_sources.fetch_hospital_data("Mumbai")
+        assert data_sources.is_live_data(text)
+        new_process()
+        assert data_sources.fetch_hospital_data("Mumbai") == text
+        assert data_sources._capacity_store is None, "cache hit should not have run the fetcher"
+        totals = data_sources.current_capacity_store().totals(city="Mumbai")
+        assert totals["facilities"] == 5 and 0.6 < totals["occupancy"] < 0.96
+        print(f"✅ Cached summary served; store refilled to {totals['occupancy']:.1%} occupancy")
+
+        # Test 3: Same with a FHIR source configured
+        print("\n📦 Test 3: FHIR Source")
+        bundle = os.path.join(directory, "bundle.json")
+        write_synthetic_bundle(bundle, facilities=3, beds_per_facility=200)
+        os.environ["AROGYA_FHIR_SOURCE"] = bundle
+        source_cache._shared_cache = SourceCache(path=os.path.join(directory, "fhir_cache.sqlite"))
+        new_process()
+        data_sources.fetch_hospital_data("Mumbai")
+        new_process()
+        data_sources.fetch_hospital_data("Mumbai")
+        totals = data_sources.current_capacity_store().totals(city="Mumbai")
+        assert totals["facilities"] == 3 and totals["total"] == 600 and totals["occupied"] > 0
+        print(f"✅ FHIR beds ingested on demand: {totals['occupied']}/{totals['total']} occupied")
+
+        # Test 4: Refills only once the store is older than max_age
+        print("\n⏱️  Test 4: Refresh Age")
+        refreshed_at = data_sources._capacity_refreshed_at
+        data_sources.current_capacity_store()
+        assert data_sources._capacity_refreshed_at == refreshed_at
+        data_sources.current_capacity_store(max_age=0)
+        assert data_sources._capacity_refreshed_at > refreshed_at
+        print("✅ Fresh store reused, stale store refilled")
+    finally:
+        for name, value in saved_env.items():
+            os.environ.pop(name, None)
+            if value is not None:
+                os.environ[name] = value
+        source_cache._shared_cache = saved_cache
+        new_process()
+
+    print("\n🎉 Capacity store tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_capacity_store()
+    except AssertionError as e:
+        print(f"❌ Capacity store test failed: {e}")
+        sys.exit(1)
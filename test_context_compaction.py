@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for tool-output context compaction
+Run this to verify digests keep the model's inputs and report token savings
+"""
+
+from context_compaction import DIGEST_SCHEMAS, compact, compaction_ledger, digest
+from data_sources import fetch_hospital_data
+from report_builder import format_prediction, parse_prediction
+from surge_prediction_model import HealthcareSurgePredictionModel
+import os
+import sys
+
+FALLBACK_OUTPUTS = {
+    "public_health": "Connection Error: Using fallback data - Minor increase in influenza-like illnesses reported in Mumbai suburbs. No major epidemic alerts.",
+    "air_quality": "API Unavailable: Using fallback data - AQI in Mumbai is currently 155 (Unhealthy for sensitive groups). Forecast predicts a spike to 210 (Severe) in 48 hours due to changing wind patterns.",
+    "festival_calendar": "Connection Error: Using fallback data - Ganesh Chaturthi celebrations are scheduled to begin in Mumbai in 5 days, a 10-day festival known for large public gatherings."
+}
+
+def test_context_compaction():
+    print("🧪 Testing Context Compaction")
+    print("=" * 60)
+
+    # Demo capacity store: the full multi-line hospital listing
+    outputs = dict(FALLBACK_OUTPUTS, hospital=fetch_hospital_data("Mumbai"))
+
+    # Test 1: Digests carry exactly their schema's fields
+    print("\n📐 Test 1: Schema-Bound Digests")
+    for kind, output in outputs.items():
+        values = digest(kind, output)
+        assert tuple(values) == DIGEST_SCHEMAS[kind], kind
+    assert digest("air_quality", outputs["air_quality"])["aqi"] == 155
+    assert digest("festival_calendar", outputs["festival_calendar"])["events"] == ["Ganesh Chaturthi in 5 days"]
+    hospital = digest("hospital", outputs["hospital"])
+    assert hospital["facilities"] == 5 and hospital["occupied"] + hospital["available"] == hospital["total"]
+    print(f"✅ Hospital digest: {hospital}")
+
+    # Test 2: The digests keep what the model reads, with far fewer tokens
+    print("\n🗜️ Test 2: Token Savings")
+    with compaction_ledger() as ledger:
+        digests = {kind: compact(kind, output) for kind, output in outputs.items()}
+    report = ledger.report()
+    assert report["calls"] == 4 and report["digest_tokens"] < report["raw_tokens"]
+    assert report["by_kind"]["hospital"]["digest_tokens"] < report["by_kind"]["hospital"]["raw_tokens"] / 2
+    model = HealthcareSurgePredictionModel()
+    features = model.extract_features_from_text("\n".join(digests.values()))
+    assert features["aqi_value"] == 155
+    assert abs(features["hospital_occupancy"] - hospital["occupancy"] / 100) < 0.01
+    assert features["respiratory_cases_trend"] > 1.0 and features["festival_score"] > 0
+    print(f"✅ {report['raw_tokens']} -> {report['digest_tokens']} tokens "
+          f"({report['saved_fraction']:.0%} saved, ~{report['estimated_latency_saved_ms']:.0f} ms)")
+
+    # Test 3: The prediction digest still parses for the resource planner
+    print("\n📈 Test 3: Prediction Digest")
+    result = {"surge_percentage": 31.24, "risk_level": "High", "timeline": "3-5 days", "confidence": 85,
+              "key_factors": ["High air pollution (AQI: 182)"]}
+    text = compact("prediction", result, raw_text=format_prediction(result))
+    assert parse_prediction(text) == parse_prediction(format_prediction(result))
+    assert len(text) < len(format_prediction(result)) / 2
+    print(f"✅ {parse_prediction(text)}")
+
+    # Test 4: The bypass switch returns raw outputs
+    print("\n🚫 Test 4: Bypass")
+    os.environ["AROGYA_CONTEXT_COMPACTION_DISABLED"] = "1"
+    try:
+        assert compact("air_quality", outputs["air_quality"]) == outputs["air_quality"]
+    finally:
+        del os.environ["AROGYA_CONTEXT_COMPACTION_DISABLED"]
+    print("✅ Raw output returned when compaction is disabled")
+
+    print("\n🎉 Context compaction tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_context_compaction()
+    except AssertionError as e:
+        print(f"❌ Context compaction test failed: {e}")
+        sys.exit(1)
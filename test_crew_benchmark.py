@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script for the offline crew benchmark
+Run this to verify the fake LLM's scripted tool calls, backend stubs and the timing report
+"""
+
+from crew_benchmark import (
+    BenchmarkRecorder, compare_to_baseline, crew_script, scripted_response, stub_backends, summarize_benchmark
+)
+import data_prefetch
+import json
+import sys
+
+ANALYST = "Senior Public Health Data Analyst"
+PREDICTOR = "Healthcare Predictive Modeling Specialist"
+
+def prompt(role, context=""):
+    text = f"You are {role}. You study health data.\nCurrent Task: Do the work."
+    if context:
+        text += f"\n\nThis is the context you're working with:\n{context}"
+    return [{"role": "system", "content": text + "\n\nBegin! This is VERY important to you"}]
+
+def tool_turn(reply, observation, reminder=False):
+    content = f"{reply}\nObservation: {observation}"
+    if reminder:
+        content += "\n\n\nYou ONLY have access to the following tools:\nObservation: the result of the action"
+    return [{"role": "assistant", "content": content}, {"role": "user", "content": "Analyze the tool result."}]
+
+def test_crew_benchmark():
+    print("🧪 Testing Crew Benchmark Harness")
+    print("=" * 60)
+    script = crew_script("Mumbai")
+
+    # Test 1: The fake LLM walks each agent through its scripted tool calls
+    print("\n🤖 Test 1: Scripted Tool Calls")
+    messages = prompt(ANALYST)
+    tools = []
+    for i in range(4):
+        role, reply = scripted_response(script, messages)
+        assert role == ANALYST and "\nAction Input: " in reply
+        tools.append(reply.split("Action: ")[1].split("\n")[0])
+        # CrewAI re-appends its tool list to some observations; that is not another tool result
+        messages += tool_turn(reply, f"result {i}", reminder=i == 2)
+    role, reply = scripted_response(script, messages)
+    assert tools[0] == "Public Health Data Tool" and tools[-1] == "Hospital Data Tool"
+    assert reply.endswith("Final Answer: result 0\nresult 1\nresult 2\nresult 3")
+    role, reply = scripted_response(script, prompt(PREDICTOR, context="AQI 182 (Unhealthy)"))
+    assert json.loads(reply.split("Action Input: ")[1]) == {"data_summary": "AQI 182 (Unhealthy)"}
+    print(f"✅ Analyst called {len(tools)} tools then answered; predictor got the task context")
+
+    # Test 2: Stubbed backends answer with canned data and are restored afterwards
+    print("\n🔌 Test 2: Backend Stubs")
+    original = dict(data_prefetch.DATA_SOURCES)
+    recorder = BenchmarkRecorder()
+    with stub_backends(recorder=recorder):
+        assert "AQI 182" in data_prefetch.DATA_SOURCES["air_quality"]("Mumbai")
+    assert data_prefetch.DATA_SOURCES == original
+    assert [sample["source"] for sample in recorder.backends] == ["air_quality"]
+    print("✅ Canned outputs served and fetchers restored")
+
+    # Test 3: The report separates model, tool and framework time and drops warm-up runs
+    print("\n📊 Test 3: Timing Report")
+    recorder = BenchmarkRecorder()
+    for iteration in (-1, 0, 1):
+        recorder.iteration = iteration
+        recorder.add("llm_steps", agent=PREDICTOR, prompt_chars=1000, seconds=0.02)
+        recorder.add("tools", tool="Surge Prediction Model Tool", agent=PREDICTOR, seconds=0.01)
+        recorder.add("agents", agent=PREDICTOR, seconds=0.05 if iteration >= 0 else 5.0)
+        recorder.add("iterations", seconds=0.06, prefetch_seconds=0.001, rss_mb=100.0 + iteration,
+                     prompt_tokens_saved=0)
+    report = summarize_benchmark(recorder)
+    agent = report["agents"][PREDICTOR]
+    assert report["iterations"] == 2 and agent["count"] == 2
+    assert abs(agent["overhead_seconds"] - 0.02) < 1e-9
+    assert abs(report["memory"]["growth_mb_per_iteration"] - 1.0) < 1e-9
+    slower = json.loads(json.dumps(report))
+    slower["iteration"]["mean"] *= 2
+    assert compare_to_baseline(report, report) == []
+    assert [name for name, _, _ in compare_to_baseline(slower, report)] == ["iteration"]
+    print(f"✅ {agent['overhead_seconds'] * 1000:.0f} ms framework overhead per run; regression flagged")
+
+    print("\n🎉 Crew benchmark tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_crew_benchmark()
+    except AssertionError as e:
+        print(f"❌ Crew benchmark test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Test script for the concurrent prefetch store
+Run this to verify tool arguments reuse the prefetch of the location they name
+"""
+
+from data_prefetch import PrefetchedData
+import sys
+
+def results(text, error=None):
+    return {source: {"output": None if error else f"{source} for {text}", "error": error, "elapsed": 0.01}
+            for source in ("public_health", "air_quality", "hospital")}
+
+def test_data_prefetch():
+    print("🧪 Testing Prefetched Data Lookup")
+    print("=" * 60)
+    store = PrefetchedData()
+    store.store("Mumbai", results("Mumbai"))
+    store.store("Navi Mumbai", results("Navi Mumbai"))
+    store.store("Pune", results("Pune", error="Timeout: slow"))
+
+    # Test 1: Exact names win, then the longest contained name, never a partial word
+    print("\n📍 Test 1: Location Matching")
+    assert store.lookup("air_quality", "Mumbai") == "air_quality for Mumbai"
+    assert store.lookup("air_quality", "  navi-MUMBAI ") == "air_quality for Navi Mumbai"
+    assert store.lookup("hospital", "Navi Mumbai, Maharashtra") == "hospital for Navi Mumbai"
+    assert store.lookup("hospital", "Mumbai, Maharashtra") == "hospital for Mumbai"
+    assert store.lookup("hospital", "Mumbaikar clinics") is None
+    assert store.lookup("air_quality", "Delhi") is None
+    print("✅ Navi Mumbai and Mumbai keep their own data")
+
+    # Test 2: Failed sources and topics fall back to live fetches unless unambiguous
+    print("\n🩺 Test 2: Failures and Topics")
+    assert store.lookup("air_quality", "Pune") is None
+    assert store.lookup("public_health", "Navi Mumbai dengue surveillance") == "public_health for Navi Mumbai"
+    assert store.lookup("public_health", "dengue surveillance") is None
+    single = PrefetchedData()
+    single.store("Mumbai", results("Mumbai"))
+    assert single.lookup("public_health", "dengue surveillance") == "public_health for Mumbai"
+    store.clear("Mumbai")
+    assert store.lookup("hospital", "Mumbai") is None
+    print("✅ Errors fetch live; topics reuse the only or the named location")
+
+    print("\n🎉 Prefetched data tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_data_prefetch()
+    except AssertionError as e:
+        print(f"❌ Prefetched data test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Test script for the LLM-free fast pipeline
+Run this to verify structured features take hospital occupancy from the
+capacity store even when the hospital source is a disk cache hit, and that
+the printed hospital section and fingerprint follow the same store snapshot
+and the communications stage renders the per-hospital/per-ward batch
+"""
+
+from data_prefetch import source_outputs
+from fast_pipeline import analyse, hospital_snapshot, structured_confidence, structured_features
+from source_cache import SourceCache
+from surge_prediction_model import HealthcareSurgePredictionModel
+import data_sources
+import os
+import source_cache
+import sys
+import tempfile
+
+def test_fast_pipeline():
+    print("🧪 Testing Fast Pipeline Features")
+    print("=" * 60)
+
+    saved_env = {name: os.environ.pop(name, None) for name in
+                 ("AROGYA_CACHE_DISABLED", "AROGYA_MOCK_SERVER", "AROGYA_FHIR_SOURCE")}
+    saved_cache = source_cache._shared_cache
+    try:
+        # Warm the hospital source cache, then start over with an empty store as a new process would
+        source_cache._shared_cache = SourceCache(path=os.path.join(tempfile.mkdtemp(), "cache.sqlite"))
+        data_sources._capacity_store = None
+        data_sources._capacity_refreshed_at = None
+        data_sources.fetch_hospital_data("Mumbai")
+        data_sources._capacity_store = None
+        data_sources._capacity_refreshed_at = None
+
+        print("\n🏥 Test 1: Occupancy With Warm Source Cache and Empty Store")
+        cached = {"hospital": {"output": data_sources.fetch_hospital_data("Mumbai"), "error": None}}
+        assert data_sources._capacity_store is None, "expected a source cache hit"
+        sources, capacity = hospital_snapshot("Mumbai", cached)
+        features, capacity, live = structured_features("Mumbai", sources, HealthcareSurgePredictionModel(), capacity)
+        assert live == {"hospital"}
+        assert capacity is not None and capacity["facilities"] == 5
+        assert 0.6 < features["hospital_occupancy"] < 0.96
+        assert features["hospital_occupancy"] == capacity["occupancy"]
+        assert structured_confidence(features, capacity, live) >= 77
+        print(f"✅ hospital_occupancy {features['hospital_occupancy']:.1%} from {capacity['facilities']} facilities")
+
+        print("\n📸 Test 2: Section Text and Fingerprint Follow the Store")
+        assert f"Current Occupancy: {capacity['occupancy']:.1%}" in sources["hospital"]["output"]
+        assert cached["hospital"]["output"] == data_sources.fetch_hospital_data("Mumbai"), "input was modified"
+        data_sources.refresh_capacity_store()
+        assert data_sources.fetch_hospital_data("Mumbai") == cached["hospital"]["output"], "expected a cache hit"
+        refreshed, new_capacity = hospital_snapshot("Mumbai", cached)
+        assert f"Current Occupancy: {new_capacity['occupancy']:.1%}" in refreshed["hospital"]["output"]
+        assert source_outputs(refreshed) != source_outputs(sources)
+        print(f"✅ Store refresh {capacity['occupancy']:.1%} -> {new_capacity['occupancy']:.1%} "
+              "reaches the section text despite the cached fetcher")
+
+        print("\n📣 Test 3: Bulk Alerts and Advisories")
+        analysis = analyse("Mumbai", refreshed, HealthcareSurgePredictionModel(), new_capacity)
+        batch = analysis["advisories"]
+        alerts = [m for m in batch["messages"] if m["kind"] == "alert"]
+        assert {m["language"] for m in batch["messages"]} == {"en", "mr", "hi"}
+        assert sum(len(m["recipients"]) for m in alerts) == 3 * new_capacity["facilities"]
+        assert "Bulk Alerts and Advisories (EN, MR, HI)" in analysis["sections"]["communications"]
+        assert f"{new_capacity['facilities']} hospital alerts" in analysis["sections"]["communications"]
+        print(f"✅ {batch['total']} messages ({batch['unique']} distinct) attached to the analysis")
+
+        print("\n🚫 Test 4: Fallback Hospital Answer")
+        fallback = {"hospital": {"output": "API Unavailable: Using fallback data - Hospital capacity at 85% occupancy", "error": None}}
+        sources, capacity = hospital_snapshot("Mumbai", fallback)
+        assert sources is fallback and capacity is None
+        features, capacity, live = structured_features("Mumbai", sources, HealthcareSurgePredictionModel(), capacity)
+        assert capacity is None and not live
+        print("✅ Fallback text leaves the store out of the features")
+    finally:
+        for name, value in saved_env.items():
+            if value is not None:
+                os.environ[name] = value
+        source_cache._shared_cache = saved_cache
+        data_sources._capacity_store = None
+        data_sources._capacity_refreshed_at = None
+
+    print("\n🎉 Fast pipeline tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_fast_pipeline()
+    except AssertionError as e:
+        print(f"❌ Fast pipeline test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test script for the indexed festival calendar
+Run this to verify year-spanning window queries and per-day proximity features
+"""
+
+from festival_calendar import FestivalCalendar
+from datetime import date, timedelta
+import sys
+import tempfile
+
+SAMPLE_HOLIDAYS = {
+    2026: [
+        {"date": "2026-01-26", "name": "Republic Day", "localName": "Republic Day"},
+        {"date": "2026-11-08", "name": "Diwali", "localName": "Deepavali"}
+    ],
+    2027: [
+        {"date": "2027-01-26", "name": "Republic Day", "localName": "Republic Day"}
+    ]
+}
+
+def test_festival_calendar():
+    print("🧪 Testing Indexed Festival Calendar")
+    print("=" * 60)
+
+    fetched = []
+    def fetch_holidays(year):
+        fetched.append(year)
+        return SAMPLE_HOLIDAYS.get(year, [])
+
+    store_dir = tempfile.mkdtemp()
+    calendar = FestivalCalendar(fetch_holidays=fetch_holidays, store_dir=store_dir)
+
+    # Test 1: Windows crossing New Year include next year's events
+    print("\n📅 Test 1: Year-End Window")
+    events = calendar.events_within(date(2026, 12, 20), 40, "Mumbai")
+    assert [e["name"] for e in events] == ["Republic Day"]
+    assert events[0]["days_until"] == 37
+    print("✅ Next year's holiday found from late December")
+
+    # Test 2: Curated festivals replace one-day holidays with their full span
+    print("\n🪔 Test 2: Multi-Day Festivals")
+    events = calendar.events_within(date(2026, 11, 9), 0, "Mumbai")
+    assert [(e["name"], e["days_until"]) for e in events] == [("Diwali", 0)]
+    assert (events[0]["end"] - events[0]["start"]).days == 4
+    assert not calendar.events_within(date(2026, 9, 5), 0, "Chennai"), "Dahi Handi is Maharashtra-only"
+    print("✅ Ongoing Diwali found, regional festivals filtered by state")
+
+    # Test 3: Holidays are persisted and not refetched
+    print("\n💾 Test 3: Persisted Years")
+    reloaded = FestivalCalendar(fetch_holidays=fetch_holidays, store_dir=store_dir)
+    reloaded.events_within(date(2026, 12, 20), 40)
+    assert sorted(fetched) == [2026, 2027]
+    print("✅ Second calendar loaded years from disk")
+
+    # Test 4: Proximity features agree with window queries
+    print("\n📈 Test 4: Proximity Features")
+    days = [date(2026, 9, 1) + timedelta(days=i) for i in range(60)]
+    features = calendar.proximity_features(days, "Mumbai")
+    for day, in_festival in zip(days, features["in_festival"]):
+        assert bool(in_festival) == bool(calendar.events_within(day, 0, "Mumbai"))
+    assert features["festival_score"].max() == 1.0 and features["festival_score"].min() >= 0
+    print(f"✅ {int(features['in_festival'].sum())} festival days flagged in 60")
+
+    print("\n🎉 Festival calendar tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_festival_calendar()
+    except AssertionError as e:
+        print(f"❌ Festival calendar test failed: {e}")
+        sys.exit(1)
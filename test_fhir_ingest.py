@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Test script for streaming FHIR bed occupancy ingestion
+Run this to verify chunked bundle parsing, NDJSON input and bed counting
+"""
+
+from capacity_store import CapacityStore
+from fhir_ingest import ingest_fhir, iter_bundle_resources, write_synthetic_bundle
+import json
+import os
+import sys
+import tempfile
+
+def bed(bed_id, org, status, code=None):
+    location = {
+        "resourceType": "Location", "id": bed_id, "status": "active",
+        "operationalStatus": {"code": status},
+        "physicalType": {"coding": [{"code": "bd"}]},
+        "managingOrganization": {"reference": f"Organization/{org}"}
+    }
+    if code:
+        location["type"] = [{"coding": [{"code": code}]}]
+    return location
+
+def test_fhir_ingest():
+    print("🧪 Testing Streaming FHIR Ingestion")
+    print("=" * 60)
+
+    directory = tempfile.mkdtemp()
+    resources = [
+        {"resourceType": "Organization", "id": "h1", "name": "Hospital Ñ One",
+         "address": [{"city": "Pune", "district": "Kothrud", "state": "Maharashtra"}]},
+        bed("b1", "h1", "O"), bed("b2", "h1", "U"), bed("b3", "h1", "O", "ICU"),
+        bed("b4", "h1", "C"), bed("b5", "h1", "K", "VENT")
+    ]
+    bundle = {"resourceType": "Bundle", "meta": {"tag": [{"code": "x"}]}, "total": 6,
+              "entry": [{"resource": r} for r in resources], "link": []}
+    raw = json.dumps(bundle, ensure_ascii=False).encode("utf-8")
+
+    # Test 1: Tiny chunks split tokens, numbers and multi-byte characters
+    print("\n🧩 Test 1: Parsing Across Chunk Boundaries")
+    for size in (1, 3, 7, 64):
+        chunks = [raw[i:i + size] for i in range(0, len(raw), size)]
+        assert list(iter_bundle_resources(chunks)) == resources, f"chunk size {size}"
+    print("✅ Same resources for every chunk size")
+
+    # Test 2: Bed counts per type and status
+    print("\n🛏️  Test 2: Bed Counting")
+    path = os.path.join(directory, "bundle.json")
+    with open(path, "wb") as f:
+        f.write(raw)
+    store = CapacityStore()
+    stats = ingest_fhir(path, store)
+    totals = store.totals(city="Pune")
+    assert stats["resources"] == 6 and stats["beds"] == 4 and stats["facilities"] == 1
+    assert totals["by_bed_type"]["general"] == {"total": 2, "occupied": 1, "available": 1}
+    assert totals["by_bed_type"]["icu"]["occupied"] == 1
+    assert totals["by_bed_type"]["ventilator"]["occupied"] == 1
+    assert store.aggregate(by="ward")["ward"].iloc[0] == "Kothrud"
+    print(f"✅ {totals['occupied']}/{totals['total']} beds occupied, closed bed excluded")
+
+    # Test 3: NDJSON gives the same result; re-ingesting replaces counts
+    print("\n📄 Test 3: NDJSON Bulk Export")
+    ndjson_path = os.path.join(directory, "export.ndjson")
+    with open(ndjson_path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(r) + "\n" for r in resources)
+    ingest_fhir(ndjson_path, store)
+    assert store.totals(city="Pune") == totals and len(store) == 1
+    print("✅ NDJSON matches bundle and re-ingestion replaces counts")
+
+    # Test 4: Larger synthetic bundle
+    print("\n🚀 Test 4: Synthetic Bundle Throughput")
+    path = os.path.join(directory, "synthetic.json")
+    write_synthetic_bundle(path, facilities=20, beds_per_facility=500)
+    store = CapacityStore()
+    stats = ingest_fhir(path, store)
+    assert stats["beds"] == 10_000 and len(store) == 20
+    assert 0.8 < store.totals()["occupancy"] < 0.9
+    print(f"✅ {stats['resources']:,} resources at {stats['resources_per_sec']:,.0f}/sec")
+
+    print("\n🎉 FHIR ingestion tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_fhir_ingest()
+    except AssertionError as e:
+        print(f"❌ FHIR ingestion test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Test script for hedged provider requests
+Run this to verify hedging, failover and circuit breaking
+"""
+
+from hedged_fetch import HedgedFetcher
+import sys
+import time
+
+def provider(answer, delay=0.0, calls=None):
+    def call(location):
+        if calls is not None:
+            calls.append(location)
+        time.sleep(delay)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+    return call
+
+def test_hedged_fetch():
+    print("🧪 Testing Hedged Provider Requests")
+    print("=" * 60)
+
+    # Test 1: Fast primary answers alone
+    print("\n⚡ Test 1: Fast Primary")
+    secondary_calls = []
+    fetcher = HedgedFetcher([("primary", provider("AQI 120", 0.01)),
+                             ("secondary", provider("AQI 130", calls=secondary_calls))], hedge_delay=0.2)
+    result = fetcher.fetch("Mumbai")
+    assert result["answer"] == "AQI 120" and result["provider"] == "primary"
+    assert secondary_calls == []
+    print("✅ Secondary never started")
+
+    # Test 2: Slow primary is hedged
+    print("\n🏁 Test 2: Slow Primary Hedged")
+    fetcher = HedgedFetcher([("primary", provider("AQI 120", 1.0)),
+                             ("secondary", provider("AQI 130", 0.05))], hedge_delay=0.1)
+    result = fetcher.fetch("Mumbai")
+    assert result["provider"] == "secondary" and result["elapsed"] < 0.5
+    print(f"✅ Secondary won in {result['elapsed']:.2f}s instead of waiting 1s")
+
+    # Test 3: Failing primary fails over immediately
+    print("\n🔁 Test 3: Immediate Failover")
+    fetcher = HedgedFetcher([("primary", provider(ConnectionError("down"))),
+                             ("secondary", provider("AQI 130"))], hedge_delay=5, failure_threshold=2)
+    result = fetcher.fetch("Mumbai")
+    assert result["provider"] == "secondary" and result["elapsed"] < 1
+    print("✅ Did not wait for the hedge delay after a failure")
+
+    # Test 4: Breaker opens and skips the dead provider
+    print("\n🔌 Test 4: Circuit Breaker")
+    fetcher.fetch("Mumbai")
+    result = fetcher.fetch("Mumbai")
+    assert result["skipped"] == ["primary"] and result["attempted"] == ["secondary"]
+    stats = fetcher.stats()
+    assert stats["breakers"]["primary"] == "open" and stats["served"]["secondary"] == 3
+    print(f"✅ Open breaker skipped primary: {stats}")
+
+    # Test 5: Half-open trial closes the breaker again
+    print("\n🩹 Test 5: Recovery")
+    fetcher = HedgedFetcher([("primary", provider(None)), ("secondary", provider(None))],
+                            failure_threshold=1, reset_timeout=0.1)
+    assert fetcher.fetch("Mumbai")["answer"] is None
+    assert fetcher.stats()["breakers"] == {"primary": "open", "secondary": "open"}
+    fetcher.providers[0] = ("primary", provider("AQI 110"))
+    time.sleep(0.15)
+    assert fetcher.fetch("Mumbai")["provider"] == "primary"
+    assert fetcher.stats()["breakers"]["primary"] == "closed"
+    print("✅ Trial call succeeded and closed the breaker")
+
+    print("\n🎉 Hedged fetch tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_hedged_fetch()
+    except AssertionError as e:
+        print(f"❌ Hedged fetch test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Test script for the pooled HTTP client
+Run this to verify retries, backoff and the per-call deadline against the mock data server
+"""
+
+from http_client import PooledHTTPClient
+from mock_data_server import start_mock_server
+import requests
+import sys
+import time
+
+NAGER_URL = "https://date.nager.at/api/v3/PublicHolidays/2026/IN"
+
+def test_http_client():
+    print("🧪 Testing Pooled HTTP Client")
+    print("=" * 60)
+    server = start_mock_server(config={"latency_ms": 5, "jitter_ms": 0})
+    client = PooledHTTPClient(mock_server=server.url, backoff_base=0.05, backoff_cap=0.2)
+
+    try:
+        # Test 1: Backoff grows with the attempt and stays under the cap
+        print("\n⏳ Test 1: Jittered Backoff")
+        for attempt in range(6):
+            delays = [client._backoff(attempt) for _ in range(200)]
+            assert 0 <= min(delays) and max(delays) <= min(0.2, 0.05 * 2 ** attempt)
+        print("✅ Delays within [0, min(cap, base * 2^attempt)]")
+
+        # Test 2: Retryable statuses are retried, then the last response is returned
+        print("\n🔁 Test 2: Retries")
+        server.behaviour.update(overrides={"nager_date": {"error_rate": 1.0}})
+        response = client.get(NAGER_URL, source="nager_date", max_retries=3)
+        assert response.status_code == 503 and client.calls()[-1]["attempts"] == 4
+        response = client.get(NAGER_URL, source="nager_date", max_retries=0)
+        assert response.status_code == 503 and client.calls()[-1]["attempts"] == 1
+        server.behaviour.update(overrides={"nager_date": {"error_rate": 0.0}})
+        assert client.get(NAGER_URL, source="nager_date").status_code == 200
+        stats = client.stats()["nager_date"]
+        assert stats["calls"] == 3 and stats["failures"] == 2 and stats["retries"] == 3
+        print(f"✅ {stats['retries']} retries over {stats['calls']} calls, {stats['failures']} failed")
+
+        # Test 3: The deadline bounds the whole call, retries included
+        print("\n⏱️  Test 3: Per-Call Deadline")
+        server.behaviour.update(overrides={"nager_date": {"latency_ms": 1500}})
+        start = time.perf_counter()
+        try:
+            client.get(NAGER_URL, source="nager_date", max_retries=5, deadline=0.5)
+            assert False, "slow call outlived its deadline"
+        except requests.Timeout:
+            pass
+        elapsed = time.perf_counter() - start
+        assert elapsed < 1.0, f"took {elapsed:.2f}s"
+        server.behaviour.update(overrides={"nager_date": {"latency_ms": 5, "error_rate": 1.0}})
+        start = time.perf_counter()
+        response = client.get(NAGER_URL, source="nager_date", max_retries=50, deadline=0.5)
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 503 and 1 < client.calls()[-1]["attempts"] < 50
+        assert elapsed < 1.0, f"took {elapsed:.2f}s"
+        print(f"✅ Slow and failing calls stopped after {elapsed:.2f}s "
+              f"({client.calls()[-1]['attempts']} attempts)")
+    finally:
+        server.shutdown()
+
+    print("\n🎉 HTTP client tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_http_client()
+    except AssertionError as e:
+        print(f"❌ HTTP client test failed: {e}")
+        sys.exit(1)
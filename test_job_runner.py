@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test script for the background job runner
+Run this to verify pooled execution, persisted progress, duplicate rejection and reattaching
+"""
+
+from job_runner import JobRunner, JobStore
+from progress_events import PARTIAL_RESULT, SOURCE_COMPLETED, STAGE_COMPLETED, STAGE_STARTED, emit
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+running = []
+peak = [0]
+lock = threading.Lock()
+release = threading.Event()
+
+def analysis(location, fail=False):
+    with lock:
+        running.append(location)
+        peak[0] = max(peak[0], len(running))
+    try:
+        emit(STAGE_STARTED, "data_collection")
+        emit(SOURCE_COMPLETED, "data_collection", source="air_quality", ok=True, elapsed=0.1)
+        emit(PARTIAL_RESULT, "surge_prediction", prediction={"surge_percentage": 31.0, "risk_level": "High"})
+        emit(STAGE_COMPLETED, "surge_prediction", text=f"{location}: 31.0% surge")
+        release.wait(5)
+        if fail:
+            raise RuntimeError("provider down")
+        return {"location": location, "report": f"Report for {location}"}
+    finally:
+        with lock:
+            running.remove(location)
+
+def test_job_runner():
+    print("🧪 Testing Background Job Runner")
+    print("=" * 60)
+    path = os.path.join(tempfile.mkdtemp(), "jobs.sqlite")
+    runner = JobRunner(JobStore(path), max_workers=2, max_queued=2, targets={"test": analysis})
+
+    # Test 1: Submissions return at once; duplicates attach to the active job; the pool is bounded
+    print("\n📥 Test 1: Submission")
+    start = time.perf_counter()
+    job_id, accepted = runner.submit("test", "Mumbai")
+    assert accepted
+    assert runner.submit("test", " mumbai ") == (job_id, False)
+    others = [runner.submit("test", city)[0] for city in ("Pune", "Delhi", "Chennai")]
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    try:
+        runner.submit("test", "Nagpur")
+        assert False, "queue bound not enforced"
+    except RuntimeError:
+        pass
+    print(f"✅ 4 jobs queued in {elapsed_ms:.1f} ms; duplicate attached to {job_id}; fifth rejected")
+
+    # Test 2: Status and partial results are persisted while the job runs
+    print("\n💾 Test 2: Persisted Progress")
+    other_session = JobStore(path)
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        job = other_session.get(job_id)
+        if job["status"] == "running" and "sections" in job["partial"] and peak[0] == 2:
+            break
+        time.sleep(0.02)
+    assert job["status"] == "running" and job["stage"] == "surge_prediction"
+    assert job["partial"]["sections"]["surge_prediction"] == "Mumbai: 31.0% surge"
+    assert job["partial"]["surge_prediction"]["prediction"]["risk_level"] == "High"
+    assert job["partial"]["sources"]["air_quality"]["ok"]
+    print(f"✅ Another store sees job {job_id} running at stage '{job['stage']}' with partial results")
+
+    # Test 3: Jobs finish with their results; never more than max_workers at once
+    print("\n🏁 Test 3: Completion")
+    release.set()
+    jobs = [runner.wait(j, timeout=10) for j in [job_id] + others]
+    assert all(job["status"] == "completed" for job in jobs)
+    assert jobs[0]["result"]["report"] == "Report for Mumbai"
+    assert peak[0] == 2
+    failed_id, _ = runner.submit("test", "Mumbai", fail=True)
+    failed = runner.wait(failed_id, timeout=10)
+    assert failed["status"] == "failed" and "provider down" in failed["error"]
+    assert runner.submit("test", "Mumbai")[1], "finished jobs must not block a new run"
+    print(f"✅ {len(jobs)} jobs completed with at most {peak[0]} running; failure recorded")
+
+    # Test 4: Jobs left active by an exited process are marked failed on startup
+    print("\n🧟 Test 4: Orphaned Jobs")
+    store = JobStore(path)
+    store.insert("orphan", "test", "Pune", {}, f"{socket.gethostname()}:999999999")
+    store.update("orphan", status="running")
+    assert store.fail_orphans() == 1
+    assert store.get("orphan")["error"].startswith("Interrupted")
+    print("✅ Orphaned job marked failed")
+
+    runner.shutdown()
+    print("\n🎉 Job runner tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_job_runner()
+    except AssertionError as e:
+        print(f"❌ Job runner test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test script for the on-disk LLM call cache
+Run this to verify key normalization, hit metrics, LRU eviction and lookup speed
+"""
+
+from llm_cache import LLMCallCache, make_key
+import json
+import os
+import sys
+import tempfile
+import time
+
+def llm_string(model="gpt-4-turbo", streaming=True, temperature=None):
+    kwargs = {"model_name": model, "streaming": streaming}
+    if temperature is not None:
+        kwargs["temperature"] = temperature
+    client = {"lc": 1, "type": "constructor", "id": ["langchain", "chat_models", "openai", "ChatOpenAI"],
+              "kwargs": kwargs}
+    return json.dumps(client) + "---" + str([("stop", ["\nObservation"])])
+
+def messages(text, message_id=None):
+    return json.dumps([{"lc": 1, "type": "constructor", "id": ["langchain", "schema", "messages", "HumanMessage"],
+                        "kwargs": {"content": text, "type": "human", "id": message_id}}])
+
+def test_llm_cache():
+    print("🧪 Testing LLM Call Cache")
+    print("=" * 60)
+
+    # Test 1: Keys ignore formatting noise and client-only settings, not real differences
+    print("\n🔑 Test 1: Cache Keys")
+    key, model = make_key(messages("Summarize Mumbai data"), llm_string())
+    assert model == "gpt-4-turbo"
+    assert make_key(messages("Summarize Mumbai data  \r\n", message_id="run-1"), llm_string(streaming=False))[0] == key
+    assert make_key(messages("Summarize Pune data"), llm_string())[0] != key
+    assert make_key(messages("Summarize Mumbai data"), llm_string(temperature=0.2))[0] != key
+    assert make_key(messages("Summarize Mumbai data"), llm_string(model="gpt-4o"))[0] != key
+    print("✅ Same key across whitespace, message ids and streaming; new key for other prompts/params")
+
+    # Test 2: Hits are counted per model and served in milliseconds
+    print("\n🎯 Test 2: Hits and Metrics")
+    cache = LLMCallCache(path=os.path.join(tempfile.mkdtemp(), "llm.sqlite"))
+    assert cache.get(key, model) is None
+    cache.put(key, model, '[{"text": "Risk summary"}]')
+    start = time.perf_counter()
+    assert cache.get(key, model) == '[{"text": "Risk summary"}]'
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+    assert stats["by_model"]["gpt-4-turbo"]["write"] == 1
+    assert elapsed_ms < 50
+    print(f"✅ Hit served in {elapsed_ms:.2f} ms; hit rate {stats['hit_rate']:.0%}")
+
+    # Test 3: Least recently used completions are evicted past the size bound
+    print("\n🧹 Test 3: Size-Bounded Eviction")
+    cache = LLMCallCache(path=os.path.join(tempfile.mkdtemp(), "llm.sqlite"), max_bytes=2500)
+    for i in range(3):
+        cache.put(f"k{i}", "gpt-4-turbo", "x" * 1000)
+        time.sleep(0.01)
+    assert cache.get("k0") is None and cache.get("k2") is not None
+    cache.get("k1")  # Touch k1, then k2: k1 becomes the least recently used
+    time.sleep(0.01)
+    cache.get("k2")
+    time.sleep(0.01)
+    cache.put("k3", "gpt-4-turbo", "x" * 1000)
+    assert cache.get("k1") is None and cache.get("k2") is not None
+    stats = cache.stats()
+    assert stats["bytes"] <= 2500 and stats["evicted"] == 2
+    print(f"✅ {stats['entries']} entries, {stats['bytes']} bytes, {stats['evicted']} evicted")
+
+    print("\n🎉 LLM cache tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_llm_cache()
+    except AssertionError as e:
+        print(f"❌ LLM cache test failed: {e}")
+        sys.exit(1)
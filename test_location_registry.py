@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test script for the spatial location registry
+Run this to verify alias resolution, free-text matching and nearest-location lookups
+"""
+
+from location_registry import LocationRegistry, normalize_name
+import sys
+
+def place(id, name, kind, lat, lon, aliases=(), city="Mumbai"):
+    return {"id": id, "name": name, "kind": kind, "city": city, "state": "Maharashtra",
+            "lat": lat, "lon": lon, "aliases": list(aliases)}
+
+def test_location_registry():
+    print("🧪 Testing Location Registry")
+    print("=" * 60)
+    registry = LocationRegistry([
+        place("city-mumbai", "Mumbai", "city", 19.0, 72.8, ["bombay", "greater mumbai"]),
+        place("city-navi-mumbai", "Navi Mumbai", "city", 19.0, 73.0, ["new bombay"], city="Navi Mumbai"),
+        place("ward-ke", "Ward K/E (Andheri East)", "ward", 19.1, 72.87, ["k/e ward", "andheri east"]),
+        place("ward-dup", "Andheri Duplicate", "ward", 19.2, 72.9, ["andheri east"]),
+        place("aqi-a", "Station A", "aqi_station", 19.0, 72.8),
+        place("aqi-b", "Station B", "aqi_station", 20.0, 72.8),
+        place("aqi-c", "Station C", "aqi_station", 19.0, 74.0)
+    ])
+
+    # Test 1: Names, ids and aliases resolve regardless of case and punctuation
+    print("\n🔤 Test 1: Aliases")
+    assert normalize_name("  Ward K/E,  ANDHERI-East ") == "ward k/e andheri east"
+    assert registry.resolve("BOMBAY!")["id"] == "city-mumbai"
+    assert registry.resolve("greater   mumbai")["id"] == "city-mumbai"
+    assert registry.resolve("city-navi-mumbai")["id"] == "city-navi-mumbai"
+    assert registry.resolve("k/e ward")["id"] == "ward-ke"
+    assert registry.resolve("Andheri East")["id"] == "ward-ke", "first registration should keep the alias"
+    assert registry.resolve("Atlantis") is None and registry.resolve("") is None
+    print("✅ Aliases, ids and names resolve; unknown names give None")
+
+    # Test 2: Free text picks the longest alias, then the earliest, within the allowed kinds
+    print("\n📝 Test 2: Free Text")
+    assert registry.resolve("Surge near Andheri East, Mumbai")["id"] == "ward-ke"
+    assert registry.resolve("Navi Mumbai hospitals")["id"] == "city-navi-mumbai"
+    assert registry.resolve("Mumbai and New Bombay")["id"] == "city-navi-mumbai"
+    assert registry.resolve("Bombay then New Bombay")["id"] == "city-navi-mumbai"
+    assert registry.resolve("Andheri East, Mumbai", kinds={"city"})["id"] == "city-mumbai"
+    assert registry.resolve("Andheri East", kinds={"hospital"}) is None
+    print("✅ Longest match wins; kinds filter applies")
+
+    # Test 3: Nearest and radius lookups use great-circle distance
+    print("\n📍 Test 3: Nearest Locations")
+    nearest = registry.nearest(19.1, 72.8, k=2)
+    assert [entry["id"] for entry, _ in nearest] == ["aqi-a", "aqi-b"]
+    assert abs(nearest[0][1] - 11.1) < 0.1 and nearest[0][1] < nearest[1][1]
+    assert len(registry.nearest(19.0, 72.8, k=10)) == 3
+    assert registry.nearest(19.0, 72.8, kind="hospital") == []
+    assert [e["id"] for e, _ in registry.within_radius(19.0, 72.8, 120, kind="aqi_station")] == ["aqi-a", "aqi-b"]
+    assert registry.nearest_to("Andheri East")[0][0]["id"] == "aqi-a"
+    assert registry.nearest_to("Atlantis") == []
+    print(f"✅ Closest station {nearest[0][0]['name']} at {nearest[0][1]:.1f} km")
+
+    # Test 4: The shipped registry resolves every entry by id and finds stations for its cities
+    print("\n🗺️  Test 4: Shipped Registry")
+    shipped = LocationRegistry.from_csv()
+    assert all(shipped.resolve(entry["id"]) is entry for entry in shipped.entries)
+    assert shipped.resolve("Bombay")["id"] == "city-mumbai"
+    assert shipped.nearest_to("Mumbai")[0][1] < 25
+    print(f"✅ {len(shipped)} entries resolve by id")
+
+    print("\n🎉 Location registry tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_location_registry()
+    except AssertionError as e:
+        print(f"❌ Location registry test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for the Monte Carlo bed-occupancy simulation
+Run this to verify steady state, surge overflow, day-to-day census noise, reproducibility and speed
+"""
+
+from occupancy_simulation import _simulate_chunk, los_survival, occupancy_summary, simulate_occupancy, simulation_inputs
+from resource_optimizer import BASE_CONDITION_MIX
+import numpy as np
+import sys
+
+def test_occupancy_simulation():
+    print("🧪 Testing Occupancy Simulation")
+    print("=" * 60)
+
+    # Test 1: Length-of-stay survival matches the mean stay
+    print("\n🛏️ Test 1: Length of Stay")
+    survival = los_survival(dict(BASE_CONDITION_MIX))
+    assert survival[0] == 1 and np.all(np.diff(survival) <= 0)
+    assert 4 < survival.sum() < 6
+    print(f"✅ Mean stay about {survival.sum() - 0.5:.1f} days")
+
+    # Test 2: With no surge the census stays near today's occupancy
+    print("\n⚖️ Test 2: Steady State")
+    beds, occupied = np.array([200.0, 400.0]), np.array([120.0, 260.0])
+    result = simulate_occupancy(beds, occupied, 0, days=14, runs=2000)
+    assert np.allclose(result["mean_census"][-1], occupied, rtol=0.05)
+    assert result["p_exceed"].max() < 0.01
+    print(f"✅ Day 14 mean census {result['mean_census'][-1].round()} from {occupied}")
+
+    # Test 3: A surge on a nearly full hospital makes overflow likely after onset
+    print("\n📈 Test 3: Surge Overflow")
+    result = simulate_occupancy(np.array([100.0]), np.array([92.0]), 30, timeline="3-5 days", days=14, runs=2000)
+    p = result["p_exceed"][:, 0]
+    assert p[0] < 0.2 and p.max() > 0.8 and np.argmax(p) >= 4
+    summary = occupancy_summary(result, ["City Hospital"])
+    assert summary["facilities"][0]["name"] == "City Hospital" and summary["first_overflow_day"] > 1
+    print(f"✅ Day 1 risk {p[0]:.0%}, peak {p.max():.0%}; overflow likely from day {summary['first_overflow_day']}")
+
+    # Test 4: The census carries over between days: at steady state a day's change is
+    # admissions minus discharges (variance about 2x daily admissions), not two independent draws
+    print("\n🔗 Test 4: Day-to-Day Census Changes")
+    inputs = simulation_inputs(np.array([300.0]), np.array([240.0]), 0, days=14)
+    census = _simulate_chunk(inputs, 4000, np.random.SeedSequence(0))["system_census"]
+    change_sd = np.diff(census[:, 5:], axis=1).std()
+    expected_sd = np.sqrt(2 * inputs["baseline_admissions"][0])
+    assert abs(change_sd / expected_sd - 1) < 0.1, (change_sd, expected_sd)
+    result = simulate_occupancy(np.array([100.0]), np.array([85.0]), 10, days=14, runs=2000)
+    assert result["p_exceed"][:, 0].max() <= result["p_any_exceed"][0] < 0.9
+    print(f"✅ Daily change sd {change_sd:.1f} vs {expected_sd:.1f} expected; "
+          f"any-day risk {result['p_any_exceed'][0]:.0%}")
+
+    # Test 5: Results do not depend on the number of worker processes
+    print("\n🔁 Test 5: Reproducibility")
+    serial = simulate_occupancy(beds, occupied, 25, days=10, runs=1500, chunk_runs=500)
+    parallel = simulate_occupancy(beds, occupied, 25, days=10, runs=1500, chunk_runs=500, n_jobs=2)
+    assert np.array_equal(serial["p_exceed"], parallel["p_exceed"])
+    print("✅ Same probabilities with 1 and 2 processes")
+
+    # Test 6: 10,000 runs x 30 days x 100 facilities within seconds on one core
+    print("\n⚡ Test 6: Scale")
+    rng = np.random.default_rng(0)
+    beds = rng.integers(80, 900, 100).astype(float)
+    result = simulate_occupancy(beds, np.floor(beds * 0.85), 30, days=30, runs=10_000)
+    assert result["p_exceed"].shape == (30, 100)
+    assert result["elapsed"] < 15
+    print(f"✅ {result['runs']} runs simulated in {result['elapsed']:.2f}s")
+
+    print("\n🎉 Occupancy simulation tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_occupancy_simulation()
+    except AssertionError as e:
+        print(f"❌ Occupancy simulation test failed: {e}")
+        sys.exit(1)
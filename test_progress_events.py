@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Test script for the progress event bus
+Run this to verify run attribution, replay and completion events
+"""
+
+from progress_events import (
+    ProgressBus, STAGE_COMPLETED, SOURCE_COMPLETED, RUN_COMPLETED, RUN_FAILED,
+    emit, iter_events, progress_bus, start_run
+)
+import asyncio
+import sys
+
+def pipeline(location):
+    async def fetch(source):
+        # Worker threads started by asyncio inherit the run context
+        await asyncio.to_thread(emit, SOURCE_COMPLETED, "data_collection", source=source)
+    async def fetch_all():
+        await asyncio.gather(fetch("air_quality"), fetch("hospital"))
+    asyncio.run(fetch_all())
+    emit(STAGE_COMPLETED, "surge_prediction", text=f"{location}: 31.0%")
+    return {"location": location}
+
+def test_progress_events():
+    print("🧪 Testing Progress Event Bus")
+    print("=" * 60)
+
+    # Test 1: Events from the run and its worker threads, replayed to a late subscriber
+    print("\n📡 Test 1: Run Events")
+    run_id, worker = start_run(pipeline, "Pune")
+    worker.join()
+    events = list(iter_events(progress_bus.subscribe(run_id), timeout=5))
+    kinds = [event["kind"] for event in events]
+    assert kinds[0] == "run_started" and kinds[-1] == RUN_COMPLETED
+    assert sorted(e["data"]["source"] for e in events if e["kind"] == SOURCE_COMPLETED) == ["air_quality", "hospital"]
+    assert all(event["run_id"] == run_id for event in events)
+    assert events[-1]["data"]["result"] == {"location": "Pune"}
+    print(f"✅ {len(events)} events replayed in order: {kinds}")
+
+    # Test 2: Subscribers only see their own run
+    print("\n🔀 Test 2: Run Isolation")
+    bus = ProgressBus()
+    mine = bus.subscribe("a")
+    bus.publish(STAGE_COMPLETED, "resource_plan", run_id="b")
+    bus.publish(STAGE_COMPLETED, "resource_plan", run_id="a")
+    assert mine.qsize() == 1 and mine.get()["run_id"] == "a"
+    print("✅ Events for another run were not delivered")
+
+    # Test 3: Failures end the stream with the error
+    print("\n💥 Test 3: Failed Run")
+    def broken():
+        raise ValueError("no data")
+    run_id, _ = start_run(broken)
+    final = list(iter_events(progress_bus.subscribe(run_id), timeout=5))[-1]
+    assert final["kind"] == RUN_FAILED and "no data" in final["data"]["error"]
+    print(f"✅ {final['data']['error']}")
+
+    print("\n🎉 Progress event tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_progress_events()
+    except AssertionError as e:
+        print(f"❌ Progress event test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test script for the resource allocation optimizer
+Run this to verify transfers, surge capacity and solve time at scale
+"""
+
+from resource_optimizer import optimize_allocation, surge_profile, synthetic_facilities
+import numpy as np
+import sys
+
+def two_hospitals(occupied_a, occupied_b):
+    facilities = synthetic_facilities(2)
+    facilities["wards"] = ["Ward 1", "Ward 1"]
+    facilities["beds"] = np.array([100.0, 100.0])
+    facilities["occupied"] = np.array([occupied_a, occupied_b])
+    facilities["roster"] = np.array([100.0, 100.0])
+    facilities["stock"] = np.full((2, len(facilities["items"])), 1000.0)
+    return facilities
+
+def test_resource_optimizer():
+    print("🧪 Testing Resource Allocation Optimizer")
+    print("=" * 60)
+
+    # Test 1: Surge profile ramps to the full surge at onset
+    print("\n📈 Test 1: Surge Profile")
+    profile = surge_profile(30, "3-5 days", horizon=14)
+    assert profile[0] == 0 and np.isclose(profile.max(), 0.30) and np.argmax(profile) == 4
+    print(f"✅ Peak uplift {profile.max():.0%} on day {np.argmax(profile) + 1}")
+
+    # Test 2: Spare capacity nearby is used before surge beds
+    print("\n🚑 Test 2: Transfers to a Neighbour")
+    plan = optimize_allocation(two_hospitals(95.0, 40.0), 20, timeline="1-2 days", horizon=5)
+    assert sum(day["unmet"] for day in plan["daily"]) == 0
+    assert plan["transfers"] and plan["transfers"][0]["from"] == "Facility 0000"
+    assert sum(day["surge_beds"] for day in plan["daily"]) == 0
+    print(f"✅ Moved {sum(day['transfers'] for day in plan['daily'])} patient-days, no surge beds opened")
+
+    # Test 3: Integer plans are whole numbers
+    print("\n🔢 Test 3: Integer Program")
+    plan = optimize_allocation(two_hospitals(98.0, 97.0), 25, timeline="1-2 days", horizon=5, integer=True)
+    assert "Optimal" in plan["solve"]["status"]
+    assert all(day["surge_beds"] > 0 for day in plan["daily"][1:])
+    print(f"✅ {plan['solve']['status']}")
+
+    # Test 4: Hundreds of facilities over 14 days within seconds
+    print("\n⚡ Test 4: Scale")
+    plan = optimize_allocation(synthetic_facilities(300), 35, horizon=14)
+    assert len(plan["facilities"]) == 300 and len(plan["daily"]) == 14
+    assert plan["solve"]["solve_time"] < 10
+    print(f"✅ {plan['solve']['variables']} variables solved in {plan['solve']['solve_time']:.2f}s")
+    plan = optimize_allocation(synthetic_facilities(300), 35, horizon=14, integer=True)
+    assert plan["solve"]["solve_time"] < 15
+    print(f"✅ Integer plan within a 1% gap in {plan['solve']['solve_time']:.2f}s")
+
+    # Test 5: Consumables are used up, so orders grow with the horizon; ventilators are reused
+    print("\n🧴 Test 5: Consumables Over the Horizon")
+    facilities = two_hospitals(80.0, 60.0)
+    facilities["stock"][:] = 0
+    short, long = (optimize_allocation(facilities, 0, horizon=days)["orders"] for days in (5, 10))
+    for item in ("oxygen_cylinders", "trauma_kits"):
+        assert abs(long[item] - 2 * short[item]) <= 2, (item, short[item], long[item])
+    assert long["ventilators"] == short["ventilators"] > 0
+    print(f"✅ Oxygen {short['oxygen_cylinders']} -> {long['oxygen_cylinders']} cylinders for 5 -> 10 days; "
+          f"ventilators stay at {long['ventilators']}")
+
+    print("\n🎉 Resource optimizer tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_resource_optimizer()
+    except AssertionError as e:
+        print(f"❌ Resource optimizer test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Test script for what-if scenario sweeps
+Run this to verify sweep results match single predictions and the shared
+model is left untouched
+"""
+
+from scenario_sweep import risk_surface, sweep_scenarios
+from surge_prediction_model import initialize_model
+import numpy as np
+import sys
+
+def test_scenario_sweep():
+    print("🧪 Testing Scenario Sweeps")
+    print("=" * 60)
+    model = initialize_model()
+    n_jobs = model.model.n_jobs
+    ranges = {"aqi_value": (50, 450, 5), "hospital_occupancy": [0.6, 0.8, 0.95], "festival_score": (0, 1, 3)}
+    context = {"temperature": 31, "month": 10, "day_of_week": 5}
+
+    # Test 1: Grid points score the same as one-off predictions, across chunk boundaries
+    print("\n🎯 Test 1: Sweep Matches predict_from_features")
+    frame = sweep_scenarios(model, ranges, context=context, chunk_size=7, n_jobs=2)
+    assert len(frame) == 5 * 3 * 3
+    base = model.extract_features_from_text("")
+    base.update(context)
+    for row in frame.iloc[[0, 8, 22, 44]].itertuples():
+        features = dict(base, aqi_value=row.aqi_value, hospital_occupancy=row.hospital_occupancy,
+                        festival_score=row.festival_score)
+        prediction = model.predict_from_features(features)
+        assert np.isclose(row.surge_percentage, prediction["surge_percentage"], atol=1e-3)
+        assert row.risk_level == prediction["risk_level"]
+    print(f"✅ {len(frame)} grid points; spot checks agree with single predictions")
+
+    # Test 2: Tensor output has one axis per swept feature
+    print("\n🧊 Test 2: Tensor Output")
+    surge, axes = sweep_scenarios(model, ranges, context=context, output="tensor")
+    assert surge.shape == (5, 3, 3) and list(axes) == list(ranges)
+    assert np.allclose(surge.ravel(), frame["surge_percentage"])
+    surface = risk_surface(frame, "aqi_value", "hospital_occupancy")
+    assert surface.shape == (3, 5)
+    print(f"✅ Tensor {surge.shape} matches the frame")
+
+    # Test 3: The shared model keeps its own parallelism; bad features are rejected
+    print("\n🔒 Test 3: Shared Model Untouched")
+    assert model.model.n_jobs == n_jobs
+    try:
+        sweep_scenarios(model, {"rainfall": [1, 2]})
+        assert False, "unknown feature accepted"
+    except ValueError:
+        pass
+    print(f"✅ Forest n_jobs still {n_jobs}; unknown feature rejected")
+
+    print("\n🎉 Scenario sweep tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_scenario_sweep()
+    except AssertionError as e:
+        print(f"❌ Scenario sweep test failed: {e}")
+        sys.exit(1)
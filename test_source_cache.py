@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Test script for the persistent data source cache
+Run this to verify TTL expiry, stale-while-revalidate and outage fallback
+"""
+
+from source_cache import SourceCache
+import os
+import sys
+import tempfile
+import time
+
+def test_source_cache():
+    print("🧪 Testing Persistent Source Cache")
+    print("=" * 60)
+
+    path = os.path.join(tempfile.mkdtemp(), "cache.sqlite")
+    cache = SourceCache(path=path, ttls={"aqi": (0.2, 0.5)})
+    calls = []
+
+    def fetch():
+        calls.append(time.time())
+        return f"AQI {150 + len(calls)}"
+
+    # Test 1: Miss then hit
+    print("\n💾 Test 1: Miss Then Hit")
+    assert cache.get_or_fetch("aqi", {"city": "Mumbai"}, fetch) == "AQI 151"
+    assert cache.get_or_fetch("aqi", {"city": "Mumbai"}, fetch) == "AQI 151"
+    assert len(calls) == 1
+    print("✅ Second call served from cache")
+
+    # Test 2: Shared across handles on the same file
+    print("\n🔗 Test 2: Shared Across Cache Handles")
+    other = SourceCache(path=path, ttls={"aqi": (0.2, 0.5)})
+    assert other.get_or_fetch("aqi", {"city": "Mumbai"}, fetch) == "AQI 151"
+    assert len(calls) == 1
+    print("✅ Another handle reads the same entry")
+
+    # Test 3: Stale-while-revalidate
+    print("\n♻️  Test 3: Stale While Revalidate")
+    time.sleep(0.3)
+    assert cache.get_or_fetch("aqi", {"city": "Mumbai"}, fetch) == "AQI 151"
+    time.sleep(0.1)
+    assert len(calls) == 2, "background refresh should have run"
+    assert cache.get_or_fetch("aqi", {"city": "Mumbai"}, fetch) == "AQI 152"
+    print("✅ Stale value served while refresh ran in background")
+
+    # Test 4: Outage falls back to stored data; invalid values are never stored
+    print("\n🚧 Test 4: Provider Outage")
+    time.sleep(0.8)
+    fallback = lambda: "Using fallback data - AQI 155"
+    is_valid = lambda value: "fallback" not in value
+    assert cache.get_or_fetch("aqi", {"city": "Mumbai"}, fallback, is_valid) == "AQI 152"
+    assert cache.get_or_fetch("aqi", {"city": "Pune"}, fallback, is_valid) == fallback()
+    assert cache.get("aqi:" + '{"city": "Pune"}') is None
+    print("✅ Expired data served during outage, fallback text not cached")
+
+    stats = cache.stats()["aqi"]
+    print(f"   Stats: {stats}")
+    assert stats["hit"] == 3 and stats["stale"] == 1 and stats["outage"] == 1
+
+    print("\n🎉 Source cache tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_source_cache()
+    except AssertionError as e:
+        print(f"❌ Source cache test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for the surrogate lookup table
+Run this to verify the interpolation error bound against the full forest,
+clamping at the grid edges, the fixed calendar context and surrogate sweeps
+"""
+
+from surge_prediction_model import initialize_model
+from scenario_sweep import sweep_scenarios
+from surrogate_model import CALENDAR_CONTEXT, FEATURE_BOUNDS, SurrogateLookupTable
+import numpy as np
+import pickle
+import sys
+
+def test_surrogate_model():
+    print("🧪 Testing Surrogate Lookup Table")
+    print("=" * 60)
+    model = initialize_model()
+    features = ["aqi_value", "hospital_occupancy", "festival_score"]
+    surrogate = SurrogateLookupTable.build(model, features=features, initial_points=5,
+                                           max_points_per_axis=33, n_probes=1000)
+    base_vector = np.array([surrogate.context[c] for c in model.feature_columns], dtype=float)
+    columns = [model.feature_columns.index(f) for f in features]
+    bounds = np.array([FEATURE_BOUNDS[f] for f in features])
+
+    def exact(points):
+        X = np.tile(base_vector, (len(points), 1))
+        X[:, columns] = points
+        return model.predict_batch(X)
+
+    # Test 1: Error bound holds on fresh points, not just the build's validation set
+    print("\n📏 Test 1: Error Bound Against the Forest")
+    points = np.random.default_rng(7).uniform(bounds[:, 0], bounds[:, 1], size=(2000, len(features)))
+    errors = np.abs(surrogate.predict_batch(points) - exact(points))
+    assert errors.max() <= 5.0, f"max error {errors.max():.2f}"
+    assert surrogate.error_report["max_error"] <= 5.0
+    knots = np.meshgrid(*surrogate.knots, indexing="ij")
+    nodes = np.stack([k.ravel() for k in knots], axis=1)
+    assert np.allclose(surrogate.predict_batch(nodes), exact(nodes))
+    print(f"✅ Grid {surrogate.table.shape}: max error {errors.max():.2f}, mean {errors.mean():.3f} points")
+
+    # Test 2: Scalar and batch paths agree
+    print("\n🔁 Test 2: Scalar Path")
+    batch = surrogate.predict_batch(points[:50])
+    assert np.allclose([surrogate.predict(p) for p in points[:50].tolist()], batch)
+    assert np.isclose(surrogate.predict({"aqi_value": 300}),
+                      surrogate.predict([300] + [surrogate.context[f] for f in features[1:]]))
+    print("✅ predict() matches predict_batch()")
+
+    # Test 3: Queries outside the grid clamp to its edges
+    print("\n🧱 Test 3: Clamping at Grid Edges")
+    inside = np.array([[bounds[0, 0], 0.8, 0.5], [bounds[0, 1], bounds[1, 1], bounds[2, 0]]])
+    outside = np.array([[0.0, 0.8, 0.5], [2000.0, 1.5, -1.0]])
+    assert np.allclose(surrogate.predict_batch(outside), surrogate.predict_batch(inside))
+    assert np.allclose([surrogate.predict(p) for p in outside.tolist()], surrogate.predict_batch(inside))
+    print("✅ Out-of-range queries return edge values")
+
+    # Test 4: Pickled tables answer the same
+    print("\n💾 Test 4: Pickle Round Trip")
+    restored = pickle.loads(pickle.dumps(surrogate))
+    assert np.allclose(restored.predict_batch(points[:50]), batch)
+    print("✅ Restored table matches")
+
+    # Test 5: Non-gridded calendar features are fixed, not the build date's
+    print("\n📅 Test 5: Fixed Calendar Context")
+    assert {f: surrogate.context[f] for f in CALENDAR_CONTEXT} == CALENDAR_CONTEXT
+    other = SurrogateLookupTable.build(model, features=["aqi_value", "month"], initial_points=5,
+                                       max_points_per_axis=33, n_probes=500)
+    assert other.context["day_of_week"] == CALENDAR_CONTEXT["day_of_week"]
+    print(f"✅ Context calendar {CALENDAR_CONTEXT}; gridded features still swept")
+
+    # Test 6: Approximate sweeps interpolate only when the surrogate grids every swept feature
+    print("\n🧪 Test 6: Approximate Sweeps")
+    saved = model.surrogate
+    model.surrogate = surrogate
+    try:
+        ranges = {"aqi_value": (50, 500, 10), "hospital_occupancy": (0.6, 1.0, 5)}
+        surge, axes = sweep_scenarios(model, ranges, output="tensor", approximate=True)
+        mesh = np.meshgrid(*axes.values(), indexing="ij")
+        points = np.stack([mesh[0].ravel(), mesh[1].ravel(),
+                           np.full(mesh[0].size, surrogate.context["festival_score"])], axis=1)
+        assert np.allclose(surge.ravel(), np.maximum(surrogate.predict_batch(points), 0), atol=1e-4)
+        fallback, _ = sweep_scenarios(model, dict(ranges, temperature=[25, 35]), output="tensor",
+                                      approximate=True)
+        assert np.allclose(fallback[:, :, 0], sweep_scenarios(
+            model, ranges, context={"temperature": 25}, output="tensor")[0])
+    finally:
+        model.surrogate = saved
+    print(f"✅ {surge.size} points interpolated; ungridded features fall back to the forest")
+
+    print("\n🎉 Surrogate model tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_surrogate_model()
+    except AssertionError as e:
+        print(f"❌ Surrogate model test failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script for the Streamlit caching layer
+Run this to verify cached groups, invalidation and that invalidating the
+model group hands out a freshly loaded model
+"""
+
+import sys
+
+def test_ui_cache():
+    print("🧪 Testing UI Cache")
+    print("=" * 60)
+    try:
+        import streamlit  # noqa: F401
+    except ImportError:
+        print("⚠️  streamlit not installed; UI cache tests skipped")
+        return
+
+    import main
+    from ui_cache import cached_data, invalidate, shared_model
+
+    # Test 1: Data groups are served from cache until invalidated
+    print("\n🗂️  Test 1: Cached Groups")
+    calls = []
+
+    @cached_data("surface")
+    def surface(x):
+        calls.append(x)
+        return {"x": x}
+
+    assert surface(1) == surface(1) == {"x": 1} and calls == [1]
+    invalidate("forecast")
+    surface(1)
+    assert calls == [1], "unrelated group cleared"
+    invalidate("surface")
+    surface(1)
+    assert calls == [1, 1]
+    print("✅ Repeat calls cached; only the invalidated group recomputes")
+
+    # Test 2: Invalidating the model reloads it everywhere and clears what was computed from it
+    print("\n🤖 Test 2: Model Invalidation")
+    model = shared_model()
+    assert shared_model() is model and main.get_ml_model() is model
+    invalidate("model")
+    reloaded = shared_model()
+    assert reloaded is not model and reloaded.is_trained
+    assert main.get_ml_model() is reloaded and shared_model() is reloaded
+    surface(1)
+    assert calls == [1, 1, 1], "surface group should be cleared with the model"
+    print("✅ New model instance after invalidate('model'); dependent surfaces recomputed")
+
+    print("\n🎉 UI cache tests completed successfully!")
+
+if __name__ == "__main__":
+    try:
+        test_ui_cache()
+    except AssertionError as e:
+        print(f"❌ UI cache test failed: {e}")
+        sys.exit(1)
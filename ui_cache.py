@@ -0,0 +1,86 @@
+# ui_cache.py
+"""
+Caching layer for the Streamlit apps
+Streamlit reruns the whole app script on every widget interaction. Shared
+resources (the ML model) are held once per process with st.cache_resource;
+computed frames and Plotly figures go in st.cache_data with per-group TTLs,
+so reruns render from cache. invalidate() drops a group on demand.
+"""
+
+import os
+import threading
+
+import streamlit as st
+
+# Seconds before a group's entries are rebuilt; None keeps them for the life of the process
+UI_TTLS = {
+    "model": None,
+    "sample": None,
+    "surface": 60 * 60,
+    "forecast": 15 * 60
+}
+# Distinct argument combinations kept per cached function
+MAX_ENTRIES = 64
+
+# Groups whose entries are computed from another group's resource
+DEPENDENT_GROUPS = {"model": ("surface",)}
+
+_registry = {}
+_registry_lock = threading.Lock()
+_model_built = False
+
+
+def ui_cache_enabled():
+    """Every rerun recomputes (useful while editing charts) when AROGYA_UI_CACHE_DISABLED=1"""
+    return os.environ.get("AROGYA_UI_CACHE_DISABLED") != "1"
+
+
+def _register(group, func, cached):
+    # App scripts re-run their decorators on every rerun; keep one entry per function
+    with _registry_lock:
+        _registry.setdefault(group, {})[f"{func.__module__}.{func.__qualname__}"] = cached
+    return cached
+
+
+def cached_data(group):
+    """Cache a function's return value (a copy per call) with the group's TTL"""
+    def decorate(func):
+        if not ui_cache_enabled():
+            return func
+        cached = st.cache_data(ttl=UI_TTLS[group], max_entries=MAX_ENTRIES, show_spinner=False)(func)
+        return _register(group, func, cached)
+    return decorate
+
+
+def cached_resource(group):
+    """Share one instance of a function's return value across sessions and reruns"""
+    def decorate(func):
+        if not ui_cache_enabled():
+            return func
+        cached = st.cache_resource(ttl=UI_TTLS[group], show_spinner=False)(func)
+        return _register(group, func, cached)
+    return decorate
+
+
+def invalidate(group=None):
+    """Clear one group (and the groups computed from it), or every cached entry"""
+    groups = [group, *DEPENDENT_GROUPS.get(group, ())] if group else list(_registry)
+    with _registry_lock:
+        functions = [cached for name in groups for cached in _registry.get(name, {}).values()]
+    for cached in functions:
+        cached.clear()
+    return len(functions)
+
+
+@cached_resource("model")
+def shared_model():
+    """
+    The process-wide ML surge model, loaded (or trained) once. After
+    invalidate("model") the rebuild reloads it from the saved files, so the
+    app and main.get_ml_model() both move to the new instance.
+    """
+    global _model_built
+    from main import get_ml_model
+    with _registry_lock:
+        reload, _model_built = _model_built, True
+    return get_ml_model(reload=reload)